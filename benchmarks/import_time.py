@@ -0,0 +1,100 @@
+"""
+Cold-start import benchmark: each entry point is imported in a fresh interpreter.
+
+    python -m benchmarks.import_time                 # compare with import_baselines.json
+    python -m benchmarks.import_time --save          # record new baselines
+
+"app" replays streamlit_app.py's top-level imports (not the UI script itself), the
+rest are headless/CLI entry points. Besides wall time, the heavy third-party
+packages that ended up in sys.modules are listed, since those are what lazy
+imports are meant to keep out of the cold path.
+"""
+from __future__ import annotations
+import argparse
+import ast
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE_PATH = Path(__file__).resolve().parent / "import_baselines.json"
+HEAVY_MODULES = ["sklearn", "scipy", "plotly.express", "pydeck", "bs4", "soupsieve", "requests", "joblib", "streamlit",
+                 "pyarrow", "pyarrow.dataset"]
+ENTRY_POINTS = [
+    "src.pipelines.analysis",
+    "src.data_preprocessing",
+    "src.recommendation",
+    "src.data_sources.insideairbnb_source",
+    "src.data_sources.direct_csv_url_source",
+    "src.history_store",
+    "src.snapshot_diff",
+    "src.backtesting",
+]
+
+def app_imports() -> str:
+    """
+    streamlit_app.py's module-level import statements as one source block.
+    """
+    tree = ast.parse((ROOT / "streamlit_app.py").read_text())
+    lines = [ast.unparse(n) for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))]
+    return "\n".join(lines)
+
+def _probe(body: str) -> Dict[str, object]:
+    code = "\n".join([
+        "import sys, time, json",
+        f"sys.path[:0] = [{str(ROOT)!r}, {str(ROOT / 'src')!r}]",
+        "t0 = time.perf_counter()",
+        body,
+        "dt = time.perf_counter() - t0",
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]",
+        "print(json.dumps({'seconds': dt, 'heavy': heavy}))",
+    ])
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def measure(name: str, body: str, repeat: int) -> Dict[str, object]:
+    runs = [_probe(body) for _ in range(repeat)]
+    return {"seconds": round(statistics.median(r["seconds"] for r in runs), 3), "heavy": runs[-1]["heavy"]}
+
+def run(repeat: int) -> Dict[str, Dict[str, object]]:
+    targets = {"app": app_imports(), "pandas (floor)": "import pandas"}
+    targets.update({m: f"import {m}" for m in ENTRY_POINTS})
+    results = {}
+    for name, body in targets.items():
+        results[name] = measure(name, body, repeat)
+        r = results[name]
+        print(f"{name:<42} {r['seconds']:>7.3f}s  {', '.join(r['heavy']) or '-'}")
+    return results
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    parser.add_argument("--save", action="store_true")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat)
+    baselines = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    regressions: List[str] = []
+    for name, r in results.items():
+        base = baselines.get(name)
+        if not base:
+            continue
+        if r["seconds"] > base["seconds"] * (1 + args.tolerance):
+            regressions.append(f"{name}: {r['seconds']}s vs baseline {base['seconds']}s")
+        new_heavy = sorted(set(r["heavy"]) - set(base["heavy"]))
+        if new_heavy:
+            regressions.append(f"{name}: now imports {', '.join(new_heavy)}")
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if args.save:
+        BASELINE_PATH.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Saved import baselines -> {BASELINE_PATH}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
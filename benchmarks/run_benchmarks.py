@@ -0,0 +1,246 @@
+"""
+End-to-end benchmarks on synthetic InsideAirbnb snapshots (src.synthetic_data).
+
+    python -m benchmarks.run_benchmarks --sizes 10k 100k          # compare with baselines.json
+    python -m benchmarks.run_benchmarks --sizes 10k 100k --save   # record new baselines
+    python -m benchmarks.run_benchmarks --sizes 1m --fail-on-regression
+
+Each stage is timed (best of --repeat) and then run once more under tracemalloc for
+its peak allocation. Regressions beyond --tolerance against the stored baseline are
+flagged; baselines are machine specific, so re-record them when the hardware changes.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime, timezone
+from pathlib import Path
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Tuple
+import numpy as np
+import pandas as pd
+import sklearn
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.synthetic_data import NEIGHBOURHOODS, generate_listings, write_snapshot
+from src.data_preprocessing import load_data, clean_data
+from src.model_training import train_price_model, cluster_hosts
+from src.recommendation import build_recommendation_scores, filter_by_preferences
+from src.metrics import compute_metrics
+from src.data_sources.base import DataSource, SourceResult, build_source
+from src.data_sources.caching import CachedSource
+from src.pipelines.analysis_cache import AnalysisCache
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+DATA_DIR = ROOT / "data" / "bench"
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines.json"
+PREFERENCES = {
+    "price_range": (50.0, 250.0),
+    "room_types": ["Entire home/apt", "Private room"],
+    "availability_range": (30, 365),
+    "occupancy_group": "Duo (2)",
+    "reviews_range": (5, 10_000),
+}
+
+def snapshot_files(size: str, seed: int = 0) -> Dict[str, Path]:
+    out = DATA_DIR / size
+    files = {"listings": out / "listings.csv.gz", "reviews": out / "reviews.csv.gz"}
+    if not all(p.exists() for p in files.values()):
+        t0 = time.perf_counter()
+        write_snapshot(out, SIZES[size], seed=seed, reviews=True)
+        print(f"[{size}] generated synthetic snapshot in {time.perf_counter() - t0:.1f}s -> {out}")
+    return files
+
+def check_canonical_schema() -> List[str]:
+    """
+    Sanity checks on a small synthetic frame; timings are meaningless if clean_data
+    maps the wrong raw columns.
+    """
+    df = clean_data(generate_listings(500, seed=1), source="InsideAirbnb")
+    hoods = set(df["neighbourhood"].dropna()) if "neighbourhood" in df.columns else set()
+    if not hoods or not hoods <= {n[0] for n in NEIGHBOURHOODS}:
+        return [f"neighbourhood holds {sorted(hoods)[:3]}, expected the neighbourhood_cleansed names"]
+    return []
+
+def check_insideairbnb_upload() -> List[str]:
+    """
+    An InsideAirbnb listings file uploaded by hand must map like the InsideAirbnb
+    source, whole and through the pushdown reader.
+    """
+    csv = generate_listings(500, seed=3).to_csv(index=False).encode()
+    expected = {n[0] for n in NEIGHBOURHOODS}
+    problems = []
+    for columns in (None, ["id", "neighbourhood", "price", "number_of_reviews"]):
+        upload = build_source("LocalCSVUpload", cache=False, listings_file=BytesIO(csv))
+        df = upload.load(columns=columns).df
+        label = "upload" if columns is None else "upload pushdown"
+        hoods = set(df["neighbourhood"].dropna()) if "neighbourhood" in df.columns else set()
+        if not hoods or not hoods <= expected:
+            problems.append(f"{label}: neighbourhood holds {sorted(hoods)[:3]}, expected the neighbourhood_cleansed names")
+        if columns is not None and list(df.columns) != columns:
+            problems.append(f"{label}: columns {list(df.columns)}, expected {columns}")
+        if columns is None and not pd.api.types.is_numeric_dtype(df["number_of_reviews"]):
+            problems.append(f"{label}: number_of_reviews is {df['number_of_reviews'].dtype}")
+    return problems
+
+def check_source_cache_isolation() -> List[str]:
+    """
+    A caller mutating a loaded frame must not change what the next cache hit returns.
+    """
+    class FrameSource(DataSource):
+        source_type = "BenchFrame"
+        def load(self, columns=None, where=None) -> SourceResult:
+            return SourceResult(df=clean_data(pd.read_csv(self.params["listings_file"])), metadata={})
+
+    csv = generate_listings(200, seed=2).to_csv(index=False).encode()
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AnalysisCache(cache_dir=Path(tmp))
+        load = lambda: CachedSource(FrameSource(listings_file=BytesIO(csv)), cache).load()
+        first = load().df
+        expected = first["price"].copy()
+        first["price"] = -1.0
+        first.loc[first.index[0], "latitude"] = 0.0
+        again = load()
+    if not again.metadata["cache"]["hit"]:
+        return ["second source load was not a cache hit"]
+    if again.df is first or not again.df["price"].equals(expected) or (again.df["latitude"] == 0.0).any():
+        return ["mutating a loaded frame changed the cached entry"]
+    return []
+
+def _stages(files: Dict[str, Path]) -> List[Tuple[str, Callable[[Dict[str, Any]], Any], Callable[[Dict[str, Any]], Dict[str, Any]]]]:
+    """
+    (name, fn(inputs) -> output, inputs factory). Stages run in pipeline order and
+    each stage's output feeds the next; the factory hands every timed run fresh
+    inputs, since several stages add columns to (or rename) their input in place.
+    """
+    state: Dict[str, Any] = {}
+
+    def keep(name, fn):
+        def run(inputs):
+            out = fn(inputs)
+            state[name] = out
+            return out
+        return run
+
+    return [
+        ("load_data", keep("raw", lambda _: load_data(str(files["listings"]), str(files["reviews"]))), lambda: {}),
+        ("clean_data", keep("clean", lambda i: clean_data(i["df"], source="InsideAirbnb")),
+         lambda: {"df": state["raw"].copy()}),
+        ("train_price_model", keep("priced", lambda i: train_price_model(i["df"])[1]),
+         lambda: {"df": state["clean"].copy()}),
+        ("cluster_hosts", keep("clustered", lambda i: cluster_hosts(i["df"])[1]),
+         lambda: {"df": state["priced"].copy()}),
+        ("build_recommendation_scores", keep("scored", lambda i: build_recommendation_scores(i["df"])),
+         lambda: {"df": state["clustered"]}),
+        ("filter_by_preferences", lambda i: filter_by_preferences(i["df"], **PREFERENCES),
+         lambda: {"df": state["scored"]}),
+        ("compute_metrics", lambda i: compute_metrics(i["df"]), lambda: {"df": state["scored"]}),
+    ]
+
+def _rows(out: Any) -> int:
+    if isinstance(out, pd.DataFrame):
+        return len(out)
+    if isinstance(out, tuple) and out and isinstance(out[0], dict):
+        return len(out[0])
+    return 0
+
+def measure(fn: Callable, make_inputs: Callable, repeat: int) -> Dict[str, float]:
+    times = []
+    out = None
+    for _ in range(repeat):
+        inputs = make_inputs()
+        t0 = time.perf_counter()
+        out = fn(inputs)
+        times.append(time.perf_counter() - t0)
+    inputs = make_inputs()
+    tracemalloc.start()
+    fn(inputs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(min(times), 4), "peak_mb": round(peak / 2**20, 2), "rows": _rows(out)}
+
+def run_size(size: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    files = snapshot_files(size)
+    results = {}
+    for name, fn, make_inputs in _stages(files):
+        results[name] = measure(fn, make_inputs, repeat)
+        r = results[name]
+        print(f"[{size}] {name:<28} {r['seconds']:>9.3f}s {r['peak_mb']:>9.1f} MB peak {r['rows']:>9} rows")
+    return results
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "scikit-learn": sklearn.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "recorded_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+
+def load_baselines(path: Path = BASELINE_PATH) -> Dict[str, Any]:
+    if not path.exists():
+        return {"environment": {}, "results": {}}
+    return json.loads(path.read_text())
+
+def compare(results: Dict[str, Dict[str, Dict[str, float]]], baselines: Dict[str, Any],
+            tolerance: float) -> List[str]:
+    """
+    Human-readable regressions: time or peak memory above baseline * (1 + tolerance).
+    """
+    regressions = []
+    for size, stages in results.items():
+        for stage, r in stages.items():
+            base = baselines.get("results", {}).get(size, {}).get(stage)
+            if not base:
+                continue
+            for key, unit in (("seconds", "s"), ("peak_mb", " MB")):
+                if base[key] and r[key] > base[key] * (1 + tolerance):
+                    regressions.append(f"{size} {stage}: {key} {r[key]}{unit} vs baseline {base[key]}{unit} "
+                                       f"(+{(r[key] / base[key] - 1) * 100:.0f}%)")
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["10k"], choices=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown/memory growth (0.25 = 25%%)")
+    parser.add_argument("--save", action="store_true", help="write results into baselines.json")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--output", type=Path, help="also write this run's results as JSON")
+    args = parser.parse_args(argv)
+    # train_price_model assigns into a dropna() slice; the warning repeats every run
+    warnings.simplefilter("ignore", pd.errors.SettingWithCopyWarning)
+    problems = check_canonical_schema() + check_insideairbnb_upload() + check_source_cache_isolation()
+    for line in problems:
+        print(f"SCHEMA {line}")
+    if problems:
+        return 1
+
+    results = {size: run_size(size, args.repeat if SIZES[size] <= 100_000 else 1) for size in args.sizes}
+    baselines = load_baselines()
+    if args.output:
+        args.output.write_text(json.dumps({"environment": environment(), "results": results}, indent=2))
+    regressions = compare(results, baselines, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if args.save:
+        baselines["environment"] = environment()
+        baselines.setdefault("results", {}).update(results)
+        BASELINE_PATH.write_text(json.dumps(baselines, indent=2) + "\n")
+        print(f"Saved baselines for {', '.join(args.sizes)} -> {BASELINE_PATH}")
+    elif not regressions and baselines.get("results"):
+        print("No regressions against baselines.")
+    return 1 if regressions and args.fail_on_regression else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+from __future__ import annotations
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from src.data_preprocessing import load_data, clean_data
+from src.model_training import PRICE_FEATURES
+
+if TYPE_CHECKING:
+    from src.scraper import CityCatalog, DatasetVersion
+
+def _default_model():
+    from sklearn.linear_model import LinearRegression
+    return LinearRegression
+
+FEATURE_CACHE_DIR = Path("data/cache/features")
+
+@dataclass
+class BacktestPair:
+    city: str
+    train_date: str
+    test_date: str
+    train_version: DatasetVersion
+    test_version: DatasetVersion
+
+@dataclass
+class BacktestReport:
+    errors: pd.DataFrame
+    timings: pd.DataFrame
+
+def snapshot_pairs(city: str, entry: CityCatalog, max_pairs: Optional[int] = None) -> List[BacktestPair]:
+    """
+    Consecutive (t, t+1) snapshot pairs from a city's version history, oldest first.
+    """
+    dates = sorted(entry.versions.keys())
+    pairs = [
+        BacktestPair(city, a, b, entry.versions[a], entry.versions[b])
+        for a, b in zip(dates, dates[1:])
+    ]
+    return pairs[-max_pairs:] if max_pairs else pairs
+
+def feature_cache_path(city: str, date: str) -> Path:
+    return FEATURE_CACHE_DIR / f"{city}_{date}_features.pkl"
+
+def snapshot_features(city: str, date: str, version: DatasetVersion, force: bool = False) -> Path:
+    """
+    Download/parse one snapshot and cache only the model columns.
+    Returns the cache path so workers can read it without re-parsing the CSV.
+    """
+    path = feature_cache_path(city, date)
+    if path.exists() and not force:
+        return path
+    from src.downloader import download_dataset
+    files = download_dataset(version, city=city, date=date)
+    df = clean_data(load_data(files["listings"], files["reviews"], files["neighbourhoods"]), source="InsideAirbnb")
+    cols = [c for c in ["id", *PRICE_FEATURES, "price"] if c in df.columns]
+    feats = df[cols].dropna(subset=[c for c in cols if c != "id"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    feats.to_pickle(path)
+    return path
+
+def _error_row(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float]:
+    err = y_pred - y_true
+    nonzero = y_true != 0
+    ape = np.abs(err[nonzero] / y_true[nonzero])
+    ss_tot = ((y_true - y_true.mean()) ** 2).sum()
+    return {
+        "mae": float(np.abs(err).mean()),
+        "rmse": float(np.sqrt((err ** 2).mean())),
+        "mape": float(ape.mean()) if len(ape) else np.nan,
+        "median_ape": float(np.median(ape)) if len(ape) else np.nan,
+        "r2": float(1 - (err ** 2).sum() / ss_tot) if ss_tot else np.nan,
+    }
+
+def evaluate_pair(
+    city: str,
+    train_date: str,
+    test_date: str,
+    train_path: Path,
+    test_path: Path,
+    model_factory: Optional[Callable] = None
+) -> Tuple[Dict, Dict]:
+    """
+    Fit on snapshot t, predict snapshot t+1. Runs inside a worker process.
+    """
+    t0 = time.perf_counter()
+    train = pd.read_pickle(train_path)
+    test = pd.read_pickle(test_path)
+    load_s = time.perf_counter() - t0
+    features = [c for c in PRICE_FEATURES if c in train.columns and c in test.columns]
+    if not features or train.empty or test.empty:
+        raise ValueError(f"No usable features for {city} {train_date} -> {test_date}")
+    model_factory = model_factory or _default_model()
+    model = model_factory()
+    t0 = time.perf_counter()
+    model.fit(train[features].to_numpy(), train["price"].to_numpy())
+    fit_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    pred = model.predict(test[features].to_numpy())
+    predict_s = time.perf_counter() - t0
+    key = {"city": city, "train_date": train_date, "test_date": test_date,
+           "model": getattr(model_factory, "__name__", type(model).__name__)}
+    errors = {**key, "n_train": len(train), "n_test": len(test),
+              **_error_row(test["price"].to_numpy(dtype=float), np.asarray(pred, dtype=float))}
+    timings = {**key, "load_s": load_s, "fit_s": fit_s, "predict_s": predict_s,
+               "fit_us_per_row": fit_s / len(train) * 1e6,
+               "predict_us_per_row": predict_s / len(test) * 1e6}
+    return errors, timings
+
+def run_backtests(
+    pairs: List[BacktestPair],
+    model_factory: Optional[Callable] = None,
+    max_workers: Optional[int] = None,
+    fetch_workers: int = 4,
+    force_features: bool = False
+) -> BacktestReport:
+    """
+    Train on t / evaluate on t+1 for every pair.
+    Snapshots are materialised once into the feature cache (I/O bound, threads),
+    then the train/evaluate pairs fan out over a process pool.
+    """
+    snapshots: Dict[Tuple[str, str], DatasetVersion] = {}
+    for p in pairs:
+        snapshots[(p.city, p.train_date)] = p.train_version
+        snapshots[(p.city, p.test_date)] = p.test_version
+
+    paths: Dict[Tuple[str, str], Path] = {}
+    failed: Dict[Tuple[str, str], str] = {}
+    with ThreadPoolExecutor(max_workers=fetch_workers) as pool:
+        futures = {
+            key: pool.submit(snapshot_features, key[0], key[1], ver, force_features)
+            for key, ver in snapshots.items()
+        }
+        for key, fut in futures.items():
+            try:
+                paths[key] = fut.result()
+            except Exception as e:
+                failed[key] = str(e)
+
+    error_rows, timing_rows = [], []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = []
+        for p in pairs:
+            tr, te = (p.city, p.train_date), (p.city, p.test_date)
+            if tr in failed or te in failed:
+                error_rows.append({"city": p.city, "train_date": p.train_date, "test_date": p.test_date,
+                                   "error": failed.get(tr) or failed.get(te)})
+                continue
+            futures.append((p, pool.submit(
+                evaluate_pair, p.city, p.train_date, p.test_date, paths[tr], paths[te], model_factory
+            )))
+        for p, fut in futures:
+            try:
+                errors, timings = fut.result()
+            except Exception as e:
+                error_rows.append({"city": p.city, "train_date": p.train_date, "test_date": p.test_date,
+                                   "error": str(e)})
+                continue
+            error_rows.append(errors)
+            timing_rows.append(timings)
+
+    return BacktestReport(errors=pd.DataFrame(error_rows), timings=pd.DataFrame(timing_rows))
+
+def backtest_cities(
+    catalog_entries: Dict[str, CityCatalog],
+    max_pairs_per_city: Optional[int] = 3,
+    **kwargs
+) -> BacktestReport:
+    """
+    Convenience wrapper: {city: CityCatalog} -> report across all cities.
+    """
+    pairs: List[BacktestPair] = []
+    for city, entry in catalog_entries.items():
+        pairs.extend(snapshot_pairs(city, entry, max_pairs_per_city))
+    return run_backtests(pairs, **kwargs)
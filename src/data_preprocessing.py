@@ -1,18 +1,33 @@
 from __future__ import annotations
+from pathlib import Path
+from typing import TYPE_CHECKING, List
 import pandas as pd
 from src.utils.safe_io import safe_read_listings, FileFormatError
+from src.schema_checks import canonicalize
+
+if TYPE_CHECKING:
+    from src.data_sources.pushdown import Predicates
 
 def load_data(
     listings_p: str,
     reviews_p: str | None = None,
-    neighborhoods_p: str | None = None
+    neighborhoods_p: str | None = None,
+    columns: List[str] | None = None,
+    where: Predicates | None = None,
+    source: str | None = None
 ) -> pd.DataFrame:
     """
     Loads and merges listings CSV (required), plus reviews and neighborhood CSVs (optional).
     Returns a DataFrame with merged columns if possible.
+    With columns/where (see data_sources.pushdown) only those listings columns are parsed
+    and non-matching rows are dropped while reading; names are then already canonical.
     """
     try:
-        listings_df = safe_read_listings(listings_p)
+        if columns is None and not where:
+            listings_df = safe_read_listings(listings_p)
+        else:
+            from src.data_sources.pushdown import read_csv_pushdown
+            listings_df = read_csv_pushdown(listings_p, columns, where, source=source)
     except FileFormatError as e:
         raise RuntimeError(f"Listings file invalid: {e}")
     except Exception as e:
@@ -21,7 +36,8 @@ def load_data(
     # Merge reviews if provided
     if reviews_p:
         try:
-            reviews_df = pd.read_csv(reviews_p)
+            # Only the listing id is needed for the count; skip parsing review text
+            reviews_df = pd.read_csv(reviews_p, usecols=lambda c: c == "listing_id")
             # If reviews have 'listing_id', merge number of reviews to listings
             if "id" in listings_df.columns and "listing_id" in reviews_df.columns:
                 count_series = reviews_df.groupby("listing_id").size().rename("num_reviews")
@@ -34,20 +50,32 @@ def load_data(
 
     return listings_df
 
-def clean_data(df: pd.DataFrame, save_path: str | None = None) -> pd.DataFrame:
+def clean_data(df: pd.DataFrame, save_path: str | None = None, source: str | None = None) -> pd.DataFrame:
     """
     Cleans up columns and types in the given DataFrame.
+    - Renames columns to the canonical schema (see schema_checks.canonicalize).
     - Converts price, latitude, longitude to numeric.
     - Saves to CSV if save_path is provided.
     """
+    df = coerce_types(canonicalize(df, source))
+    # Add more cleaning steps as needed
+
+    if save_path is not None:
+        Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(save_path, index=False)
+    return df
+
+def coerce_types(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converts price, latitude, longitude (canonical names) to numeric.
+    """
     if "price" in df.columns:
+        if df["price"].dtype == object:
+            # InsideAirbnb ships prices as "$1,234.00"
+            df["price"] = df["price"].astype(str).str.replace(r"[^\d\.\-]", "", regex=True)
         df["price"] = pd.to_numeric(df["price"], errors="coerce")
     if "latitude" in df.columns:
         df["latitude"] = pd.to_numeric(df["latitude"], errors="coerce")
     if "longitude" in df.columns:
         df["longitude"] = pd.to_numeric(df["longitude"], errors="coerce")
-    # Add more cleaning steps as needed
-
-    if save_path is not None:
-        df.to_csv(save_path, index=False)
-    return df
\ No newline at end of file
+    return df
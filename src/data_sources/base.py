@@ -1,9 +1,13 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Dict, Any, Type, List
+from importlib import import_module
+from typing import TYPE_CHECKING, Dict, Any, Optional, Sequence, Type, List
 import pandas as pd
 
+if TYPE_CHECKING:
+    from src.data_sources.pushdown import Predicates
+
 @dataclass
 class SourceResult:
     df: pd.DataFrame
@@ -11,13 +15,41 @@ class SourceResult:
 
 class DataSource(ABC):
     source_type: str
+    # Registry-level result caching (see data_sources.caching)
+    cacheable: bool = True
+    cache_ttl: Optional[float] = None  # seconds; None = until evicted
+    # Params that change how a load runs but not what it returns
+    cache_exclude = frozenset({"force", "cache_mode", "max_concurrency", "allow_cached_if_blocked"})
     def __init__(self, **kwargs):
         self.params = kwargs
     @abstractmethod
-    def load(self) -> SourceResult:
+    def load(self, columns: Optional[Sequence[str]] = None, where: Optional[Predicates] = None) -> SourceResult:
+        """
+        columns: canonical columns to return (None = all); where: row predicates.
+        Sources push both down as far as they can (see data_sources.pushdown).
+        """
         ...
+    def cache_validators(self) -> Dict[str, Any]:
+        """
+        Upstream freshness tokens (ETag, Last-Modified, file hashes) folded into the
+        cache key. Local files and uploads in params are hashed automatically.
+        """
+        return {}
+    def on_cache_hit(self, result: SourceResult) -> None:
+        """
+        Side effects load() has to keep even when a full load is served from the
+        cache (e.g. the snapshot history); must be idempotent. Outputs written once
+        per computed entry, like data/processed CSVs, do not belong here.
+        """
 
 _DATA_SOURCE_REGISTRY: Dict[str, Type[DataSource]] = {}
+# Built-in sources register on import; build_source imports them on first use
+_BUILTIN_SOURCES = {
+    "InsideAirbnb": "src.data_sources.insideairbnb_source",
+    "LocalCSVUpload": "src.data_sources.csv_upload_source",
+    "DirectCSVURL": "src.data_sources.direct_csv_url_source",
+    "ExternalSiteURL": "src.data_sources.external_site_source",
+}
 
 def register_source(cls: Type[DataSource]) -> Type[DataSource]:
     key = cls.source_type
@@ -27,9 +59,20 @@ def register_source(cls: Type[DataSource]) -> Type[DataSource]:
     return cls
 
 def available_sources() -> List[str]:
-    return list(_DATA_SOURCE_REGISTRY.keys())
+    return list(dict.fromkeys([*_DATA_SOURCE_REGISTRY, *_BUILTIN_SOURCES]))
 
-def build_source(source_type: str, **kwargs) -> DataSource:
+def build_source(source_type: str, cache: bool = True, **kwargs) -> DataSource:
+    """
+    Instantiate a registered source. With cache=True (default) the source is wrapped
+    in a CachedSource, so repeated loads of the same inputs are served from the
+    shared source cache.
+    """
+    if source_type not in _DATA_SOURCE_REGISTRY and source_type in _BUILTIN_SOURCES:
+        import_module(_BUILTIN_SOURCES[source_type])
     if source_type not in _DATA_SOURCE_REGISTRY:
         raise KeyError(f"Unknown data source: {source_type}")
-    return _DATA_SOURCE_REGISTRY[source_type](**kwargs)
\ No newline at end of file
+    source = _DATA_SOURCE_REGISTRY[source_type](**kwargs)
+    if cache and source.cacheable:
+        from src.data_sources.caching import CachedSource
+        return CachedSource(source)
+    return source
@@ -0,0 +1,170 @@
+from __future__ import annotations
+import dataclasses
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+import pandas as pd
+from src.data_sources.base import DataSource, SourceResult
+from src.data_sources.pushdown import Predicates, query_key
+from src.pipelines.analysis_cache import AnalysisCache, bytes_fingerprint, fingerprint
+from src.utils.tracing import span
+
+SOURCE_CACHE_DIR = Path("data/cache/sources")
+_CACHE: Optional[AnalysisCache] = None
+_CACHE_LOCK = threading.Lock()
+_STATS: Dict[str, Dict[str, int]] = {}
+_STATS_LOCK = threading.Lock()
+_FILE_HASHES: Dict[Tuple[str, int, int], str] = {}
+# params fingerprint -> (cache key, validated at); see CachedSource._cache_key
+_VALIDATED: Dict[str, Tuple[str, float]] = {}
+
+def get_source_cache() -> AnalysisCache:
+    """
+    Process-wide store for SourceResult frames: memory LRU over Arrow IPC files on
+    disk (or pickle without pyarrow), each level size bounded, entries expire by TTL.
+    """
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = AnalysisCache(
+                memory_budget_bytes=512 * 1024 * 1024,
+                disk_budget_bytes=2 * 1024 * 1024 * 1024,
+                cache_dir=SOURCE_CACHE_DIR,
+            )
+        return _CACHE
+
+def file_sha256(path: Path) -> str:
+    """
+    Content hash of a local file, memoised on (path, size, mtime).
+    """
+    st = path.stat()
+    memo = (str(path.resolve()), st.st_size, st.st_mtime_ns)
+    digest = _FILE_HASHES.get(memo)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = _FILE_HASHES[memo] = h.hexdigest()
+    return digest
+
+def normalize_param(value: Any) -> Any:
+    """
+    JSON-stable form of one source parameter; files and uploads become content hashes.
+    """
+    if isinstance(value, dict):
+        return {str(k): normalize_param(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [normalize_param(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((normalize_param(v) for v in value), key=repr)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return normalize_param(dataclasses.asdict(value))
+    if isinstance(value, Path) or (isinstance(value, str) and value and os.path.isfile(value)):
+        path = Path(value)
+        return {"file_sha256": file_sha256(path)} if path.is_file() else str(path)
+    if isinstance(value, str):
+        return value.strip()
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if hasattr(value, "getvalue"):  # Streamlit UploadedFile, BytesIO
+        return {"bytes_sha256": bytes_fingerprint(value.getvalue())}
+    if hasattr(value, "read") and hasattr(value, "seek"):
+        pos = value.tell()
+        data = value.read()
+        value.seek(pos)
+        return {"bytes_sha256": bytes_fingerprint(data if isinstance(data, bytes) else str(data).encode())}
+    return repr(value)
+
+def key_params(source: DataSource) -> Any:
+    return normalize_param({k: v for k, v in source.params.items() if k not in source.cache_exclude})
+
+def source_cache_key(source: DataSource, params: Any = None) -> str:
+    return fingerprint(
+        source_type=source.source_type,
+        params=key_params(source) if params is None else params,
+        validators=normalize_param(source.cache_validators()),
+    )
+
+def _count(source_type: str, event: str) -> None:
+    with _STATS_LOCK:
+        counts = _STATS.setdefault(source_type, {"hits": 0, "misses": 0, "bypassed": 0})
+        counts[event] += 1
+
+def source_cache_stats() -> Dict[str, Any]:
+    """
+    Per source hit/miss/bypass counts plus the underlying cache's level stats.
+    """
+    cache = get_source_cache()
+    with _STATS_LOCK:
+        per_source = {k: dict(v) for k, v in _STATS.items()}
+    return {"sources": per_source, "cache": dict(cache.stats), "memory": cache.memory_usage()}
+
+class CachedSource(DataSource):
+    """
+    Memoizing wrapper returned by build_source. Keyed by source_type + normalized
+    params + the source's upstream validators; params["force"] recomputes and
+    replaces the entry. Every load hands out its own copy of the cached frame.
+    A columns/where load is answered from the full entry when one is cached (block
+    filtered on disk), otherwise pushed down to the source and cached under its own key.
+    A hit does not run the source's load(), so its side effects (data/processed CSVs,
+    the snapshot history) happen when the entry is computed; sources re-apply the ones
+    that must hold on every load in on_cache_hit. Sources with a cache_ttl are asked
+    for validators (a HEAD request for DirectCSVURL) at most once per cache_ttl.
+    """
+    def __init__(self, inner: DataSource, cache: Optional[AnalysisCache] = None):
+        super().__init__(**inner.params)
+        self.inner = inner
+        self.source_type = inner.source_type
+        self.cache = cache or get_source_cache()
+
+    def cache_validators(self) -> Dict[str, Any]:
+        return self.inner.cache_validators()
+
+    def _cache_key(self, refresh: bool) -> str:
+        # Within cache_ttl of the last validation the entry is still fresh, so the
+        # key it was stored under is reused without asking upstream again
+        ttl = self.inner.cache_ttl
+        params = key_params(self.inner)
+        memo_key = fingerprint(source_type=self.source_type, params=params)
+        memo = _VALIDATED.get(memo_key)
+        now = time.time()
+        if ttl and memo and not refresh and now - memo[1] < ttl:
+            return memo[0]
+        key = source_cache_key(self.inner, params)
+        if ttl:
+            _VALIDATED[memo_key] = (key, now)
+        return key
+
+    def load(self, columns: Optional[Sequence[str]] = None, where: Optional[Predicates] = None) -> SourceResult:
+        query = columns is not None or bool(where)
+        refresh = bool(self.params.get("force"))
+        with span(f"source:{self.source_type}", pushdown=query) as s:
+            try:
+                key = self._cache_key(refresh)
+            except Exception as e:
+                # Validators could not be read (offline, permissions): load uncached
+                _count(self.source_type, "bypassed")
+                s.set(cache="bypassed", reason=f"{type(e).__name__}: {e}")
+                return self.inner.load(columns, where)
+
+            served = self.cache.query(key, columns, where) if query and not refresh else None
+            if served is not None:
+                (df, meta), hit = served, True
+            else:
+                def compute() -> Tuple[pd.DataFrame, Dict[str, Any]]:
+                    result = self.inner.load(columns, where)
+                    return result.df, result.metadata
+
+                if query:
+                    key = fingerprint(base=key, **query_key(columns, where))
+                df, meta, hit = self.cache.get_or_compute(key, compute, ttl=self.inner.cache_ttl, refresh=refresh)
+            _count(self.source_type, "hits" if hit else "misses")
+            s.set(rows=len(df), cache="hit" if hit else "miss")
+        result = SourceResult(df=df, metadata={**meta, "cache": {"hit": hit, "key": key}})
+        if hit and not query:
+            self.inner.on_cache_hit(result)
+        return result
@@ -1,18 +1,28 @@
 from .base import DataSource, SourceResult, register_source
+from .pushdown import apply_query, needed_columns, read_csv_pushdown
 from src.data_preprocessing import clean_data
 import pandas as pd
 
 @register_source
 class CSVUploadSource(DataSource):
     source_type = "LocalCSVUpload"
-    def load(self) -> SourceResult:
+    def load(self, columns=None, where=None) -> SourceResult:
         listings_file = self.params["listings_file"]
         reviews_file = self.params.get("reviews_file")
-        df = pd.read_csv(listings_file)
+        query = columns is not None or bool(where)
+        if query:
+            read_cols = needed_columns(columns, where, extra=["id"] if reviews_file else ())
+            df = read_csv_pushdown(listings_file, read_cols, where, source=self.source_type)
+        else:
+            df = pd.read_csv(listings_file)
         if reviews_file:
-            rev_df = pd.read_csv(reviews_file)
+            rev_df = pd.read_csv(reviews_file, usecols=lambda c: c == "listing_id")
             if "id" in df.columns and "listing_id" in rev_df.columns:
                 counts = rev_df.groupby("listing_id").size().rename("num_reviews")
                 df = df.merge(counts, left_on="id", right_index=True, how="left")
-        df = clean_data(df, save_path="data/processed/manual_clean.csv")
-        return SourceResult(df=df, metadata={"source_label": "Manual Upload"})
\ No newline at end of file
+        # A partial frame must not replace the processed copy of the full upload
+        save_path = None if query else "data/processed/manual_clean.csv"
+        df = clean_data(df, save_path=save_path, source=self.source_type)
+        if query:
+            df = apply_query(df, columns)
+        return SourceResult(df=df, metadata={"source_label": "Manual Upload"})
@@ -1,24 +1,43 @@
 from .base import DataSource, SourceResult, register_source
+from .pushdown import apply_query, read_csv_pushdown
 from src.data_preprocessing import clean_data
 import pandas as pd
-import requests
 import gzip
 from io import BytesIO, StringIO
 
 @register_source
 class DirectCSVURLSource(DataSource):
     source_type = "DirectCSVURL"
-    def load(self) -> SourceResult:
+    cache_ttl = 3600.0  # fallback when the server sends no validators
+
+    def cache_validators(self):
+        from src.utils.http import get_client
+        try:
+            r = get_client().head(self.params["url"], timeout=15)
+        except Exception:
+            return {}
+        if r.status_code != 200:
+            return {}
+        return {h: r.headers[h] for h in ("ETag", "Last-Modified", "Content-Length") if h in r.headers}
+
+    def load(self, columns=None, where=None) -> SourceResult:
+        from src.utils.http import get_client  # requests is only needed once a URL is fetched
         url: str = self.params["url"]
-        r = requests.get(url, timeout=120)
+        r = get_client().get(url, timeout=120, cache_mode=self.params.get("cache_mode", "off"))
         r.raise_for_status()
         content = r.content
         if url.endswith(".gz"):
             with gzip.GzipFile(fileobj=BytesIO(content)) as gz:
                 text = gz.read().decode("utf-8", errors="replace")
-            df = pd.read_csv(StringIO(text))
+            buf = StringIO(text)
+        else:
+            buf = BytesIO(content)
+        query = columns is not None or bool(where)
+        if query:
+            df = read_csv_pushdown(buf, columns, where, source=self.source_type)
+            df = apply_query(clean_data(df, source=self.source_type), columns)
         else:
-            df = pd.read_csv(BytesIO(content))
-        df = clean_data(df, save_path="data/processed/direct_url_clean.csv")
+            df = pd.read_csv(buf)
+            df = clean_data(df, save_path="data/processed/direct_url_clean.csv", source=self.source_type)
         meta = {"source_label": "Direct CSV URL", "url": url}
         return SourceResult(df=df, metadata=meta)
\ No newline at end of file
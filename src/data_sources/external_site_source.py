@@ -1,38 +1,69 @@
 from .base import DataSource, SourceResult, register_source
-from src.data_preprocessing import clean_data
+from .pushdown import apply_query, needed_columns
+from src.data_preprocessing import clean_data, coerce_types
+from src.schema_checks import canonicalize, schema_mapping
+from src.utils.http import get_client
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import chain
+from urllib.parse import urljoin
 import pandas as pd
-import requests
+import soupsieve as sv
 from bs4 import BeautifulSoup
 
 @register_source
 class ExternalSiteSource(DataSource):
+    """
+    Scrape listing cards with CSS selectors.
+    Single page: url + listing_selector + field_map.
+    Crawl mode: seed_urls and/or page_url_template ("...?page={page}") and/or
+    next_selector (link to the next page), bounded by max_pages per seed and
+    max_concurrency requests in flight.
+    With columns/where, unneeded fields are never extracted and non-matching cards
+    are dropped page by page.
+    """
     source_type = "ExternalSiteURL"
-    def _extract_field(self, node, cfg):
-        sel = cfg.get("selector")
-        attr = cfg.get("attr", "text")
-        target = node.select_one(sel) if sel else node
-        if not target:
-            return None
-        if attr == "text":
-            return target.get_text(strip=True)
-        if attr.startswith("data-"):
-            return target.get(attr)
-        return target.get(attr)
-    def load(self) -> SourceResult:
-        url: str = self.params["url"]
-        listing_selector: str = self.params.get("listing_selector")
-        field_map = self.params.get("field_map", {})
-        resp = requests.get(url, timeout=120, headers={"User-Agent": "Mozilla/5.0"})
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-        listing_nodes = soup.select(listing_selector) if listing_selector else []
-        rows = []
-        for ln in listing_nodes:
-            row = {}
-            for col, cfg in field_map.items():
-                row[col] = self._extract_field(ln, cfg)
-            rows.append(row)
-        df = pd.DataFrame(rows)
+    cache_ttl = 3600.0  # listing pages change without validators
+    # Raw scraped fields -> canonical columns derived from them in _derive
+    DERIVED = {
+        "price_raw": ("price",),
+        "lat_raw": ("latitude",),
+        "lon_raw": ("longitude",),
+        "amenities_raw": ("amenities_list", "amenities_count"),
+    }
+
+    @staticmethod
+    def _compile_fields(field_map):
+        fields = []
+        for col, cfg in field_map.items():
+            sel = cfg.get("selector")
+            fields.append((col, sv.compile(sel) if sel else None, cfg.get("attr", "text")))
+        return fields
+
+    @staticmethod
+    def _extract_row(node, fields):
+        row = {}
+        for col, sel, attr in fields:
+            target = sel.select_one(node) if sel is not None else node
+            if not target:
+                row[col] = None
+            elif attr == "text":
+                row[col] = target.get_text(strip=True)
+            else:
+                row[col] = target.get(attr)
+        return row
+
+    def _prune_fields(self, field_map, columns, where):
+        needed = needed_columns(columns, where, extra=["id"])
+        if needed is None:
+            return field_map
+        canon = schema_mapping(tuple(field_map), self.source_type)
+        return {
+            col: cfg for col, cfg in field_map.items()
+            if col in needed or canon.get(col) in needed or set(self.DERIVED.get(col, ())) & set(needed)
+        }
+
+    @classmethod
+    def _derive(cls, df, amenities=True):
         if "price_raw" in df.columns:
             df["price"] = (
                 df["price_raw"].astype(str)
@@ -43,19 +74,111 @@ class ExternalSiteSource(DataSource):
             df["latitude"] = pd.to_numeric(df["lat_raw"], errors="coerce")
         if "lon_raw" in df.columns:
             df["longitude"] = pd.to_numeric(df["lon_raw"], errors="coerce")
-        if "amenities_raw" in df.columns:
+        if amenities and "amenities_raw" in df.columns:
             df["amenities_list"] = (
                 df["amenities_raw"].astype(str)
                 .str.split("[,|]", regex=True)
                 .apply(lambda x: [a.strip().lower() for a in x if a.strip()] if isinstance(x, list) else [])
             )
             df["amenities_count"] = df["amenities_list"].apply(len)
+        return df
+
+    def _filter_rows(self, rows, fields, where):
+        # Evaluate the predicates on a throwaway canonical view of one page's cards
+        view = pd.DataFrame.from_records(rows, columns=[col for col, _, _ in fields])
+        view = coerce_types(canonicalize(self._derive(view, amenities=False), self.source_type))
+        return [row for row, keep in zip(rows, where.mask(view)) if keep]
+
+    def _fetch_page(self, url, listing_sel, next_sel, fields, parser, cache_mode, where=None):
+        resp = get_client().get(url, timeout=120, headers={"User-Agent": "Mozilla/5.0"}, cache_mode=cache_mode)
+        resp.raise_for_status()
+        soup = BeautifulSoup(resp.text, parser)
+        nodes = listing_sel.select(soup) if listing_sel is not None else []
+        rows = [self._extract_row(n, fields) for n in nodes]
+        scanned = len(rows)
+        if where and rows:
+            rows = self._filter_rows(rows, fields, where)
+        next_url = None
+        if next_sel is not None:
+            link = next_sel.select_one(soup)
+            href = link.get("href") if link else None
+            if href:
+                next_url = urljoin(resp.url or url, href)
+        return rows, next_url, scanned
+
+    def _crawl(self, seeds, listing_sel, next_sel, fields, max_pages, max_concurrency, parser, cache_mode,
+               where=None):
+        results, trace, errors = {}, [], []
+        visited = set(seeds)
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            pending = {
+                pool.submit(self._fetch_page, u, listing_sel, next_sel, fields, parser, cache_mode, where): (i, 0, u)
+                for i, u in enumerate(seeds)
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    seed_idx, page_no, url = pending.pop(fut)
+                    try:
+                        rows, next_url, scanned = fut.result()
+                    except Exception as e:
+                        errors.append(e)
+                        trace.append({"url": url, "error": str(e)})
+                        continue
+                    results[(seed_idx, page_no)] = rows
+                    trace.append({"url": url, "rows": len(rows), "scanned": scanned})
+                    # Follow on scanned cards: a page whose cards were all filtered out is not the last one
+                    if next_url and scanned and page_no + 1 < max_pages and next_url not in visited:
+                        visited.add(next_url)
+                        nxt = pool.submit(self._fetch_page, next_url, listing_sel, next_sel, fields, parser,
+                                          cache_mode, where)
+                        pending[nxt] = (seed_idx, page_no + 1, next_url)
+        if errors and not results:
+            raise errors[0]
+        # Rows stream straight from the per-page lists into one frame, in seed/page order
+        rows = chain.from_iterable(results[k] for k in sorted(results))
+        return rows, trace
+
+    def load(self, columns=None, where=None) -> SourceResult:
+        url: str = self.params.get("url")
+        listing_selector: str = self.params.get("listing_selector")
+        field_map = self._prune_fields(self.params.get("field_map", {}), columns, where)
+        cache_mode = self.params.get("cache_mode", "write")
+        template = self.params.get("page_url_template")
+        next_selector = self.params.get("next_selector")
+        start_page = self.params.get("start_page", 1)
+        max_pages = self.params.get("max_pages", 1 if not (template or next_selector) else 20)
+        seeds = list(self.params.get("seed_urls") or ([url] if url else []))
+        if template:
+            seeds += [template.format(page=p) for p in range(start_page, start_page + max_pages)]
+        seeds = list(dict.fromkeys(seeds))
+        if not seeds:
+            raise ValueError("ExternalSiteSource needs url, seed_urls or page_url_template.")
+
+        rows, trace = self._crawl(
+            seeds,
+            sv.compile(listing_selector) if listing_selector else None,
+            sv.compile(next_selector) if next_selector else None,
+            self._compile_fields(field_map),
+            max_pages=max_pages,
+            max_concurrency=self.params.get("max_concurrency", 8),
+            parser=self.params.get("parser", "lxml"),
+            cache_mode=cache_mode,
+            where=where
+        )
+        df = self._derive(pd.DataFrame.from_records(rows, columns=list(field_map.keys()) or None))
         if "id" not in df.columns:
             df["id"] = df.index.astype(str)
-        df = clean_data(df, save_path="data/processed/external_clean.csv")
+        query = columns is not None or bool(where)
+        df = clean_data(df, save_path=None if query else "data/processed/external_clean.csv", source=self.source_type)
+        if query:
+            df = apply_query(df, columns)
         meta = {
             "source_label": "External Site",
-            "url": url,
-            "extracted_rows": len(df)
+            "url": url or seeds[0],
+            "extracted_rows": len(df),
+            "pages_fetched": sum(1 for t in trace if "error" not in t),
+            "pages_failed": sum(1 for t in trace if "error" in t),
+            "crawl_trace": trace
         }
-        return SourceResult(df=df, metadata=meta)
\ No newline at end of file
+        return SourceResult(df=df, metadata=meta)
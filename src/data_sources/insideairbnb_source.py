@@ -1,12 +1,17 @@
 from .base import DataSource, SourceResult, register_source
+from .pushdown import apply_query, needed_columns
 from src.downloader import download_dataset
 from src.data_preprocessing import load_data, clean_data
 from src.scraper import DatasetVersion
+from src.history_store import record_snapshot
+from src.pipelines.calendar_features import calendar_features, merge_calendar_features
+from src.pipelines.review_sentiment import review_sentiment, merge_review_sentiment
 
 @register_source
 class InsideAirbnbSource(DataSource):
     source_type = "InsideAirbnb"
-    def load(self) -> SourceResult:
+    # city/date snapshots are immutable; the key covers version URLs and feature flags
+    def load(self, columns=None, where=None) -> SourceResult:
         version: DatasetVersion = self.params["version"]
         city: str = self.params["city"]
         date: str = self.params["date"]
@@ -19,14 +24,40 @@ class InsideAirbnbSource(DataSource):
             date=date,
             force=force,
             override_listings_url=override_url,
-            allow_cached_if_blocked=allow_cached
+            allow_cached_if_blocked=allow_cached,
+            include_calendar=self.params.get("include_calendar", False)
         )
-        df = load_data(files["listings"], files["reviews"], files["neighbourhoods"])
-        df = clean_data(df, save_path=f"data/processed/{city}_{date}_clean.csv")
+        query = columns is not None or bool(where)
+        df = load_data(
+            files["listings"], files["reviews"], files["neighbourhoods"],
+            columns=needed_columns(columns, where, extra=["id"]), where=where, source=self.source_type
+        )
+        if query:
+            # Partial frames stay out of data/processed and the snapshot history
+            df = clean_data(df, source=self.source_type)
+        else:
+            df = clean_data(df, save_path=f"data/processed/{city}_{date}_clean.csv", source=self.source_type)
+            self._record_history(df)
+        if files.get("calendar"):
+            df = merge_calendar_features(df, calendar_features(files["calendar"], city, date, force=force))
+        if self.params.get("review_sentiment") and files.get("reviews"):
+            df = merge_review_sentiment(df, review_sentiment(files["reviews"], city, date, force=force))
+        if query:
+            df = apply_query(df, columns)
         meta = {
             "source_label": f"{city} {date}",
             "files": files,
             "blocked": files.get("blocked"),
             "status_info": files.get("status_info")
         }
-        return SourceResult(df=df, metadata=meta)
\ No newline at end of file
+        return SourceResult(df=df, metadata=meta)
+
+    def _record_history(self, df) -> None:
+        # Override listings are not the city/date snapshot; recording them would
+        # also block the real snapshot, since existing partitions are never rewritten
+        if not self.params.get("override_listings_url"):
+            record_snapshot(df, self.params["city"], self.params["date"])
+
+    def on_cache_hit(self, result: SourceResult) -> None:
+        # A no-op once the partition exists; restores it if the history was cleared
+        self._record_history(result.df)
\ No newline at end of file
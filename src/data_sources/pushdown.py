@@ -0,0 +1,156 @@
+"""
+Projection and predicate pushdown for DataSource.load(columns=..., where=...).
+
+Column names are canonical (see schema_checks); each source maps them back to its
+raw fields so that less is parsed:
+
+    where = Predicates(price_max=150, room_types=("Entire home/apt",), bbox=(52.35, 4.85, 52.39, 4.92))
+    build_source("DirectCSVURL", url=url).load(columns=["id", "price", "latitude", "longitude"], where=where)
+
+Rows with a missing value in a filtered column never match.
+"""
+from __future__ import annotations
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from src.data_preprocessing import coerce_types
+from src.schema_checks import accept_ambiguous, ambiguous_candidates, schema_mapping
+
+CSV_CHUNK_ROWS = 100_000
+
+@dataclass(frozen=True)
+class Predicates:
+    price_min: Optional[float] = None
+    price_max: Optional[float] = None
+    room_types: Optional[Tuple[str, ...]] = None
+    bbox: Optional[Tuple[float, float, float, float]] = None  # (min_lat, min_lon, max_lat, max_lon)
+
+    def __post_init__(self):
+        if isinstance(self.room_types, str):
+            object.__setattr__(self, "room_types", (self.room_types,))
+        elif self.room_types is not None:
+            object.__setattr__(self, "room_types", tuple(sorted(self.room_types)))
+        if self.bbox is not None:
+            object.__setattr__(self, "bbox", tuple(float(v) for v in self.bbox))
+
+    def __bool__(self) -> bool:
+        return any(v is not None for v in asdict(self).values())
+
+    def _ranges(self) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+        ranges = {}
+        if self.price_min is not None or self.price_max is not None:
+            ranges["price"] = (self.price_min, self.price_max)
+        if self.bbox is not None:
+            ranges["latitude"] = (self.bbox[0], self.bbox[2])
+            ranges["longitude"] = (self.bbox[1], self.bbox[3])
+        return ranges
+
+    @property
+    def columns(self) -> List[str]:
+        cols = list(self._ranges())
+        if self.room_types is not None:
+            cols.append("room_type")
+        return cols
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Boolean row mask over canonical, type-coerced columns.
+        """
+        keep = np.ones(len(df), dtype=bool)
+        for col, (lo, hi) in self._ranges().items():
+            if col not in df.columns:
+                return np.zeros(len(df), dtype=bool)
+            values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            with np.errstate(invalid="ignore"):
+                if lo is not None:
+                    keep &= values >= lo
+                if hi is not None:
+                    keep &= values <= hi
+        if self.room_types is not None:
+            if "room_type" not in df.columns:
+                return np.zeros(len(df), dtype=bool)
+            keep &= df["room_type"].isin(self.room_types).to_numpy()
+        return keep
+
+    def may_match(self, stats: Dict[str, Tuple[Any, Any]]) -> bool:
+        """
+        False when per-block (min, max) column stats prove no row can match.
+        """
+        for col, (lo, hi) in self._ranges().items():
+            if col not in stats:
+                continue
+            bmin, bmax = stats[col]
+            if bmin is None:  # all null
+                return False
+            if (lo is not None and bmax < lo) or (hi is not None and bmin > hi):
+                return False
+        return True
+
+def needed_columns(columns: Optional[Sequence[str]], where: Optional[Predicates],
+                   extra: Sequence[str] = ()) -> Optional[List[str]]:
+    """
+    Canonical columns a source has to read, or None for all of them.
+    """
+    if columns is None:
+        return None
+    return list(dict.fromkeys([*columns, *(where.columns if where else []), *extra]))
+
+def apply_query(df: pd.DataFrame, columns: Optional[Sequence[str]] = None,
+                where: Optional[Predicates] = None) -> pd.DataFrame:
+    """
+    Post-filter for whatever a source could not push down. Requested columns the
+    frame does not have are left out.
+    """
+    if where:
+        df = df[where.mask(df)].reset_index(drop=True)
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df
+
+def query_key(columns: Optional[Sequence[str]], where: Optional[Predicates]) -> Dict[str, Any]:
+    return {"columns": list(columns) if columns is not None else None,
+            "where": asdict(where) if where else None}
+
+def _rewind(buf: Any, pos: Optional[int]) -> None:
+    if pos is not None:
+        buf.seek(pos)
+
+def read_csv_pushdown(
+    src: Any,
+    columns: Optional[Sequence[str]] = None,
+    where: Optional[Predicates] = None,
+    source: Optional[str] = None,
+    chunksize: int = CSV_CHUNK_ROWS,
+    **read_kwargs
+) -> pd.DataFrame:
+    """
+    Read a CSV path or buffer with `usecols` limited to the (canonical) columns asked
+    for and rows filtered chunk by chunk, so only matching rows are ever held.
+    The result has canonical names and coerced price/latitude/longitude.
+    """
+    pos = src.tell() if hasattr(src, "seek") else None
+    header = list(pd.read_csv(src, nrows=0, **read_kwargs).columns)
+    _rewind(src, pos)
+    mapping = schema_mapping(tuple(header), source)
+    candidates = ambiguous_candidates(tuple(header), source)
+    canon = {c: mapping.get(c, candidates.get(c, c)) for c in header}
+    wanted = needed_columns(columns, where)
+    usecols = header if wanted is None else [c for c in header if canon[c] in wanted]
+    parts = []
+    rename = None
+    for chunk in pd.read_csv(src, usecols=usecols, chunksize=chunksize, **read_kwargs):
+        if rename is None:
+            # Generic aliases are decided once, on the first chunk's values
+            accepted = accept_ambiguous(chunk, candidates)
+            rejected = [c for c in candidates if c in chunk.columns and c not in accepted]
+            rename = {**mapping, **accepted}
+            # Read only as a guess for a wanted column; the values said otherwise
+            drop = rejected if wanted is not None else []
+        chunk = coerce_types(chunk.drop(columns=drop).rename(columns=rename))
+        if where:
+            chunk = chunk[where.mask(chunk)]
+        parts.append(chunk)
+    if not parts:
+        return pd.DataFrame(columns=[canon[c] for c in usecols])
+    return pd.concat(parts, ignore_index=True)
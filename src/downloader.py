@@ -3,11 +3,9 @@ from pathlib import Path
 from typing import Optional, Dict, Tuple, List
 import time
 import random
-import requests
 from src.scraper import DatasetVersion, HEADERS  # existing scraper module
 
-RAW_DIR = Path("data/raw")
-RAW_DIR.mkdir(parents=True, exist_ok=True)
+RAW_DIR = Path("data/raw")  # created on first download, not at import
 
 MIN_VALID_SIZE_BYTES = 8_000  # avoid tiny HTML 403 pages
 USER_AGENTS: List[str] = [
@@ -26,39 +24,45 @@ BASE_HEADERS = {
     "DNT": "1",
 }
 
-session = requests.Session()
-session.headers.update(HEADERS)
-
 def _is_gzip(b: bytes) -> bool:
     return len(b) >= 2 and b[0] == 0x1F and b[1] == 0x8B
 
-def _save_file(city: str, date: str, base: str, suffix: str, data: bytes) -> Path:
-    p = RAW_DIR / f"{city}_{date}_{base}{suffix}"
-    p.write_bytes(data)
-    return p
+def _request_headers() -> Dict[str, str]:
+    return {**HEADERS, **BASE_HEADERS, "User-Agent": random.choice(USER_AGENTS)}
 
-def _fetch(url: str, timeout: int = 90):
+def _stream(url: str, dest: Path, headers: Dict[str, str], timeout: int = 90) -> Tuple[int, int]:
+    import requests
+    from src.utils.http import get_client
     try:
-        r = session.get(url, timeout=timeout, allow_redirects=True)
-        return r.status_code, r.content, dict(r.headers)
+        status, size, _ = get_client().stream_to_file(url, dest, timeout=timeout, headers=headers)
+        return status, size
     except requests.RequestException:
-        return 0, b"", {}
-
-def _try_download(url: str, expect_gzip: bool, city: str, date: str, base_name: str):
-    status, data, _ = _fetch(url)
-    note = f"http {status}, {len(data)} bytes"
-    if status != 200 or len(data) < MIN_VALID_SIZE_BYTES:
+        return 0, 0
+
+def _try_download(url: str, expect_gzip: bool, city: str, date: str, base_name: str,
+                  headers: Dict[str, str]):
+    # Body is streamed to a .part file so large snapshots never sit in memory
+    RAW_DIR.mkdir(parents=True, exist_ok=True)
+    part = RAW_DIR / f"{city}_{date}_{base_name}.part"
+    status, size = _stream(url, part, headers)
+    note = f"http {status}, {size} bytes"
+    if status != 200 or size < MIN_VALID_SIZE_BYTES:
+        part.unlink(missing_ok=True)
         return None, note
-    if expect_gzip and _is_gzip(data):
-        return _save_file(city, date, base_name, ".csv.gz", data), f"{note} (gz)"
-    if url.endswith(".csv"):
-        return _save_file(city, date, base_name, ".csv", data), note
-    if expect_gzip and not _is_gzip(data):
+    with open(part, "rb") as f:
+        gz = _is_gzip(f.read(2))
+    if expect_gzip and gz:
+        suffix, note = ".csv.gz", f"{note} (gz)"
+    elif url.endswith(".csv"):
+        suffix = ".csv"
+    elif expect_gzip and not gz:
         # fallback treat as plain
-        return _save_file(city, date, base_name, ".csv", data), f"{note} (plain)"
-    if url.endswith(".geojson"):
-        return _save_file(city, date, base_name, ".geojson", data), note
-    return _save_file(city, date, base_name, ".dat", data), note
+        suffix, note = ".csv", f"{note} (plain)"
+    elif url.endswith(".geojson"):
+        suffix = ".geojson"
+    else:
+        suffix = ".dat"
+    return part.replace(RAW_DIR / f"{city}_{date}_{base_name}{suffix}"), note
 
 def _cached_file(city: str, date: str, base: str) -> Optional[Path]:
     for suf in (".csv.gz", ".csv"):
@@ -75,14 +79,16 @@ def download_dataset(
     override_listings_url: Optional[str] = None,
     allow_cached_if_blocked: bool = True,
     max_retries: int = 4,
-    backoff_base: float = 1.2
+    backoff_base: float = 1.2,
+    include_calendar: bool = False
 ) -> Dict[str, Optional[Path]]:
     """
     Enhanced dataset downloader with:
       - Rotating User-Agent & retry
       - Override URL support
       - Fallback to cached even when force=True (if allow_cached_if_blocked)
-    Returns dict with keys: listings, reviews, neighbourhoods, status_info, blocked
+      - Optional calendar.csv.gz (include_calendar), streamed and reused unless force
+    Returns dict with keys: listings, reviews, neighbourhoods, calendar, status_info, blocked
     """
     attempts = []
     blocked = False
@@ -90,6 +96,7 @@ def download_dataset(
         "listings": None,
         "reviews": None,
         "neighbourhoods": None,
+        "calendar": None,
         "status_info": None,
         "blocked": None
     }
@@ -97,14 +104,10 @@ def download_dataset(
     def record(label: str, msg: str):
         attempts.append((label, msg))
 
-    def rotate_headers():
-        session.headers.update({**BASE_HEADERS, "User-Agent": random.choice(USER_AGENTS)})
-
     def try_retries(label: str, url: str, expect_gzip: bool, base_name: str):
         nonlocal blocked
         for attempt in range(1, max_retries + 1):
-            rotate_headers()
-            f, note = _try_download(url, expect_gzip, city, date, base_name)
+            f, note = _try_download(url, expect_gzip, city, date, base_name, _request_headers())
             record(f"{label}-try{attempt}", note)
             if f:
                 return f
@@ -146,6 +149,13 @@ def download_dataset(
     elif version.neighbourhoods_geojson_url:
         out["neighbourhoods"] = try_retries("neigh-geojson", version.neighbourhoods_geojson_url, False, "neighbourhoods")
 
+    if include_calendar and version.calendar_url:
+        out["calendar"] = None if force else _cached_file(city, date, "calendar")
+        if out["calendar"]:
+            record("calendar-cache", f"used {out['calendar'].name}")
+        else:
+            out["calendar"] = try_retries("calendar", version.calendar_url, True, "calendar")
+
     out["status_info"] = attempts
     out["blocked"] = blocked
 
@@ -1,12 +1,33 @@
 from __future__ import annotations
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 class ExtractionResult:
     def __init__(self, records: List[Dict[str, Any]], meta: Dict[str, Any]):
         self.records = records
         self.meta = meta
 
+class ParsedPage:
+    """
+    One fetched page, parsed lazily and at most once, shared by every extractor.
+    """
+    def __init__(self, url: str, html_text: str, parser: str = "lxml"):
+        self.url = url
+        self.html_text = html_text
+        self.parser = parser
+        self.parse_seconds = 0.0
+        self._soup = None
+
+    @property
+    def soup(self):
+        if self._soup is None:
+            from bs4 import BeautifulSoup
+            t0 = time.perf_counter()
+            self._soup = BeautifulSoup(self.html_text, self.parser)
+            self.parse_seconds = time.perf_counter() - t0
+        return self._soup
+
 class BaseExtractor(ABC):
     name: str = "base"
 
@@ -16,4 +37,8 @@ class BaseExtractor(ABC):
 
     @abstractmethod
     def extract(self, url: str, html_text: str) -> ExtractionResult:
-        ...
\ No newline at end of file
+        ...
+
+    def extract_page(self, page: ParsedPage) -> ExtractionResult:
+        # Extractors that work on a parsed tree override this to reuse page.soup
+        return self.extract(page.url, page.html_text)
@@ -1,9 +1,9 @@
 from __future__ import annotations
-from .base import BaseExtractor, ExtractionResult
+from .base import BaseExtractor, ExtractionResult, ParsedPage
 from typing import List, Dict, Any
-from bs4 import BeautifulSoup
+from bs4 import Tag
 import re
-from collections import Counter
+from collections import Counter, defaultdict
 
 PRICE_PATTERN = re.compile(r"(?:[$€£]|USD|EUR|GBP)\s?\d{1,6}(?:[.,]\d{2})?|\d{1,6}\s?(?:USD|EUR|GBP)", re.IGNORECASE)
 RATING_PATTERN = re.compile(r"\b\d(?:\.\d)?\b")
@@ -15,31 +15,43 @@ class RepeatingBlockExtractor(BaseExtractor):
         return True  # Fallback always tries
 
     def extract(self, url: str, html_text: str) -> ExtractionResult:
-        soup = BeautifulSoup(html_text, "lxml")
-        price_nodes = []
-        for node in soup.find_all(text=PRICE_PATTERN):
+        return self.extract_page(ParsedPage(url, html_text))
+
+    def extract_page(self, page: ParsedPage) -> ExtractionResult:
+        url = page.url
+        soup = page.soup
+        # Single walk: every element's signature is computed once and elements are
+        # grouped by signature (document order preserved within each group).
+        sig_of: Dict[int, str] = {}
+        groups: Dict[str, List[Tag]] = defaultdict(list)
+        for el in soup.descendants:
+            if not isinstance(el, Tag):
+                continue
+            sig = self.signature(el)
+            sig_of[id(el)] = sig
+            groups[sig].append(el)
+
+        price_sigs: List[str] = []
+        for node in soup.find_all(string=PRICE_PATTERN):
             parent = node.parent
             for _ in range(4):
                 if parent is None:
                     break
-                if len(list(parent.children)) > 2:
-                    price_nodes.append(parent)
+                if len(parent.contents) > 2:
+                    price_sigs.append(sig_of.get(id(parent)) or self.signature(parent))
                 parent = parent.parent
 
-        if not price_nodes:
+        if not price_sigs:
             return ExtractionResult(records=[], meta={"matched_price_nodes": 0})
 
-        sigs = [self.signature(el) for el in price_nodes]
-        freq = Counter(sigs)
+        freq = Counter(price_sigs)
         common_sigs = [sig for sig, _ in freq.most_common(4)]
 
         records: List[Dict[str, Any]] = []
         seen_links = set()
 
         for sig in common_sigs:
-            for el in soup.find_all():
-                if self.signature(el) != sig:
-                    continue
+            for el in groups.get(sig, ()):
                 text = el.get_text(" ", strip=True)
                 price_match = PRICE_PATTERN.search(text)
                 rating_match = RATING_PATTERN.search(text)
@@ -70,7 +82,8 @@ class RepeatingBlockExtractor(BaseExtractor):
 
         meta = {
             "extractor": self.name,
-            "price_nodes_examined": len(price_nodes),
+            "price_nodes_examined": len(price_sigs),
+            "elements_indexed": len(sig_of),
             "signatures_considered": freq.most_common(6),
             "records": len(records)
         }
@@ -80,5 +93,5 @@ class RepeatingBlockExtractor(BaseExtractor):
         if not hasattr(el, "name") or el.name is None:
             return "none"
         classes = "-".join(sorted(el.get("class", [])))
-        child_count = sum(1 for c in el.find_all(recursive=False) if getattr(c, "name", None))
-        return f"{el.name}|{classes}|{child_count}"
\ No newline at end of file
+        child_count = sum(1 for c in el.contents if isinstance(c, Tag))
+        return f"{el.name}|{classes}|{child_count}"
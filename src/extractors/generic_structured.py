@@ -1,5 +1,5 @@
 from __future__ import annotations
-from .base import BaseExtractor, ExtractionResult
+from .base import BaseExtractor, ExtractionResult, ParsedPage
 from typing import List, Dict, Any
 import json
 
@@ -15,6 +15,10 @@ class StructuredDataExtractor(BaseExtractor):
         return True  # Always attempt
 
     def extract(self, url: str, html_text: str) -> ExtractionResult:
+        return self.extract_page(ParsedPage(url, html_text))
+
+    def extract_page(self, page: ParsedPage) -> ExtractionResult:
+        url, html_text = page.url, page.html_text
         records: List[Dict[str, Any]] = []
         meta = {"method": None, "extractor": self.name}
 
@@ -67,10 +71,9 @@ class StructuredDataExtractor(BaseExtractor):
                     "review_count": review_count
                 })
         except ImportError:
-            # Fallback simple JSON-LD scan
-            from bs4 import BeautifulSoup
+            # Fallback simple JSON-LD scan on the shared tree
             meta["method"] = "jsonld_fallback"
-            soup = BeautifulSoup(html_text, "lxml")
+            soup = page.soup
             scripts = soup.find_all("script", {"type": "application/ld+json"})
             for sc in scripts:
                 try:
@@ -0,0 +1,89 @@
+from __future__ import annotations
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+from .base import BaseExtractor, ExtractionResult, ParsedPage
+from .registry import get_extractors
+from src.utils.response_cache import ResponseCache, get_response_cache
+
+def run_extractors(
+    url: str,
+    html_text: str,
+    extractors: Optional[List[BaseExtractor]] = None,
+    min_records: int = 1
+) -> ExtractionResult:
+    """
+    Run the registry chain over one page. The HTML is parsed once (ParsedPage)
+    and shared; the chain stops at the first extractor yielding min_records.
+    If none does, the extractor with the most records wins.
+    meta["extractors"] holds per-extractor timing and record counts.
+    """
+    page = ParsedPage(url, html_text)
+    trace = []
+    best: Optional[ExtractionResult] = None
+    best_name = None
+    for ex in extractors if extractors is not None else get_extractors():
+        if not ex.can_handle(url, html_text):
+            trace.append({"extractor": ex.name, "skipped": True})
+            continue
+        parsed_before = page.parse_seconds
+        t0 = time.perf_counter()
+        try:
+            res = ex.extract_page(page)
+        except Exception as e:
+            trace.append({"extractor": ex.name, "seconds": time.perf_counter() - t0, "records": 0, "error": str(e)})
+            continue
+        elapsed = time.perf_counter() - t0 - (page.parse_seconds - parsed_before)
+        trace.append({"extractor": ex.name, "seconds": elapsed, "records": len(res.records)})
+        if best is None or len(res.records) > len(best.records):
+            best, best_name = res, ex.name
+        if len(res.records) >= min_records:
+            break
+    records = best.records if best else []
+    meta = dict(best.meta) if best else {}
+    meta.update({
+        "url": url,
+        "selected_extractor": best_name,
+        "parse_seconds": page.parse_seconds,
+        "extractors": trace,
+    })
+    return ExtractionResult(records=records, meta=meta)
+
+def _run_one(args: Tuple[str, str, int]) -> ExtractionResult:
+    url, html_text, min_records = args
+    return run_extractors(url, html_text, min_records=min_records)
+
+def run_many(
+    pages: Iterable[Tuple[str, str]],
+    max_workers: Optional[int] = None,
+    min_records: int = 1,
+    use_processes: bool = True
+) -> List[ExtractionResult]:
+    """
+    Extract many (url, html_text) pages through a worker pool, preserving input order.
+    Parsing is CPU-bound, so processes are the default; threads avoid pickling
+    for small batches.
+    """
+    jobs = [(url, html, min_records) for url, html in pages]
+    if not jobs:
+        return []
+    pool_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with pool_cls(max_workers=max_workers) as pool:
+        return list(pool.map(_run_one, jobs, chunksize=max(1, len(jobs) // 32)))
+
+def run_cached(
+    url_prefix: Optional[str] = None,
+    cache: Optional[ResponseCache] = None,
+    **kwargs
+) -> List[ExtractionResult]:
+    """
+    Re-run extraction over pages in the raw response cache. No network access;
+    useful after tuning selectors or heuristics.
+    """
+    cache = cache or get_response_cache()
+    pages = [
+        (c.url, c.body.decode("utf-8", errors="replace"))
+        for c in cache.iter_responses(url_prefix)
+        if c.status == 200
+    ]
+    return run_many(pages, **kwargs)
@@ -0,0 +1,200 @@
+from __future__ import annotations
+import logging
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+from urllib.parse import quote, unquote
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from src.scraper import CityCatalog
+
+# pyarrow.dataset/parquet are imported where used: loaders import this module
+# for record_snapshot, and those submodules are slow to import
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+HISTORY_ROOT = Path("data/history")
+# Fixed schema so every city=/date= partition scans with the same columns
+HISTORY_FIELDS: Dict[str, str] = {
+    "id": "int64",
+    "neighbourhood": "string",
+    "room_type": "string",
+    "accommodates": "float64",
+    "price": "float64",
+    "availability_365": "float64",
+    "review_scores_rating": "float64",
+    "number_of_reviews": "float64",
+    "latitude": "float64",
+    "longitude": "float64",
+}
+AGGREGATES = {"median", "mean", "count", "sum", "min", "max"}
+
+class HistoryStore:
+    """
+    Hive-partitioned Parquet dataset (city=<city>/date=<date>/part-0.parquet) holding a
+    narrow, canonical slice of every loaded snapshot. Scans push the city/date
+    predicates down to partition pruning and read only the requested columns.
+    Requires pyarrow.
+    """
+    def __init__(self, root: Path = HISTORY_ROOT):
+        if pa is None:
+            raise RuntimeError("HistoryStore needs pyarrow (pip install pyarrow).")
+        import pyarrow.dataset as ds
+        self.root = Path(root)
+        self.schema = pa.schema([(name, pa.type_for_alias(t)) for name, t in HISTORY_FIELDS.items()])
+        self.partitioning = ds.partitioning(
+            pa.schema([("city", pa.string()), ("date", pa.string())]), flavor="hive"
+        )
+
+    def partition_path(self, city: str, date: str) -> Path:
+        return self.root / f"city={quote(city, safe='')}" / f"date={quote(date, safe='')}"
+
+    def has_partition(self, city: str, date: str) -> bool:
+        return (self.partition_path(city, date) / "part-0.parquet").exists()
+
+    def write(self, df: pd.DataFrame, city: str, date: str) -> Path:
+        """
+        Replace one city/date partition with the history columns of df.
+        """
+        out = pd.DataFrame(index=df.index)
+        for name, t in HISTORY_FIELDS.items():
+            if name not in df.columns:
+                out[name] = None
+            elif t == "string":
+                out[name] = df[name].astype("string")
+            else:
+                out[name] = pd.to_numeric(df[name], errors="coerce")
+        out = out.dropna(subset=["id"])
+        out["id"] = out["id"].astype(np.int64)
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(out, schema=self.schema, preserve_index=False)
+        target = self.partition_path(city, date)
+        target.mkdir(parents=True, exist_ok=True)
+        tmp = target / "part-0.parquet.tmp"
+        pq.write_table(table, tmp, compression="zstd")
+        os.replace(tmp, target / "part-0.parquet")
+        return target
+
+    def partitions(self, city: Optional[str] = None) -> pd.DataFrame:
+        rows = []
+        for city_dir in self.root.glob("city=*"):
+            for date_dir in city_dir.glob("date=*"):
+                if (date_dir / "part-0.parquet").exists():
+                    rows.append({"city": self._decode(city_dir.name), "date": self._decode(date_dir.name)})
+        out = pd.DataFrame(rows, columns=["city", "date"])
+        if city is not None:
+            out = out[out["city"] == city]
+        return out.sort_values(["city", "date"]).reset_index(drop=True)
+
+    @staticmethod
+    def _decode(segment: str) -> str:
+        return unquote(segment.split("=", 1)[1])
+
+    def _dataset(self):
+        import pyarrow.dataset as ds
+        return ds.dataset(self.root, format="parquet", partitioning=self.partitioning)
+
+    def scan(
+        self,
+        columns: Sequence[str],
+        cities: Optional[Sequence[str]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        where: Optional[Dict[str, Sequence]] = None
+    ) -> pd.DataFrame:
+        """
+        Read columns (plus city/date) for the matching partitions only.
+        where: {column: allowed values} predicates pushed into the Parquet scan.
+        """
+        if not self.root.exists():
+            return pd.DataFrame(columns=["city", "date", *columns])
+        import pyarrow.dataset as ds
+        expr = None
+        def _and(e):
+            nonlocal expr
+            expr = e if expr is None else expr & e
+        if cities:
+            _and(ds.field("city").isin(list(cities)))
+        if date_from:
+            _and(ds.field("date") >= date_from)
+        if date_to:
+            _and(ds.field("date") <= date_to)
+        for col, values in (where or {}).items():
+            _and(ds.field(col).isin(list(values)))
+        cols = list(dict.fromkeys(["city", "date", *columns]))
+        return self._dataset().to_table(columns=cols, filter=expr).to_pandas()
+
+    def time_series(
+        self,
+        metric: str = "price",
+        agg: str = "median",
+        city: Optional[str] = None,
+        by: Sequence[str] = (),
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        where: Optional[Dict[str, Sequence]] = None
+    ) -> pd.DataFrame:
+        """
+        One row per (date, *by) with agg(metric), e.g. the median price per
+        neighbourhood over time for one city.
+        """
+        if agg not in AGGREGATES:
+            raise ValueError(f"Unsupported aggregate: {agg}")
+        df = self.scan([metric, *by], cities=[city] if city else None,
+                       date_from=date_from, date_to=date_to, where=where)
+        keys = ["date", *by] if city else ["city", "date", *by]
+        return df.groupby(keys, observed=True)[metric].agg(agg).rename(f"{agg}_{metric}").reset_index()
+
+_STORE: Optional[HistoryStore] = None
+_WARNED_DISABLED = False
+
+def get_history_store() -> Optional[HistoryStore]:
+    """
+    Shared store, or None when pyarrow is not installed (logged once).
+    """
+    global _STORE, _WARNED_DISABLED
+    if _STORE is None and pa is not None:
+        _STORE = HistoryStore()
+    if _STORE is None and not _WARNED_DISABLED:
+        logger.warning("History store disabled: pyarrow is not installed (pip install pyarrow).")
+        _WARNED_DISABLED = True
+    return _STORE
+
+def record_snapshot(df: pd.DataFrame, city: str, date: str, overwrite: bool = False) -> bool:
+    """
+    Loader hook: add a cleaned snapshot to the history dataset once.
+    Never raises; history is best-effort and optional.
+    """
+    store = get_history_store()
+    if store is None or (store.has_partition(city, date) and not overwrite):
+        return False
+    try:
+        store.write(df, city, date)
+    except Exception as e:
+        logger.warning("Could not record %s/%s in the history store: %s", city, date, e)
+        return False
+    return True
+
+def backfill_city(city: str, entry: CityCatalog, dates: Optional[List[str]] = None) -> List[str]:
+    """
+    Download (or reuse raw files for) past snapshots of a city and ingest the missing ones.
+    """
+    from src.downloader import download_dataset
+    from src.snapshot_diff import read_listing_columns
+    store = get_history_store()
+    if store is None:
+        raise RuntimeError("History backfill needs pyarrow.")
+    added = []
+    for date in dates or sorted(entry.versions.keys()):
+        if store.has_partition(city, date):
+            continue
+        files = download_dataset(entry.versions[date], city=city, date=date)
+        store.write(read_listing_columns(files["listings"], list(HISTORY_FIELDS)), city, date)
+        added.append(date)
+    return added
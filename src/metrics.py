@@ -1,17 +1,11 @@
 import pandas as pd
+from src.pipelines.column_profile import ROLE_ALIASES, match_column
 
 def get_column(df, names):
     """
     Find a column that matches any name in the list, with some fuzziness.
     """
-    for name in names:
-        if name in df.columns:
-            return name
-    for col in df.columns:
-        for name in names:
-            if name.lower() in col.lower():
-                return col
-    return None
+    return match_column(df.columns, names)
 
 def safe_mean(series):
     """
@@ -37,26 +31,38 @@ def amenities_count(series):
         return 0
     return series.apply(count)
 
-def compute_metrics(df):
+def compute_metrics(df, profile=None):
     """
     Calculate averages and totals for key listing attributes.
     Returns a dictionary and the price column used.
+    With a DatasetProfile, columns and numeric means come from the profile.
     """
     metrics = {}
-    price_col = get_column(df, ['price', 'nightly_price', 'total_price', 'cost'])
-    amenities_col = get_column(df, ['amenities_count', 'amenities'])
-    reviews_col = get_column(df, ['number_of_reviews', 'num_reviews', 'reviews_count'])
-    rating_col = get_column(df, ['review_scores_rating', 'rating'])
-    avail_col = get_column(df, ['availability_365', 'availability'])
+    if profile is not None:
+        col_for = profile.column_for
+    else:
+        col_for = lambda role: get_column(df, ROLE_ALIASES[role])
+    price_col = col_for('price')
+    amenities_col = col_for('amenities')
+    reviews_col = col_for('reviews')
+    rating_col = col_for('rating')
+    avail_col = col_for('availability')
+
+    def avg(col):
+        if not col:
+            return None
+        if profile is not None and profile[col].kind == 'numeric':
+            return profile[col].mean
+        return safe_mean(df[col])
 
-    metrics['avg_price'] = safe_mean(df[price_col]) if price_col else None
-    metrics['avg_reviews'] = safe_mean(df[reviews_col]) if reviews_col else None
-    metrics['avg_rating'] = safe_mean(df[rating_col]) if rating_col else None
-    metrics['avg_availability'] = safe_mean(df[avail_col]) if avail_col else None
+    metrics['avg_price'] = avg(price_col)
+    metrics['avg_reviews'] = avg(reviews_col)
+    metrics['avg_rating'] = avg(rating_col)
+    metrics['avg_availability'] = avg(avail_col)
 
     if amenities_col:
         if pd.api.types.is_numeric_dtype(df[amenities_col]):
-            metrics['avg_amenities'] = safe_mean(df[amenities_col])
+            metrics['avg_amenities'] = avg(amenities_col)
         else:
             metrics['avg_amenities'] = amenities_count(df[amenities_col]).mean()
     else:
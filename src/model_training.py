@@ -1,9 +1,12 @@
-from sklearn.linear_model import LinearRegression
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
+PRICE_FEATURES = ["latitude","longitude","number_of_reviews","availability_365"]
 
+def price_feature_columns(df):
+    return [c for c in PRICE_FEATURES if c in df.columns]
+
+# scikit-learn is imported inside the functions: it is the slowest import in the app
 def train_price_model(df):
-    features = [c for c in ["latitude","longitude","number_of_reviews","availability_365"] if c in df.columns]
+    from sklearn.linear_model import LinearRegression
+    features = price_feature_columns(df)
     if not features:
         raise ValueError("No feature columns available for price model.")
     df = df.dropna(subset=features + ["price"])
@@ -15,6 +18,8 @@ def train_price_model(df):
     return model, df
 
 def cluster_hosts(df, n_clusters=4):
+    from sklearn.cluster import KMeans
+    from sklearn.preprocessing import StandardScaler
     features = [c for c in ["price","number_of_reviews","availability_365"] if c in df.columns]
     df = df.dropna(subset=features)
     if len(df) < n_clusters:
@@ -23,4 +28,4 @@ def cluster_hosts(df, n_clusters=4):
     X_scaled = scaler.fit_transform(df[features])
     kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
     df["cluster"] = kmeans.fit_predict(X_scaled)
-    return kmeans, df
\ No newline at end of file
+    return kmeans, df
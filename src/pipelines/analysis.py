@@ -0,0 +1,56 @@
+from __future__ import annotations
+from typing import Any, Dict, Tuple
+import pandas as pd
+from src.model_training import train_price_model, cluster_hosts
+from src.recommendation import build_recommendation_scores
+from src.pipelines.spatial_bins import precompute_bins
+from src.pipelines.column_profile import profile_frame
+from src.pipelines.metrics_cube import build_metrics_cube
+from src.pipelines.text_search import build_search_index
+from src.utils.tracing import skip, span
+
+def run_analysis(df: pd.DataFrame, max_rows: int = 10000, random_state: int = 42,
+                 map_bins: bool = True) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Sample -> price model -> host clusters -> recommendation scores.
+    Model/cluster failures are tolerated (the dataset may lack the feature columns);
+    they show up as failed spans in the active trace (utils.tracing) and in info["stage_errors"].
+    The metrics cube and map bins are built from the full, unsampled frame (mean_score
+    uses the scored rows); the column profile describes the returned, scored frame.
+    """
+    info: Dict[str, Any] = {"rows_loaded": len(df)}
+    full = df
+    if len(df) > max_rows:
+        with span("sample", rows_in=len(df)) as s:
+            df = df.sample(max_rows, random_state=random_state)
+            s.set(rows=len(df))
+        info["sampled_to"] = max_rows
+    else:
+        skip("sample", f"{len(df)} rows <= max_rows")
+    with span("train_price_model", tolerate=True) as s:
+        _, df = train_price_model(df)
+        s.set(rows=len(df))
+    with span("cluster_hosts", tolerate=True) as c:
+        _, df = cluster_hosts(df)
+        c.set(rows=len(df))
+    info["stage_errors"] = {r.name: r.error for r in (s, c) if r.status == "failed"}
+    with span("build_recommendation_scores") as s:
+        df = build_recommendation_scores(df)
+        s.set(rows=len(df))
+    info["rows_scored"] = len(df)
+    with span("profile_frame"):
+        info["profile"] = profile_frame(df)
+    with span("metrics_cube", rows_in=len(full)) as s:
+        info["metrics_cube"] = build_metrics_cube(full)
+        s.set(cells=len(info["metrics_cube"].cells))
+    with span("search_index") as s:
+        info["search_index"] = build_search_index(df)
+        s.set(terms=len(info["search_index"].idf) if info["search_index"] is not None else 0)
+    if map_bins:
+        with span("map_bins", rows_in=len(full)):
+            if "id" in full.columns and "id" in df.columns:
+                full = full.merge(df[["id", "total_score"]].drop_duplicates("id"), on="id", how="left")
+            info["map_bins"] = precompute_bins(full)
+    else:
+        skip("map_bins", "disabled")
+    return df, info
@@ -0,0 +1,282 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import pandas as pd
+from src.utils.tracing import skip
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = pc = None
+
+CACHE_DIR = Path("data/cache/analysis")
+BLOCK_ROWS = 64 * 1024  # Arrow record batch size; the unit query() skips by min/max
+
+def fingerprint(**parts: Any) -> str:
+    """
+    Stable key for a set of source parameters.
+    """
+    blob = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:32]
+
+def bytes_fingerprint(data: Optional[bytes]) -> Optional[str]:
+    if data is None:
+        return None
+    return hashlib.sha256(data).hexdigest()
+
+def _frame_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+def _hand_out(df: pd.DataFrame) -> pd.DataFrame:
+    # Callers own what they get back: under copy-on-write a shallow copy is enough,
+    # otherwise an in-place write (df["x"] = ..., .loc) would reach the cache entry
+    if pd.options.mode.copy_on_write is True:
+        return df.copy(deep=False)
+    return df.copy()
+
+def _block_stats(batch) -> Dict[str, Tuple[Any, Any]]:
+    stats = {}
+    for name, col in zip(batch.schema.names, batch.columns):
+        if pa.types.is_integer(col.type) or pa.types.is_floating(col.type):
+            mm = pc.min_max(col)
+            stats[name] = (mm["min"].as_py(), mm["max"].as_py())
+    return stats
+
+class AnalysisCache:
+    """
+    Two-level LRU for analysed frames keyed by source fingerprint.
+    Memory level is bounded by estimated DataFrame bytes; every entry is also
+    written to disk, which is bounded separately and trimmed by access time.
+    Concurrent requests for the same key compute once.
+    Frames handed out are the caller's own (a deep copy unless copy-on-write is on);
+    a frame passed to put() must not be modified afterwards.
+    With pyarrow installed, frames are stored as Arrow IPC files and memory-mapped
+    on load, so worker processes share the page cache instead of private copies.
+    """
+    def __init__(
+        self,
+        memory_budget_bytes: int = 1024 * 1024 * 1024,
+        disk_budget_bytes: int = 4 * 1024 * 1024 * 1024,
+        cache_dir: Path = CACHE_DIR,
+        use_arrow: Optional[bool] = None
+    ):
+        self.memory_budget = memory_budget_bytes
+        self.disk_budget = disk_budget_bytes
+        self.cache_dir = Path(cache_dir)
+        self.use_arrow = pa is not None if use_arrow is None else (use_arrow and pa is not None)
+        self._mem: "OrderedDict[str, Tuple[pd.DataFrame, Dict[str, Any], int, Optional[float]]]" = OrderedDict()
+        self._mem_bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def _arrow_paths(self, key: str) -> Tuple[Path, Path]:
+        return self.cache_dir / f"{key}.arrow", self.cache_dir / f"{key}.meta.pkl"
+
+    def _read_disk(self, key: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any], Optional[float], List[Path]]]:
+        arrow_path, meta_path = self._arrow_paths(key)
+        if pa is not None and arrow_path.exists() and meta_path.exists():
+            with open(meta_path, "rb") as f:
+                meta, expires_at = pickle.load(f)[:2]
+            # Numeric columns without nulls stay zero-copy (read-only) views of the mapped file
+            table = pa.ipc.open_file(pa.memory_map(str(arrow_path), "r")).read_all()
+            return table.to_pandas(split_blocks=True), meta, expires_at, [arrow_path, meta_path]
+        path = self._path(key)
+        if path.exists():
+            with open(path, "rb") as f:
+                df, meta, expires_at = pickle.load(f)
+            return df, meta, expires_at, [path]
+        return None
+
+    def _write_disk(self, key: str, df: pd.DataFrame, meta: Dict[str, Any], expires_at: Optional[float]):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        table = None
+        if self.use_arrow:
+            try:
+                table = pa.Table.from_pandas(df, preserve_index=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                table = None  # mixed-type object columns; fall back to pickle
+        if table is not None:
+            arrow_path, meta_path = self._arrow_paths(key)
+            tmp = arrow_path.with_suffix(".tmp")
+            batches = table.to_batches(max_chunksize=BLOCK_ROWS)
+            with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
+            os.replace(tmp, arrow_path)
+            tmp = meta_path.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump((meta, expires_at, [_block_stats(b) for b in batches]), f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, meta_path)
+            self._path(key).unlink(missing_ok=True)
+            return
+        tmp = self._path(key).with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump((df, meta, expires_at), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._path(key))
+
+    def _disk_files(self, key: str) -> List[Path]:
+        return [self._path(key), *self._arrow_paths(key)]
+
+    def _mem_put(self, key: str, df: pd.DataFrame, meta: Dict[str, Any], expires_at: Optional[float]):
+        size = _frame_bytes(df)
+        if size > self.memory_budget:
+            return
+        old = self._mem.pop(key, None)
+        if old:
+            self._mem_bytes -= old[2]
+        self._mem[key] = (df, meta, size, expires_at)
+        self._mem_bytes += size
+        while self._mem_bytes > self.memory_budget and self._mem:
+            _, (_, _, evicted_size, _) = self._mem.popitem(last=False)
+            self._mem_bytes -= evicted_size
+
+    def _trim_disk(self):
+        entries: Dict[str, List[Path]] = {}
+        for p in self.cache_dir.glob("*"):
+            if p.suffix in (".pkl", ".arrow"):
+                entries.setdefault(p.name.split(".", 1)[0], []).append(p)
+        sized = sorted(
+            ((max(p.stat().st_mtime for p in files), sum(p.stat().st_size for p in files), files)
+             for files in entries.values()),
+            key=lambda e: e[0]
+        )
+        total = sum(size for _, size, _ in sized)
+        for _, size, files in sized:
+            if total <= self.disk_budget:
+                break
+            total -= size
+            for p in files:
+                p.unlink(missing_ok=True)
+
+    def get(self, key: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        now = time.time()
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None:
+                df, meta, size, expires_at = hit
+                if expires_at is None or expires_at > now:
+                    self._mem.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return _hand_out(df), meta
+                self._mem.pop(key)
+                self._mem_bytes -= size
+        try:
+            loaded = self._read_disk(key)
+        except Exception:
+            loaded = None
+            for p in self._disk_files(key):
+                p.unlink(missing_ok=True)
+        if loaded is None:
+            return None
+        df, meta, expires_at, files = loaded
+        if expires_at is not None and expires_at <= now:
+            for p in files:
+                p.unlink(missing_ok=True)
+            return None
+        for p in files:
+            os.utime(p)
+        with self._lock:
+            self._mem_put(key, df, meta, expires_at)
+            self.stats["disk_hits"] += 1
+        return _hand_out(df), meta
+
+    def query(self, key: str, columns: Optional[List[str]] = None, where: Any = None
+              ) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """
+        Projected/filtered read of an existing entry; None when it is absent or expired.
+        `where` is a data_sources.pushdown.Predicates. An Arrow entry on disk is read block
+        by block from the mapped file: blocks whose min/max stats rule `where` out are
+        skipped and only matching rows of the needed columns are converted to pandas.
+        The partial result is not promoted to the memory level.
+        """
+        from src.data_sources.pushdown import apply_query, needed_columns
+        now = time.time()
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None and (hit[3] is None or hit[3] > now):
+                self._mem.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return _hand_out(apply_query(hit[0], columns, where)), hit[1]
+        arrow_path, meta_path = self._arrow_paths(key)
+        if pa is None or not (arrow_path.exists() and meta_path.exists()):
+            loaded = self.get(key)
+            return None if loaded is None else (apply_query(loaded[0], columns, where), loaded[1])
+        try:
+            with open(meta_path, "rb") as f:
+                meta, expires_at, *rest = pickle.load(f)
+            if expires_at is not None and expires_at <= now:
+                return None
+            block_stats = rest[0] if rest else None
+            reader = pa.ipc.open_file(pa.memory_map(str(arrow_path), "r"))
+            names = reader.schema.names
+            wanted = needed_columns(columns, where)
+            keep_cols = names if wanted is None else [c for c in wanted if c in names]
+            pred_cols = [c for c in (where.columns if where else []) if c in names]
+            kept = []
+            for i in range(reader.num_record_batches):
+                if where and block_stats and not where.may_match(block_stats[i]):
+                    continue
+                batch = reader.get_batch(i)
+                if where:
+                    mask = where.mask(batch.select(pred_cols).to_pandas())
+                    if not mask.any():
+                        continue
+                    batch = batch.filter(pa.array(mask))
+                kept.append(batch.select(keep_cols))
+            schema = pa.schema([reader.schema.field(c) for c in keep_cols], metadata=reader.schema.metadata)
+            df = pa.Table.from_batches(kept, schema=schema).to_pandas()
+        except (OSError, EOFError, pickle.UnpicklingError, pa.ArrowInvalid, KeyError) as e:
+            # Unreadable or partly written entry: the caller loads from the source instead
+            skip("cache_query", f"{type(e).__name__}: {e}", key=key)
+            return None
+        os.utime(arrow_path)
+        with self._lock:
+            self.stats["disk_hits"] += 1
+        return apply_query(df.reset_index(drop=True), columns), meta
+
+    def put(self, key: str, df: pd.DataFrame, meta: Dict[str, Any], ttl: Optional[float] = None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._mem_put(key, df, meta, expires_at)
+        self._write_disk(key, df, meta, expires_at)
+        self._trim_disk()
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Tuple[pd.DataFrame, Dict[str, Any]]],
+        ttl: Optional[float] = None,
+        refresh: bool = False
+    ) -> Tuple[pd.DataFrame, Dict[str, Any], bool]:
+        """
+        Returns (df, meta, cache_hit).
+        """
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if not refresh:
+                hit = self.get(key)
+                if hit is not None:
+                    return hit[0], hit[1], True
+            with self._lock:
+                self.stats["misses"] += 1
+            df, meta = compute()
+            self.put(key, df, meta, ttl=ttl)
+            return _hand_out(df), meta, False
+
+    def memory_usage(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._mem), "bytes": self._mem_bytes, "budget": self.memory_budget}
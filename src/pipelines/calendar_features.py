@@ -0,0 +1,93 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+
+CALENDAR_CACHE_DIR = Path("data/cache/calendar")
+CHUNK_ROWS = 500_000
+WINDOWS = (30, 60, 90)
+_USECOLS = ["listing_id", "date", "available", "price", "minimum_nights"]
+
+def calendar_cache_path(city: str, date: str) -> Path:
+    return CALENDAR_CACHE_DIR / f"{city}_{date}_calendar.pkl"
+
+def _partial(chunk: pd.DataFrame, start: pd.Timestamp) -> pd.DataFrame:
+    day = (chunk["date"] - start).dt.days.to_numpy()
+    avail = chunk["available"].to_numpy() == "t"
+    price = pd.to_numeric(
+        chunk["price"].astype(str).str.replace(r"[^\d\.]", "", regex=True), errors="coerce"
+    ).to_numpy()
+    weekend = chunk["date"].dt.dayofweek.isin([4, 5]).to_numpy()  # Fri/Sat nights
+    has_price = ~np.isnan(price)
+    nights = pd.to_numeric(chunk["minimum_nights"], errors="coerce")
+    parts = {"listing_id": chunk["listing_id"].to_numpy()}
+    for w in WINDOWS:
+        parts[f"avail_{w}"] = (avail & (day >= 0) & (day < w)).astype(np.int32)
+    parts["we_sum"] = np.where(weekend & has_price, price, 0.0)
+    parts["we_n"] = (weekend & has_price).astype(np.int32)
+    parts["wd_sum"] = np.where(~weekend & has_price, price, 0.0)
+    parts["wd_n"] = (~weekend & has_price).astype(np.int32)
+    parts["mn_sum"] = nights.fillna(0).to_numpy()
+    parts["mn_n"] = nights.notna().to_numpy().astype(np.int32)
+    parts["mn_min"] = nights.to_numpy()
+    parts["mn_max"] = nights.to_numpy()
+    g = pd.DataFrame(parts).groupby("listing_id", sort=False)
+    sums = g[[c for c in parts if c not in ("listing_id", "mn_min", "mn_max")]].sum()
+    sums["mn_min"] = g["mn_min"].min()
+    sums["mn_max"] = g["mn_max"].max()
+    return sums
+
+def aggregate_calendar(path: Path, start: Optional[str] = None, chunk_rows: int = CHUNK_ROWS) -> pd.DataFrame:
+    """
+    Stream calendar.csv(.gz) in chunks into one row per listing:
+    avail_30/60/90, weekend_premium (Fri/Sat mean price vs other nights) and
+    min_nights_mean/min/max. Memory is bounded by chunk_rows plus one partial
+    row per listing per chunk.
+    """
+    partials: List[pd.DataFrame] = []
+    t0 = pd.Timestamp(start) if start else None
+    reader = pd.read_csv(path, usecols=lambda c: c in _USECOLS, chunksize=chunk_rows)
+    for chunk in reader:
+        # Explicit format: parse_dates/category dtypes are several times slower per chunk
+        chunk["date"] = pd.to_datetime(chunk["date"], format="%Y-%m-%d", errors="coerce")
+        if "price" not in chunk.columns:
+            chunk["price"] = np.nan
+        if "minimum_nights" not in chunk.columns:
+            chunk["minimum_nights"] = np.nan
+        if t0 is None:
+            t0 = chunk["date"].min()
+        partials.append(_partial(chunk, t0))
+    if not partials:
+        return pd.DataFrame(columns=["listing_id"])
+    merged = pd.concat(partials)
+    g = merged.groupby(level=0, sort=False)
+    total = g[[c for c in merged.columns if c not in ("mn_min", "mn_max")]].sum()
+    out = pd.DataFrame(index=total.index)
+    for w in WINDOWS:
+        out[f"avail_{w}"] = total[f"avail_{w}"]
+    we = total["we_sum"] / total["we_n"].replace(0, np.nan)
+    wd = total["wd_sum"] / total["wd_n"].replace(0, np.nan)
+    out["weekend_premium"] = we / wd - 1
+    out["min_nights_mean"] = total["mn_sum"] / total["mn_n"].replace(0, np.nan)
+    out["min_nights_min"] = g["mn_min"].min()
+    out["min_nights_max"] = g["mn_max"].max()
+    out.index.name = "listing_id"
+    return out.reset_index()
+
+def calendar_features(path: Path, city: str, date: str, force: bool = False) -> pd.DataFrame:
+    """
+    Cached per snapshot; the raw calendar is only streamed once.
+    """
+    cache = calendar_cache_path(city, date)
+    if cache.exists() and not force:
+        return pd.read_pickle(cache)
+    feats = aggregate_calendar(path, start=date)
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    feats.to_pickle(cache)
+    return feats
+
+def merge_calendar_features(df: pd.DataFrame, feats: pd.DataFrame) -> pd.DataFrame:
+    if "id" not in df.columns or feats.empty:
+        return df
+    return df.merge(feats.rename(columns={"listing_id": "id"}), on="id", how="left")
@@ -0,0 +1,99 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import pandas as pd
+
+# Candidate names per role, in priority order (exact match first, then substring)
+ROLE_ALIASES: Dict[str, List[str]] = {
+    "price": ["price", "nightly_price", "total_price", "cost"],
+    "amenities": ["amenities_count", "amenities"],
+    "reviews": ["number_of_reviews", "num_reviews", "reviews_count"],
+    "rating": ["review_scores_rating", "rating"],
+    "availability": ["availability_365", "availability"],
+    "image": ["image_url", "Image", "img", "photo", "picture"],
+    "latitude": ["latitude"],
+    "longitude": ["longitude"],
+}
+
+def match_column(columns: Iterable[str], names: Sequence[str]) -> Optional[str]:
+    """
+    First column matching any of names, exactly or (case-insensitive) as a substring.
+    """
+    columns = list(columns)
+    for name in names:
+        if name in columns:
+            return name
+    for col in columns:
+        for name in names:
+            if name.lower() in str(col).lower():
+                return col
+    return None
+
+@dataclass
+class ColumnProfile:
+    name: str
+    dtype: str
+    kind: str  # numeric | bool | datetime | text | other
+    nulls: int
+    nunique: Optional[int]  # None when values are unhashable (e.g. lists)
+    min: Any = None
+    max: Any = None
+    mean: Optional[float] = None
+    role: Optional[str] = None
+
+@dataclass
+class DatasetProfile:
+    rows: int
+    columns: Dict[str, ColumnProfile] = field(default_factory=dict)
+    roles: Dict[str, str] = field(default_factory=dict)
+
+    def __getitem__(self, col: str) -> ColumnProfile:
+        return self.columns[col]
+
+    def column_for(self, role: str) -> Optional[str]:
+        return self.roles.get(role)
+
+    def numeric_columns(self, min_unique: int = 2) -> List[str]:
+        return [c for c, p in self.columns.items()
+                if p.kind == "numeric" and (p.nunique or 0) >= min_unique]
+
+    def categorical_columns(self, max_unique: int = 50) -> List[str]:
+        return [c for c, p in self.columns.items()
+                if p.kind == "text" and p.nunique is not None and p.nunique < max_unique]
+
+def _kind(s: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(s):
+        return "bool"
+    if pd.api.types.is_numeric_dtype(s):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return "datetime"
+    if s.dtype == object:
+        return "text"
+    return "other"
+
+def profile_frame(df: pd.DataFrame) -> DatasetProfile:
+    """
+    Dtype, null count, cardinality, range and role for every column, computed once per
+    loaded frame so the UI and metrics never rescan it.
+    """
+    profile = DatasetProfile(rows=len(df))
+    for col in df.columns:
+        s = df[col]
+        kind = _kind(s)
+        try:
+            nunique = int(s.nunique())
+        except TypeError:
+            nunique = None
+        cp = ColumnProfile(str(col), str(s.dtype), kind, int(s.isna().sum()), nunique)
+        if kind in ("numeric", "datetime") and cp.nulls < len(s):
+            cp.min, cp.max = s.min(), s.max()
+            if kind == "numeric":
+                cp.mean = float(s.mean())
+        profile.columns[col] = cp
+    for role, names in ROLE_ALIASES.items():
+        col = match_column(df.columns, names)
+        if col is not None:
+            profile.roles[role] = col
+            profile.columns[col].role = profile.columns[col].role or role
+    return profile
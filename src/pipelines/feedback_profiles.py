@@ -3,8 +3,7 @@ from typing import Dict, Any
 import json
 from pathlib import Path
 
-PROFILES_DIR = Path("data/profiles")
-PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+PROFILES_DIR = Path("data/profiles")  # created on first save
 
 DEFAULT_WEIGHTS = {
     "value": 1.0,
@@ -21,6 +20,7 @@ def list_profiles():
     return [p.stem for p in PROFILES_DIR.glob("*.json")]
 
 def save_profile(name: str, data: Dict[str, Any]):
+    PROFILES_DIR.mkdir(parents=True, exist_ok=True)
     with profile_path(name).open("w", encoding="utf-8") as f:
         json.dump(data, f, indent=2)
 
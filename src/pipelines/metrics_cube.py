@@ -0,0 +1,133 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from src.metrics import amenities_count
+
+OCCUPANCY_BANDS = [
+    ("Solo (1)", 1, 1),
+    ("Duo (2)", 2, 2),
+    ("Small group (3-4)", 3, 4),
+    ("Family (5-6)", 5, 6),
+    ("Large (7+)", 7, np.inf),
+]
+PRICE_BANDS = ["Budget", "Comfort", "Premium"]  # snapshot price tertiles
+PRICE_HIST_BINS = 64
+DIMENSIONS = ["neighbourhood", "room_type", "occupancy_band", "price_band"]
+# metrics key -> canonical column
+MEASURES = {
+    "price": "price",
+    "reviews": "number_of_reviews",
+    "rating": "review_scores_rating",
+    "availability": "availability_365",
+    "amenities": "amenities_count",
+}
+_MISSING = "Unknown"
+
+@dataclass
+class MetricsCube:
+    """
+    Pre-aggregated sums/counts over DIMENSIONS x price histogram bin.
+    Any filter combination is answered by summing matching cells; price quantiles are
+    interpolated from the merged histogram.
+    """
+    cells: pd.DataFrame
+    price_edges: np.ndarray
+    band_edges: np.ndarray
+
+    def values(self, dim: str) -> List[str]:
+        return sorted(self.cells[dim].unique().tolist())
+
+    def _select(self, filters: Dict[str, Optional[Sequence[str]]]) -> pd.DataFrame:
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dim, allowed in filters.items():
+            if allowed:
+                mask &= self.cells[dim].isin(list(allowed)).to_numpy()
+        return self.cells[mask]
+
+    def _price_quantile(self, hist: np.ndarray, q: float) -> Optional[float]:
+        total = hist.sum()
+        if not total:
+            return None
+        cum = np.cumsum(hist)
+        i = int(np.searchsorted(cum, q * total))
+        prev = cum[i - 1] if i else 0
+        frac = (q * total - prev) / hist[i] if hist[i] else 0.0
+        lo, hi = self.price_edges[i], self.price_edges[i + 1]
+        return float(lo + frac * (hi - lo))
+
+    def query(
+        self,
+        neighbourhoods: Optional[Sequence[str]] = None,
+        room_types: Optional[Sequence[str]] = None,
+        occupancy_groups: Optional[Sequence[str]] = None,
+        price_bands: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Same keys as metrics.compute_metrics, plus price quantiles and amenities max.
+        """
+        sel = self._select({
+            "neighbourhood": neighbourhoods,
+            "room_type": room_types,
+            "occupancy_band": occupancy_groups,
+            "price_band": price_bands,
+        })
+        out: Dict[str, Any] = {"listings": int(sel["count"].sum())}
+        for key in MEASURES:
+            n = sel[f"n_{key}"].sum()
+            out[f"avg_{key}"] = float(sel[f"sum_{key}"].sum() / n) if n else None
+        out["max_amenities"] = float(sel["max_amenities"].max()) if len(sel) and sel["n_amenities"].sum() else None
+        hist = np.bincount(sel["price_bin"].to_numpy(), weights=sel["n_price"].to_numpy(),
+                           minlength=len(self.price_edges) - 1)[: len(self.price_edges) - 1]
+        for q in (0.25, 0.5, 0.75):
+            out[f"price_p{int(q * 100)}"] = self._price_quantile(hist, q)
+        return out
+
+def _band_labels(values: pd.Series, bands) -> pd.Series:
+    out = pd.Series(_MISSING, index=values.index, dtype=object)
+    for label, lo, hi in bands:
+        out[(values >= lo) & (values <= hi)] = label
+    return out
+
+def build_metrics_cube(df: pd.DataFrame) -> MetricsCube:
+    """
+    One grouped pass over the snapshot.
+    """
+    work = pd.DataFrame(index=df.index)
+    for dim in ("neighbourhood", "room_type"):
+        work[dim] = df[dim].fillna(_MISSING).astype(str) if dim in df.columns else _MISSING
+    acc = pd.to_numeric(df["accommodates"], errors="coerce") if "accommodates" in df.columns else pd.Series(np.nan, index=df.index)
+    work["occupancy_band"] = _band_labels(acc, OCCUPANCY_BANDS)
+
+    for key, col in MEASURES.items():
+        if col in df.columns:
+            values = pd.to_numeric(df[col], errors="coerce")
+        elif key == "amenities" and "amenities" in df.columns:
+            values = amenities_count(df["amenities"]).astype(float)
+        else:
+            values = pd.Series(np.nan, index=df.index)
+        work[f"v_{key}"] = values
+
+    price = work["v_price"]
+    valid = price[price > 0]
+    if len(valid):
+        band_edges = np.unique(np.quantile(valid, [0, 1 / 3, 2 / 3, 1]))
+        lo, hi = float(valid.min()), float(valid.max())
+        price_edges = np.geomspace(lo, hi if hi > lo else lo * 1.01, PRICE_HIST_BINS + 1)
+    else:
+        band_edges = np.array([0.0, 1.0])
+        price_edges = np.linspace(0.0, 1.0, PRICE_HIST_BINS + 1)
+    band_idx = np.searchsorted(band_edges[1:-1], price.to_numpy(), side="right")
+    work["price_band"] = np.where(price.notna(), np.array(PRICE_BANDS)[np.minimum(band_idx, 2)], _MISSING)
+    work["price_bin"] = np.clip(np.searchsorted(price_edges, price.fillna(0).to_numpy(), side="right") - 1,
+                                0, PRICE_HIST_BINS - 1)
+
+    agg: Dict[str, Any] = {"count": ("v_price", "size")}
+    for key in MEASURES:
+        agg[f"sum_{key}"] = (f"v_{key}", "sum")
+        agg[f"n_{key}"] = (f"v_{key}", "count")
+    agg["max_amenities"] = ("v_amenities", "max")
+    cells = work.groupby(DIMENSIONS + ["price_bin"], sort=False, observed=True).agg(**agg).reset_index()
+    cells["price_bin"] = cells["price_bin"].astype(np.int64)
+    return MetricsCube(cells=cells, price_edges=price_edges, band_edges=band_edges)
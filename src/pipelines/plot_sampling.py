@@ -0,0 +1,73 @@
+from __future__ import annotations
+from typing import List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+DEFAULT_POINT_BUDGET = 5000
+GRID_BINS = 24  # voxels per axis, on rank-scaled coordinates
+TOP_SHARE = 0.05  # of the budget reserved for the best-scored listings
+OUTLIER_SHARE = 0.05  # of the budget reserved for per-axis extremes
+OUTLIER_Q = 0.005
+
+def plot_columns(x: str, y: str, z: str, color: Optional[str] = None,
+                 hover: Sequence[str] = (), df: Optional[pd.DataFrame] = None) -> List[str]:
+    cols = list(dict.fromkeys([c for c in (x, y, z, color, *hover) if c]))
+    return [c for c in cols if c in df.columns] if df is not None else cols
+
+def _voxel_ids(pts: np.ndarray, bins: int) -> np.ndarray:
+    # Rank scaling keeps skewed axes (price, reviews) from collapsing into one voxel
+    n = len(pts)
+    ranks = pts.argsort(axis=0).argsort(axis=0)
+    cells = (ranks * bins // max(n, 1)).astype(np.int64)
+    return (cells[:, 0] * bins + cells[:, 1]) * bins + cells[:, 2]
+
+def downsample_for_plot(
+    df: pd.DataFrame,
+    x: str, y: str, z: str,
+    color: Optional[str] = None,
+    hover: Sequence[str] = (),
+    budget: int = DEFAULT_POINT_BUDGET,
+    score_col: str = "total_score",
+    bins: int = GRID_BINS,
+    random_state: int = 42
+) -> pd.DataFrame:
+    """
+    At most `budget` rows holding only the plotted/hover columns.
+    Always keeps the top-scored listings and per-axis outliers, then fills the rest
+    by voxel-grid sampling so sparse regions keep their points and dense ones thin out.
+    """
+    cols = plot_columns(x, y, z, color, hover, df)
+    pts = df[[x, y, z]].apply(pd.to_numeric, errors="coerce")
+    valid = pts.notna().all(axis=1).to_numpy()
+    if valid.sum() <= budget:
+        return df.loc[valid, cols]
+    pts = pts.to_numpy(dtype=float)[valid]
+    pos = np.flatnonzero(valid)
+    rng = np.random.default_rng(random_state)
+
+    keep = np.zeros(len(pts), dtype=bool)
+    if score_col in df.columns:
+        score = pd.to_numeric(df[score_col], errors="coerce").to_numpy(dtype=float)[valid]
+        n_top = int(budget * TOP_SHARE)
+        if n_top:
+            keep[np.argsort(np.nan_to_num(score, nan=-np.inf))[-n_top:]] = True
+    lo, hi = np.quantile(pts, [OUTLIER_Q, 1 - OUTLIER_Q], axis=0)
+    outliers = np.flatnonzero(((pts < lo) | (pts > hi)).any(axis=1) & ~keep)
+    n_out = int(budget * OUTLIER_SHARE)
+    if len(outliers) > n_out:
+        outliers = rng.choice(outliers, n_out, replace=False)
+    keep[outliers] = True
+
+    remaining = budget - int(keep.sum())
+    if remaining > 0:
+        # Shuffle, then take the first k rows of every voxel for growing k until the budget is met
+        order = rng.permutation(np.flatnonzero(~keep))
+        voxel = _voxel_ids(pts, bins)[order]
+        rank_in_voxel = pd.Series(voxel).groupby(voxel).cumcount().to_numpy()
+        per_voxel = np.bincount(np.minimum(rank_in_voxel, budget))
+        k = int(np.searchsorted(np.cumsum(per_voxel), remaining, side="right"))
+        chosen = order[rank_in_voxel < k]
+        partial = order[rank_in_voxel == k]
+        chosen = np.concatenate([chosen, partial[: remaining - len(chosen)]])
+        keep[chosen] = True
+    return df.iloc[pos[keep]][cols]
@@ -0,0 +1,81 @@
+from __future__ import annotations
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+from src.utils.text import sentiment_counts, sentiment_scores
+
+SENTIMENT_CACHE_DIR = Path("data/cache/sentiment")
+CHUNK_ROWS = 100_000
+FEATURE_COLUMNS = ["review_sentiment", "negative_review_rate", "reviews_scored"]
+
+def sentiment_cache_path(city: str, date: str) -> Path:
+    return SENTIMENT_CACHE_DIR / f"{city}_{date}_sentiment.pkl"
+
+def score_chunk(listing_ids: np.ndarray, comments: np.ndarray) -> pd.DataFrame:
+    """
+    Per-listing partial sums for one chunk of reviews. Runs in a worker process.
+    """
+    pos, neg = sentiment_counts(comments)
+    part = pd.DataFrame({
+        "listing_id": listing_ids,
+        "sentiment_sum": sentiment_scores(pos, neg),
+        "negative": (neg > 0).astype(np.int32),
+        "n": np.ones(len(listing_ids), dtype=np.int32),
+    })
+    return part.groupby("listing_id", sort=False).sum()
+
+def aggregate_review_sentiment(
+    path,
+    chunk_rows: int = CHUNK_ROWS,
+    max_workers: Optional[int] = None,
+    max_pending: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Stream reviews.csv(.gz) (listing_id, comments) in chunks, score them across a
+    process pool and reduce to one row per listing. At most max_pending chunks are
+    in flight, so memory stays bounded regardless of file size.
+    """
+    partials: List[pd.DataFrame] = []
+    reader = pd.read_csv(path, usecols=["listing_id", "comments"], chunksize=chunk_rows,
+                         dtype={"comments": object})
+    workers = max_workers or os.cpu_count() or 1
+    limit = max_pending or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque = deque()
+        for chunk in reader:
+            pending.append(pool.submit(score_chunk, chunk["listing_id"].to_numpy(), chunk["comments"].to_numpy()))
+            if len(pending) >= limit:
+                partials.append(pending.popleft().result())
+        while pending:
+            partials.append(pending.popleft().result())
+    if not partials:
+        return pd.DataFrame(columns=["listing_id", *FEATURE_COLUMNS])
+    total = pd.concat(partials).groupby(level=0, sort=False).sum()
+    out = pd.DataFrame({
+        "review_sentiment": total["sentiment_sum"] / total["n"],
+        "negative_review_rate": total["negative"] / total["n"],
+        "reviews_scored": total["n"],
+    })
+    out.index.name = "listing_id"
+    return out.reset_index()
+
+def review_sentiment(path, city: str, date: str, force: bool = False, **kwargs) -> pd.DataFrame:
+    """
+    Cached per snapshot; reviews are only scored once.
+    """
+    cache = sentiment_cache_path(city, date)
+    if cache.exists() and not force:
+        return pd.read_pickle(cache)
+    feats = aggregate_review_sentiment(path, **kwargs)
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    feats.to_pickle(cache)
+    return feats
+
+def merge_review_sentiment(df: pd.DataFrame, feats: pd.DataFrame) -> pd.DataFrame:
+    if "id" not in df.columns or feats.empty:
+        return df
+    return df.merge(feats.rename(columns={"listing_id": "id"}), on="id", how="left")
@@ -0,0 +1,90 @@
+from __future__ import annotations
+from typing import Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+
+DEFAULT_ZOOMS = tuple(range(9, 16))
+CELL_PIXELS = 22  # on-screen hex radius the cell size is derived from
+MAX_CELLS = 8000  # deeper zooms are dropped once a level exceeds this
+_M_PER_DEG_LAT = 110_540.0
+_M_PER_DEG_LON = 111_320.0
+_SQRT3 = np.sqrt(3.0)
+
+def cell_size_m(zoom: int, lat0: float) -> float:
+    """
+    Hex radius in metres that renders ~CELL_PIXELS wide at a web-mercator zoom level.
+    """
+    m_per_px = 156_543.03 * np.cos(np.radians(lat0)) / (2 ** zoom)
+    return float(m_per_px * CELL_PIXELS)
+
+def _hex_round(q: np.ndarray, r: np.ndarray):
+    x, z = q, r
+    y = -x - z
+    rx, ry, rz = np.round(x), np.round(y), np.round(z)
+    dx, dy, dz = np.abs(rx - x), np.abs(ry - y), np.abs(rz - z)
+    fix_x = (dx > dy) & (dx > dz)
+    fix_z = ~fix_x & (dz >= dy)
+    rx = np.where(fix_x, -ry - rz, rx)
+    rz = np.where(fix_z, -rx - ry, rz)
+    return rx.astype(np.int64), rz.astype(np.int64)
+
+def hex_bins(
+    df: pd.DataFrame,
+    zoom: int,
+    price_col: str = "price",
+    score_col: str = "total_score",
+    lat0: Optional[float] = None
+) -> pd.DataFrame:
+    """
+    Aggregate points into pointy-top hexagons sized for the zoom level.
+    Returns one row per non-empty cell: lat, lon, count, median_price, mean_score, radius_m.
+    """
+    pts = df[["latitude", "longitude"]].to_numpy(dtype=float)
+    ok = np.isfinite(pts).all(axis=1)
+    if not ok.any():
+        return pd.DataFrame(columns=["lat", "lon", "count", "median_price", "mean_score", "radius_m"])
+    lat, lon = pts[ok, 0], pts[ok, 1]
+    lat0 = float(np.median(lat)) if lat0 is None else lat0
+    size = cell_size_m(zoom, lat0)
+    kx = _M_PER_DEG_LON * np.cos(np.radians(lat0))
+    x, y = lon * kx, lat * _M_PER_DEG_LAT
+    q, r = _hex_round((_SQRT3 / 3 * x - y / 3) / size, (2 / 3 * y) / size)
+
+    cells = pd.DataFrame({"q": q, "r": r})
+    cells["price"] = pd.to_numeric(df[price_col], errors="coerce").to_numpy()[ok] if price_col in df.columns else np.nan
+    cells["score"] = pd.to_numeric(df[score_col], errors="coerce").to_numpy()[ok] if score_col in df.columns else np.nan
+    agg = cells.groupby(["q", "r"], sort=False).agg(
+        count=("price", "size"),
+        median_price=("price", "median"),
+        mean_score=("score", "mean"),
+    ).reset_index()
+    cx = size * _SQRT3 * (agg["q"] + agg["r"] / 2)
+    cy = size * 1.5 * agg["r"]
+    agg["lon"] = cx / kx
+    agg["lat"] = cy / _M_PER_DEG_LAT
+    agg["radius_m"] = size
+    return agg[["lat", "lon", "count", "median_price", "mean_score", "radius_m"]]
+
+def precompute_bins(
+    df: pd.DataFrame,
+    zooms: Iterable[int] = DEFAULT_ZOOMS,
+    max_cells: int = MAX_CELLS,
+    **kwargs
+) -> Dict[int, pd.DataFrame]:
+    """
+    Bins per zoom level (coarse to fine), computed once per snapshot.
+    Stops at the first level with more than max_cells cells to keep payloads small.
+    """
+    if "latitude" not in df.columns or "longitude" not in df.columns:
+        return {}
+    lat = pd.to_numeric(df["latitude"], errors="coerce")
+    if lat.notna().sum() == 0:
+        return {}
+    lat0 = float(lat.median())
+    out: Dict[int, pd.DataFrame] = {}
+    for z in sorted(zooms):
+        bins = hex_bins(df, z, lat0=lat0, **kwargs)
+        if out and len(bins) > max_cells:
+            break
+        out[z] = bins
+    return out
@@ -0,0 +1,113 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from scipy import sparse
+    from sklearn.feature_extraction.text import CountVectorizer
+
+SEARCH_FIELDS = ("name", "description", "neighborhood_overview")
+FIELD_REPEAT = {"name": 3}  # title terms count as if they appeared three times
+K1 = 1.2
+B = 0.75
+
+@dataclass
+class SearchIndex:
+    """
+    Inverted index over listing text (CSC doc-term matrix: one postings list per term,
+    doc positions + term frequencies) with BM25 ranking. Doc ids are row positions
+    in the frame the index was built from.
+    """
+    vectorizer: CountVectorizer
+    postings: sparse.csc_matrix
+    idf: np.ndarray
+    doc_len: np.ndarray
+    avgdl: float
+
+    @property
+    def n_docs(self) -> int:
+        return self.postings.shape[0]
+
+    def bm25(self, query: str) -> np.ndarray:
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        vocab = self.vectorizer.vocabulary_
+        analyzer = self.vectorizer.build_analyzer()
+        norm = K1 * (1 - B + B * self.doc_len / self.avgdl)
+        for term in dict.fromkeys(analyzer(query)):
+            t = vocab.get(term)
+            if t is None:
+                continue
+            lo, hi = self.postings.indptr[t], self.postings.indptr[t + 1]
+            docs = self.postings.indices[lo:hi]
+            tf = self.postings.data[lo:hi]
+            scores[docs] += self.idf[t] * tf * (K1 + 1) / (tf + norm[docs])
+        return scores
+
+    def search(
+        self,
+        query: str,
+        mask: Optional[np.ndarray] = None,
+        rank_by: Optional[np.ndarray] = None,
+        rank_weight: float = 0.3,
+        top_k: int = 20
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (row positions, scores) of the best matches, best first.
+        Only docs matching at least one query term and passing mask are returned;
+        rank_by (e.g. total_score) is blended in after both are scaled to [0, 1].
+        """
+        scores = self.bm25(query)
+        hit = scores > 0
+        if mask is not None:
+            hit &= np.asarray(mask, dtype=bool)
+        pos = np.flatnonzero(hit)
+        if not len(pos):
+            return pos, scores[pos]
+        rel = scores[pos] / scores[pos].max()
+        if rank_by is not None and rank_weight:
+            r = np.nan_to_num(np.asarray(rank_by, dtype=float)[pos], nan=0.0)
+            span = r.max() - r.min()
+            r = (r - r.min()) / span if span else np.zeros_like(r)
+            rel = (1 - rank_weight) * rel + rank_weight * r
+        k = min(top_k, len(pos))
+        best = np.argpartition(-rel, k - 1)[:k]
+        best = best[np.argsort(-rel[best])]
+        return pos[best], rel[best]
+
+def _documents(df: pd.DataFrame, fields: Sequence[str]) -> pd.Series:
+    doc = pd.Series("", index=df.index)
+    for f in fields:
+        if f in df.columns:
+            text = df[f].fillna("").astype(str)
+            for _ in range(FIELD_REPEAT.get(f, 1)):
+                doc = doc + " " + text
+    return doc
+
+def build_search_index(df: pd.DataFrame, fields: Sequence[str] = SEARCH_FIELDS) -> Optional[SearchIndex]:
+    """
+    Tokenize (lowercase, strip HTML tags, drop English stop words) once per snapshot.
+    Returns None when the frame has no text fields.
+    """
+    if not any(f in df.columns for f in fields) or df.empty:
+        return None
+    docs = _documents(df, fields).str.replace(r"<[^>]+>", " ", regex=True)
+    from sklearn.feature_extraction.text import CountVectorizer
+    vectorizer = CountVectorizer(stop_words="english", dtype=np.float32)
+    try:
+        X = vectorizer.fit_transform(docs.to_numpy())
+    except ValueError:  # empty vocabulary
+        return None
+    postings = X.tocsc()
+    n = X.shape[0]
+    df_t = np.diff(postings.indptr)
+    idf = np.log(1 + (n - df_t + 0.5) / (df_t + 0.5)).astype(np.float32)
+    doc_len = np.asarray(X.sum(axis=1)).ravel().astype(np.float32)
+    return SearchIndex(
+        vectorizer=vectorizer,
+        postings=postings,
+        idf=idf,
+        doc_len=doc_len,
+        avgdl=float(doc_len.mean()) or 1.0,
+    )
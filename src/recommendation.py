@@ -14,7 +14,8 @@ def _norm(series):
     return (s - mn) / (mx - mn)
 
 def build_recommendation_scores(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+    # Shallow copy: only new columns are added, the input's data is shared
+    df = df.copy(deep=False)
 
     if "predicted_price" in df.columns and "price" in df.columns:
         raw_val = (df["predicted_price"] - df["price"]) / df["predicted_price"].clip(lower=1)
@@ -22,7 +23,8 @@ def build_recommendation_scores(df: pd.DataFrame) -> pd.DataFrame:
     else:
         price_value = np.zeros(len(df))
 
-    reviews_col = next((c for c in ["number_of_reviews","num_reviews","reviews_count"] if c in df.columns), None)
+    # Columns are canonical after ingest (schema_checks.canonicalize)
+    reviews_col = "number_of_reviews" if "number_of_reviews" in df.columns else None
     if reviews_col:
         rev_component = np.log1p(df[reviews_col].fillna(0))
     else:
@@ -34,6 +36,10 @@ def build_recommendation_scores(df: pd.DataFrame) -> pd.DataFrame:
         rating_factor = 1.0
 
     review_quality = _norm(rev_component * rating_factor)
+    if "review_sentiment" in df.columns:
+        # Text sentiment (pipelines.review_sentiment) tempers volume x rating; unscored listings are neutral
+        sentiment = df["review_sentiment"].fillna(0.5) * (1 - df["negative_review_rate"].fillna(0) / 2)
+        review_quality = 0.7 * review_quality + 0.3 * sentiment
 
     if "amenities_count" in df.columns:
         amenity_richness = _norm(df["amenities_count"].fillna(0))
@@ -84,6 +90,12 @@ def build_recommendation_scores(df: pd.DataFrame) -> pd.DataFrame:
             elif row["review_scores_rating"] >= 90:
                 r_parts.append("strong rating")
 
+        if row.get("reviews_scored", 0) >= 5:
+            if row["review_sentiment"] >= 0.9:
+                r_parts.append("glowing reviews")
+            elif row.get("negative_review_rate", 0) >= 0.25:
+                r_parts.append("some complaints in reviews")
+
         if "amenities_count" in row:
             if row["amenities_count"] >= 20:
                 r_parts.append("rich amenities")
@@ -103,7 +115,7 @@ def build_recommendation_scores(df: pd.DataFrame) -> pd.DataFrame:
     df["recommendation_reason"] = reasons
     return df
 
-def filter_by_preferences(
+def preference_mask(
     df: pd.DataFrame,
     price_range: Optional[tuple[float,float]] = None,
     reviews_range: Optional[tuple[int,int]] = None,
@@ -115,35 +127,39 @@ def filter_by_preferences(
     min_amenities_count: Optional[int] = None,
     min_value_score: Optional[float] = None,
     max_price_per_person: Optional[float] = None
-) -> pd.DataFrame:
-    out = df.copy()
+) -> pd.Series:
+    """
+    Boolean row mask for the given preferences; the frame itself is never copied,
+    so a shared snapshot can be filtered per session by keeping only the mask.
+    """
+    mask = pd.Series(True, index=df.index)
 
     # Price range
-    if price_range and "price" in out.columns:
+    if price_range and "price" in df.columns:
         lo, hi = price_range
-        out = out[(out["price"] >= lo) & (out["price"] <= hi)]
+        mask &= (df["price"] >= lo) & (df["price"] <= hi)
 
     # Reviews
     if reviews_range:
         lo_r, hi_r = reviews_range
-        rev_col = next((c for c in ["number_of_reviews","num_reviews","reviews_count"] if c in out.columns), None)
-        if rev_col:
-            out = out[out[rev_col].fillna(0).between(lo_r, hi_r)]
+        if "number_of_reviews" in df.columns:
+            mask &= df["number_of_reviews"].fillna(0).between(lo_r, hi_r)
 
-    # Stars (convert 1–5 to rating 0–100)
-    if stars_range and "review_scores_rating" in out.columns:
+    # Stars (convert 1–5 to rating 0–100 for older snapshots; newer ones already rate 0–5)
+    if stars_range and "review_scores_rating" in df.columns:
         lo_s, hi_s = stars_range
-        lo_real = (lo_s - 0.0) * 20  # inclusive
-        hi_real = hi_s * 20
-        out = out[out["review_scores_rating"].fillna(0).between(lo_real, hi_real)]
+        scale = 20 if df["review_scores_rating"].max() > 5 else 1
+        lo_real = (lo_s - 0.0) * scale  # inclusive
+        hi_real = hi_s * scale
+        mask &= df["review_scores_rating"].fillna(0).between(lo_real, hi_real)
 
     # Availability
-    if availability_range and "availability_365" in out.columns:
+    if availability_range and "availability_365" in df.columns:
         alo, ahi = availability_range
-        out = out[out["availability_365"].fillna(0).between(alo, ahi)]
+        mask &= df["availability_365"].fillna(0).between(alo, ahi)
 
     # Occupancy group
-    if occupancy_group and "accommodates" in out.columns:
+    if occupancy_group and "accommodates" in df.columns:
         mapping = {
             "Solo (1)": (1,1),
             "Duo (2)": (2,2),
@@ -153,32 +169,60 @@ def filter_by_preferences(
         }
         if occupancy_group in mapping:
             lo_a, hi_a = mapping[occupancy_group]
-            out = out[out["accommodates"].fillna(0).between(lo_a, hi_a)]
+            mask &= df["accommodates"].fillna(0).between(lo_a, hi_a)
 
     # Room types multi-select
-    if room_types and "room_type" in out.columns and len(room_types):
-        out = out[out["room_type"].isin(room_types)]
+    if room_types and "room_type" in df.columns and len(room_types):
+        mask &= df["room_type"].isin(room_types)
 
     # Amenities list
-    if required_amenities and "amenities_list" in out.columns:
+    if required_amenities and "amenities_list" in df.columns:
         req = [r.lower() for r in required_amenities]
-        mask = []
-        for lst in out["amenities_list"]:
+        has_all = []
+        for lst in df["amenities_list"]:
             st_lower = {x.lower() for x in lst}
-            mask.append(all(r in st_lower for r in req))
-        out = out[pd.Series(mask, index=out.index)]
+            has_all.append(all(r in st_lower for r in req))
+        mask &= pd.Series(has_all, index=df.index)
 
     # Minimum amenities count
-    if min_amenities_count is not None and "amenities_count" in out.columns:
-        out = out[out["amenities_count"].fillna(0) >= min_amenities_count]
+    if min_amenities_count is not None and "amenities_count" in df.columns:
+        mask &= df["amenities_count"].fillna(0) >= min_amenities_count
 
     # Minimum value score (score_price_value)
-    if min_value_score is not None and "score_price_value" in out.columns:
-        out = out[out["score_price_value"] >= min_value_score]
+    if min_value_score is not None and "score_price_value" in df.columns:
+        mask &= df["score_price_value"] >= min_value_score
 
     # Max price per person
-    if max_price_per_person is not None and "accommodates" in out.columns and "price" in out.columns:
-        ppp = out["price"] / out["accommodates"].replace(0, 1)
-        out = out[ppp <= max_price_per_person]
+    if max_price_per_person is not None and "accommodates" in df.columns and "price" in df.columns:
+        ppp = df["price"] / df["accommodates"].replace(0, 1)
+        mask &= ppp <= max_price_per_person
 
-    return out
\ No newline at end of file
+    return mask
+
+def filter_by_preferences(
+    df: pd.DataFrame,
+    price_range: Optional[tuple[float,float]] = None,
+    reviews_range: Optional[tuple[int,int]] = None,
+    stars_range: Optional[tuple[float,float]] = None,
+    availability_range: Optional[tuple[int,int]] = None,
+    occupancy_group: Optional[str] = None,
+    room_types: Optional[List[str]] = None,
+    required_amenities: Optional[List[str]] = None,
+    min_amenities_count: Optional[int] = None,
+    min_value_score: Optional[float] = None,
+    max_price_per_person: Optional[float] = None
+) -> pd.DataFrame:
+    mask = preference_mask(
+        df,
+        price_range=price_range,
+        reviews_range=reviews_range,
+        stars_range=stars_range,
+        availability_range=availability_range,
+        occupancy_group=occupancy_group,
+        room_types=room_types,
+        required_amenities=required_amenities,
+        min_amenities_count=min_amenities_count,
+        min_value_score=min_value_score,
+        max_price_per_person=max_price_per_person
+    )
+    return df[mask]
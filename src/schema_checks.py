@@ -1,14 +1,178 @@
+from __future__ import annotations
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
 import pandas as pd
 
 REQUIRED = ["id", "price", "latitude", "longitude"]
 
+# Canonical column -> alternative names seen across sources (compared after _norm_name).
+# Only names specific enough to be safe on any CSV; generic words are in AMBIGUOUS_ALIASES.
+CANONICAL_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "id": ("listing_id", "listingid"),
+    "name": ("listing_name",),
+    "price": ("nightly_price", "total_price"),
+    "number_of_reviews": ("num_reviews", "reviews_count", "review_count"),
+    "review_scores_rating": ("review_rating",),
+    "availability_365": ("days_available",),
+    "amenities_count": ("num_amenities",),
+    "image_url": ("picture_url", "thumbnail_url"),
+    "latitude": ("lat",),
+    "longitude": ("lon", "lng"),
+    "room_type": ("roomtype",),
+    "neighbourhood": ("neighborhood",),
+}
+
+# Generic words that often mean something else in arbitrary uploads or scrapes; used
+# only when the canonical column is missing and the values pass VALUE_CHECKS
+AMBIGUOUS_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "name": ("title",),
+    "price": ("cost",),
+    "number_of_reviews": ("reviews",),
+    "review_scores_rating": ("rating", "stars"),
+    "availability_365": ("availability",),
+    "image_url": ("image", "img", "photo", "picture"),
+    "longitude": ("long",),
+}
+
+# Extra aliases for sources whose raw field names differ from the usual ones
+SOURCE_ALIASES: Dict[str, Dict[str, str]] = {
+    "booking": {"raw_price": "price", "url": "listing_url"},
+    "InsideAirbnb": {"neighbourhood_cleansed": "neighbourhood"},
+}
+# Columns that identify a source's files when they arrive through a generic source
+# (an InsideAirbnb listings.csv uploaded as LocalCSVUpload or fetched by URL)
+SOURCE_SIGNATURES: Dict[str, Tuple[str, ...]] = {
+    "InsideAirbnb": ("neighbourhood_cleansed", "host_id", "listing_url"),
+}
+
+def _numeric(s: pd.Series) -> pd.Series:
+    if s.dtype == object:
+        s = s.astype(str).str.replace(r"[^\d\.\-]", "", regex=True)
+    return pd.to_numeric(s, errors="coerce")
+
+VALUE_CHECKS: Dict[str, Callable[[pd.Series], pd.Series]] = {
+    "name": lambda s: s.map(lambda v: isinstance(v, str) and not v.strip().replace(".", "", 1).isdigit()),
+    "price": lambda s: _numeric(s) >= 0,
+    "number_of_reviews": lambda s: (lambda n: (n >= 0) & (n % 1 == 0))(pd.to_numeric(s, errors="coerce")),
+    "review_scores_rating": lambda s: pd.to_numeric(s, errors="coerce").between(0, 100),
+    "availability_365": lambda s: pd.to_numeric(s, errors="coerce").between(0, 366),
+    "image_url": lambda s: s.astype(str).str.match(r"(https?:)?//|/|data:image"),
+    "longitude": lambda s: pd.to_numeric(s, errors="coerce").between(-180, 180),
+}
+VALUE_CHECK_SAMPLE = 1000
+VALUE_CHECK_MIN_SHARE = 0.9
+
 def assert_basic_schema(df: pd.DataFrame):
     missing = [c for c in REQUIRED if c not in df.columns]
     if missing:
         raise ValueError(f"Missing required columns: {missing}")
 
+def _norm_name(col) -> str:
+    return re.sub(r"[\s\-\.]+", "_", str(col).strip().lower())
+
+def detect_source(columns: Tuple, source: Optional[str] = None) -> Optional[str]:
+    """
+    The source whose aliases apply: `source` itself when it has any, else a source
+    whose signature columns are all present.
+    """
+    if source in SOURCE_ALIASES:
+        return source
+    present = {_norm_name(c) for c in columns}
+    for name, signature in SOURCE_SIGNATURES.items():
+        if all(c in present for c in signature):
+            return name
+    return source
+
+@lru_cache(maxsize=256)
+def schema_mapping(columns: Tuple, source: Optional[str] = None) -> Dict[str, str]:
+    """
+    {incoming column: canonical column} for one source signature (source, column tuple).
+    Source-specific aliases win: a raw column already holding the canonical name is
+    moved aside to "<name>_raw" (InsideAirbnb's free-text neighbourhood). Otherwise
+    exact (normalised) names win over aliases; a canonical column that is already
+    present is never overwritten, and each canonical name is claimed at most once.
+    Ambiguous aliases are not included (see ambiguous_candidates).
+    """
+    source_aliases = SOURCE_ALIASES.get(detect_source(columns, source) or "", {})
+    lookup: Dict[str, str] = {}
+    for canonical, aliases in CANONICAL_ALIASES.items():
+        for alias in aliases:
+            lookup.setdefault(alias, canonical)
+    lookup.update(source_aliases)
+
+    taken = set(columns)
+    mapping: Dict[str, str] = {}
+    for col in columns:
+        target = source_aliases.get(_norm_name(col))
+        if not target or target == col or target in mapping.values():
+            continue
+        if target in taken:
+            displaced = f"{target}_raw"
+            if target not in columns or target in mapping or displaced in taken:
+                continue
+            mapping[target] = displaced
+            taken.add(displaced)
+        mapping[col] = target
+        taken.add(target)
+    # Pass 1: case/spacing variants of canonical names; pass 2: aliases
+    for use_alias in (False, True):
+        for col in columns:
+            if col in mapping or col in CANONICAL_ALIASES:
+                continue
+            norm = _norm_name(col)
+            target = lookup.get(norm) if use_alias else (norm if norm in CANONICAL_ALIASES else None)
+            if target and target not in taken:
+                mapping[col] = target
+                taken.add(target)
+    return mapping
+
+@lru_cache(maxsize=256)
+def ambiguous_candidates(columns: Tuple, source: Optional[str] = None) -> Dict[str, str]:
+    """
+    {incoming column: canonical column} for generic aliases whose canonical column is
+    neither present nor claimed by schema_mapping; accept_ambiguous checks the values.
+    """
+    mapping = schema_mapping(columns, source)
+    taken = {mapping.get(c, c) for c in columns}
+    candidates: Dict[str, str] = {}
+    for canonical, aliases in AMBIGUOUS_ALIASES.items():
+        if canonical in taken:
+            continue
+        for col in columns:
+            if col not in mapping and col not in candidates and _norm_name(col) in aliases:
+                candidates[col] = canonical
+                break
+    return candidates
+
+def accept_ambiguous(df: pd.DataFrame, candidates: Dict[str, str]) -> Dict[str, str]:
+    """
+    The candidates whose non-null values (a sample) look like the canonical column.
+    """
+    accepted: Dict[str, str] = {}
+    for col, canonical in candidates.items():
+        if col not in df.columns:
+            continue
+        values = df[col].dropna()
+        if values.empty:
+            continue
+        values = values.head(VALUE_CHECK_SAMPLE)
+        if VALUE_CHECKS[canonical](values).astype(bool).mean() >= VALUE_CHECK_MIN_SHARE:
+            accepted[col] = canonical
+    return accepted
+
+def canonicalize(df: pd.DataFrame, source: Optional[str] = None) -> pd.DataFrame:
+    """
+    Rename incoming columns to the canonical set (in place) so downstream code can
+    use fixed names. The name mapping is cached per source signature; ambiguous
+    aliases are checked against the values every time.
+    """
+    columns = tuple(df.columns)
+    mapping = {**schema_mapping(columns, source),
+               **accept_ambiguous(df, ambiguous_candidates(columns, source))}
+    if mapping:
+        df.rename(columns=mapping, inplace=True)
+    return df
+
 def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    # unify review counts
-    if "num_reviews" in df.columns and "number_of_reviews" not in df.columns:
-        df.rename(columns={"num_reviews": "number_of_reviews"}, inplace=True)
-    return df
\ No newline at end of file
+    return canonicalize(df)
@@ -1,8 +1,6 @@
 import re
 from dataclasses import dataclass, field
-from typing import Dict, List
-import requests
-from bs4 import BeautifulSoup
+from typing import Dict, List, Optional
 
 INSIDE_AIRBNB_INDEX = "https://insideairbnb.com/get-the-data/"
 
@@ -25,6 +23,7 @@ class DatasetVersion:
     reviews_url: str
     neighbourhoods_url: str
     neighbourhoods_geojson_url: str
+    calendar_url: Optional[str] = None
 
 @dataclass
 class CityCatalog:
@@ -33,13 +32,15 @@ class CityCatalog:
 
 CatalogType = Dict[str, Dict[str, Dict[str, CityCatalog]]]
 
-def _fetch_index() -> str:
-    r = requests.get(INSIDE_AIRBNB_INDEX, headers=HEADERS, timeout=60)
+def _fetch_index(cache_mode: str = "write") -> str:
+    from src.utils.http import get_client
+    r = get_client().get(INSIDE_AIRBNB_INDEX, headers=HEADERS, timeout=60, cache_mode=cache_mode)
     if r.status_code != 200:
         raise RuntimeError(f"Index fetch failed HTTP {r.status_code}")
     return r.text
 
 def _extract_listing_links(html: str) -> List[str]:
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(html, "html.parser")
     links = []
     for a in soup.find_all("a", href=True):
@@ -71,8 +72,8 @@ def _parse(url: str):
     region = "/".join(region_segments) if region_segments else "_"
     return country, region, city, date
 
-def scrape_catalog() -> CatalogType:
-    html = _fetch_index()
+def scrape_catalog(cache_mode: str = "write") -> CatalogType:
+    html = _fetch_index(cache_mode)
     links = _extract_listing_links(html)
     catalog: CatalogType = {}
     for link in links:
@@ -87,6 +88,7 @@ def scrape_catalog() -> CatalogType:
             reviews_url=base + "data/reviews.csv.gz",
             neighbourhoods_url=base + "visualisations/neighbourhoods.csv",
             neighbourhoods_geojson_url=base + "visualisations/neighbourhoods.geojson",
+            calendar_url=base + "data/calendar.csv.gz",
         )
         city_entry = catalog.setdefault(country, {}).setdefault(region, {}).setdefault(
             city, CityCatalog(latest_date=date, versions={})
@@ -0,0 +1,137 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from src.schema_checks import canonicalize
+from src.data_preprocessing import clean_data
+
+if TYPE_CHECKING:
+    from src.scraper import CityCatalog, DatasetVersion
+
+COLUMN_CACHE_DIR = Path("data/cache/columns_v2")  # v2: neighbourhood from neighbourhood_cleansed
+# Columns kept in the per-snapshot columnar cache; diffs read only what they compare
+CACHED_COLUMNS = ["id", "name", "neighbourhood", "room_type", "price", "availability_365",
+                  "review_scores_rating", "number_of_reviews", "latitude", "longitude"]
+DIFF_FIELDS = ["price", "availability_365", "review_scores_rating"]
+
+try:
+    import pyarrow as pa
+    _COLUMN_SUFFIX = ".feather"
+except ImportError:
+    pa = None
+    _COLUMN_SUFFIX = ".pkl"
+
+@dataclass
+class SnapshotDiff:
+    added: pd.DataFrame
+    removed: pd.DataFrame
+    changed: pd.DataFrame  # one row per listing with at least one changed field
+    summary: Dict[str, float]
+
+def column_cache_path(city: str, date: str) -> Path:
+    return COLUMN_CACHE_DIR / f"{city}_{date}{_COLUMN_SUFFIX}"
+
+def read_listing_columns(path: Path, columns: Sequence[str]) -> pd.DataFrame:
+    # usecols on the canonical names and their aliases keeps the CSV parse narrow
+    header = pd.read_csv(path, nrows=0).columns
+    renamed = canonicalize(pd.DataFrame(columns=header), "InsideAirbnb").columns
+    keep = [orig for orig, canon in zip(header, renamed) if canon in columns]
+    df = clean_data(pd.read_csv(path, usecols=keep, low_memory=False), source="InsideAirbnb")
+    for col in df.columns:
+        if col not in ("name", "neighbourhood", "room_type"):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    df = df.dropna(subset=["id"]).drop_duplicates("id", keep="last")
+    df["id"] = df["id"].astype(np.int64)
+    return df.reset_index(drop=True)
+
+def snapshot_columns(
+    city: str,
+    date: str,
+    version: DatasetVersion,
+    columns: Optional[Sequence[str]] = None,
+    force: bool = False
+) -> pd.DataFrame:
+    """
+    Narrow columnar copy of one snapshot, built once from the raw listings file.
+    Only `columns` (plus id) are read back from the cache.
+    """
+    wanted = list(dict.fromkeys(["id", *(columns or CACHED_COLUMNS)]))
+    path = column_cache_path(city, date)
+    if force or not path.exists():
+        from src.downloader import download_dataset
+        files = download_dataset(version, city=city, date=date, force=force)
+        df = read_listing_columns(files["listings"], CACHED_COLUMNS)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if pa is not None:
+            df.to_feather(path)
+        else:
+            df.to_pickle(path)
+    if pa is not None:
+        names = pa.ipc.open_file(pa.memory_map(str(path), "r")).schema.names
+        return pd.read_feather(path, columns=[c for c in wanted if c in names])
+    df = pd.read_pickle(path)
+    return df[[c for c in wanted if c in df.columns]]
+
+def diff_snapshots(
+    old: pd.DataFrame,
+    new: pd.DataFrame,
+    fields: Sequence[str] = DIFF_FIELDS,
+    label_cols: Sequence[str] = ("name", "neighbourhood")
+) -> SnapshotDiff:
+    """
+    Hash join on listing id, then vectorised comparisons of each field.
+    NaN -> NaN is not a change; NaN <-> value is.
+    """
+    fields = [f for f in fields if f in old.columns and f in new.columns]
+    labels = [c for c in label_cols if c in new.columns]
+    old = old.drop_duplicates("id", keep="last")
+    new = new.drop_duplicates("id", keep="last")
+    old_ids = pd.Index(old["id"])
+    new_ids = pd.Index(new["id"])
+    removed_mask = ~old_ids.isin(new_ids)
+    added_mask = ~new_ids.isin(old_ids)
+
+    both_new = new.loc[~added_mask, ["id", *labels, *fields]]
+    pos = old_ids.get_indexer(both_new["id"])
+    changed = both_new[["id", *labels]].reset_index(drop=True)
+    any_change = np.zeros(len(changed), dtype=bool)
+    summary: Dict[str, float] = {
+        "old_listings": len(old), "new_listings": len(new),
+        "added": int(added_mask.sum()), "removed": int(removed_mask.sum()),
+        "retained": len(changed),
+    }
+    for f in fields:
+        a = old[f].to_numpy(dtype=float)[pos]
+        b = both_new[f].to_numpy(dtype=float)
+        diff = (a != b) & ~(np.isnan(a) & np.isnan(b))
+        changed[f"{f}_old"] = a
+        changed[f"{f}_new"] = b
+        changed[f"{f}_delta"] = b - a
+        any_change |= diff
+        summary[f"{f}_changed"] = int(diff.sum())
+        both = ~np.isnan(a) & ~np.isnan(b)
+        summary[f"{f}_median_delta"] = float(np.median(b[both] - a[both])) if both.any() else np.nan
+    return SnapshotDiff(
+        added=new.loc[added_mask].reset_index(drop=True),
+        removed=old.loc[removed_mask].reset_index(drop=True),
+        changed=changed[any_change].reset_index(drop=True),
+        summary=summary,
+    )
+
+def diff_city(
+    city: str,
+    entry: CityCatalog,
+    old_date: str,
+    new_date: str,
+    fields: Sequence[str] = DIFF_FIELDS,
+    label_cols: Sequence[str] = ("name", "neighbourhood")
+) -> SnapshotDiff:
+    """
+    Diff two dates of one city from the columnar cache (downloading once if needed).
+    """
+    columns: List[str] = [*fields, *label_cols]
+    old = snapshot_columns(city, old_date, entry.versions[old_date], columns)
+    new = snapshot_columns(city, new_date, entry.versions[new_date], columns)
+    return diff_snapshots(old, new, fields, label_cols)
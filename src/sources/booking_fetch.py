@@ -1,11 +1,25 @@
 from __future__ import annotations
-import requests, time, random, json, os, hashlib
+import requests, time, random, os, hashlib, asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse, urljoin
 from bs4 import BeautifulSoup
-from datetime import datetime
+from datetime import datetime, timezone
+from src.utils.http import HttpClient, get_client
+from src.utils.rate_limit import HostRateLimiter
+from src.sources.scrape_store import ScrapeStore, get_store
 
 ESSENTIAL_PARAMS = {"checkin", "checkout", "dest_id", "dest_type", "city"}
 PAGE_SIZE = 25
+DEFAULT_CACHE_DIR = os.path.join("src", "manifests")
+DEFAULT_TTL_S = 6 * 3600
+DEFAULT_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/125 Safari/537.36"),
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept": "text/html,application/xhtml+xml"
+}
 
 class BookingBlocked(Exception):
     pass
@@ -20,46 +34,80 @@ def normalize_booking_url(raw: str) -> str:
     new_q = urlencode(filtered, doseq=True)
     return urlunparse((p.scheme, p.netloc, p.path, p.params, new_q, ""))
 
-def _manifest_path(cache_dir: str, key: str) -> str:
-    return os.path.join(cache_dir, f"{key}.meta.json")
+def _cache_key(norm: str) -> str:
+    return "booking_" + hashlib.sha256(norm.encode("utf-8")).hexdigest()[:16]
 
-def _data_path(cache_dir: str, key: str) -> str:
-    return os.path.join(cache_dir, f"{key}.listings.json")
+def _page_url(norm: str, page: int) -> str:
+    offset = page * PAGE_SIZE
+    if not offset:
+        return norm
+    sep = "&" if "?" in norm else "?"
+    return f"{norm}{sep}offset={offset}"
+
+def parse_property_cards(html: str) -> List[Dict[str, str]]:
+    soup = BeautifulSoup(html, "html.parser")
+    rows = []
+    for card in soup.select('[data-testid="property-card"]'):
+        title_tag = card.select_one('a[data-testid="title-link"]')
+        if not title_tag:
+            continue
+        title = title_tag.get_text(strip=True)
+        rel = title_tag.get("href") or ""
+        full = urljoin("https://www.booking.com", rel.split("?")[0])
+        price_el = card.select_one('[data-testid="price-and-discounted-price"]')
+        price_txt = price_el.get_text(" ", strip=True) if price_el else ""
+        rows.append({
+            "source": "booking",
+            "title": title,
+            "url": full,
+            "raw_price": price_txt
+        })
+    return rows
+
+def _save(store: ScrapeStore, key: str, url: str, norm: str, pages: int, rows, statuses,
+          ttl: Optional[float]) -> Dict:
+    fetched_at = time.time()
+    manifest = {
+        "source": "booking",
+        "normalized_url": norm,
+        "original_url_hash": hashlib.md5(url.encode("utf-8")).hexdigest(),
+        "fetched_at": datetime.fromtimestamp(fetched_at, timezone.utc).isoformat(),
+        "pages_attempted": pages,
+        "records": len(rows),
+        "http_trace": statuses,
+        "blocked": False
+    }
+    return store.put(key, "booking", norm, rows, manifest, ttl=ttl, fetched_at=fetched_at)
 
 def fetch_booking_listings(url: str, pages: int = 2, delay: float = 0.8,
-                           cache_dir: str = "src\\manifests",
-                           force_refresh: bool = False):
-    os.makedirs(cache_dir, exist_ok=True)
+                           cache_dir: str = DEFAULT_CACHE_DIR,
+                           force_refresh: bool = False,
+                           ttl: Optional[float] = DEFAULT_TTL_S,
+                           cache_mode: str = "write"):
+    """
+    Returns (rows, manifest). Results are cached in the scrape store under
+    cache_dir and reused until ttl seconds have passed (ttl=None: never expire).
+    cache_mode controls the raw response cache (utils.http.CACHE_MODES); "replay"
+    re-parses previously fetched pages without hitting Booking.
+    """
+    store = get_store(cache_dir)
     norm = normalize_booking_url(url)
-    key = "booking_" + hashlib.sha256(norm.encode("utf-8")).hexdigest()[:16]
-    manifest_file = _manifest_path(cache_dir, key)
-    data_file = _data_path(cache_dir, key)
-
-    if (not force_refresh) and os.path.exists(data_file):
-        with open(data_file, "r", encoding="utf-8") as f:
-            payload = json.load(f)
-        return payload, manifest_file
-
-    session = requests.Session()
-    headers = {
-        "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                       "(KHTML, like Gecko) Chrome/125 Safari/537.36"),
-        "Accept-Language": "en-US,en;q=0.9",
-        "Accept": "text/html,application/xhtml+xml"
-    }
+    key = _cache_key(norm)
+
+    if not force_refresh:
+        cached = store.get(key)
+        if cached is not None:
+            return cached
+
+    client = get_client()
 
     all_rows = []
     blocked = False
     statuses = []
 
     for page in range(pages):
-        offset = page * PAGE_SIZE
-        page_url = norm
-        if offset:
-            sep = "&" if "?" in page_url else "?"
-            page_url = f"{norm}{sep}offset={offset}"
-
-        r = session.get(page_url, headers=headers, timeout=30)
+        page_url = _page_url(norm, page)
+        r = client.get(page_url, headers=DEFAULT_HEADERS, timeout=30, cache_mode=cache_mode)
         statuses.append({"url": page_url, "status": r.status_code})
         if r.status_code in (403, 429):
             blocked = True
@@ -67,43 +115,137 @@ def fetch_booking_listings(url: str, pages: int = 2, delay: float = 0.8,
         if r.status_code != 200:
             break
 
-        soup = BeautifulSoup(r.text, "html.parser")
-        cards = soup.select('[data-testid="property-card"]')
-        if not cards:
+        rows = parse_property_cards(r.text)
+        if not rows:
             break
-        for card in cards:
-            title_tag = card.select_one('a[data-testid="title-link"]')
-            if not title_tag:
-                continue
-            title = title_tag.get_text(strip=True)
-            rel = title_tag.get("href") or ""
-            full = urljoin("https://www.booking.com", rel.split("?")[0])
-            price_el = card.select_one('[data-testid="price-and-discounted-price"]')
-            price_txt = price_el.get_text(" ", strip=True) if price_el else ""
-            all_rows.append({
-                "source": "booking",
-                "title": title,
-                "url": full,
-                "raw_price": price_txt
-            })
-        time.sleep(delay + random.random()*0.3)
+        all_rows.extend(rows)
+        if not getattr(r, "from_cache", False):
+            time.sleep(delay + random.random()*0.3)
 
     if blocked:
         raise BookingBlocked(f"Blocked (statuses: {statuses})")
 
-    manifest = {
-        "source": "booking",
-        "normalized_url": norm,
-        "original_url_hash": hashlib.md5(url.encode("utf-8")).hexdigest(),
-        "fetched_at": datetime.utcnow().isoformat(),
-        "pages_attempted": pages,
-        "records": len(all_rows),
-        "http_trace": statuses,
-        "blocked": False
-    }
-    with open(data_file, "w", encoding="utf-8") as f:
-        json.dump(all_rows, f, ensure_ascii=False, indent=2)
-    with open(manifest_file, "w", encoding="utf-8") as f:
-        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    manifest = _save(store, key, url, norm, pages, all_rows, statuses, ttl)
+    return all_rows, manifest
+
+async def _get_with_backoff(client: HttpClient, page_url: str, limiter: HostRateLimiter,
+                            budget: asyncio.Semaphore, statuses: list,
+                            max_retries: int = 3, backoff_base: float = 2.0,
+                            cache_mode: str = "write"):
+    for attempt in range(max_retries + 1):
+        bucket = await limiter.acquire(page_url)
+        async with budget:
+            try:
+                r = await asyncio.to_thread(client.get, page_url, headers=DEFAULT_HEADERS, timeout=30,
+                                            cache_mode=cache_mode)
+            except requests.RequestException as e:
+                statuses.append({"url": page_url, "status": 0, "error": str(e)})
+                return None
+        statuses.append({"url": page_url, "status": r.status_code})
+        if r.status_code not in (403, 429):
+            if r.status_code == 200:
+                bucket.reward()
+            return r
+        bucket.penalize()
+        if attempt == max_retries:
+            return r
+        retry_after = r.headers.get("Retry-After", "")
+        wait = float(retry_after) if retry_after.isdigit() else backoff_base ** attempt
+        await asyncio.sleep(wait + random.random() * 0.5)
+    return None
+
+async def fetch_booking_listings_threaded(url: str, pages: int = 2,
+                                          cache_dir: str = DEFAULT_CACHE_DIR,
+                                          force_refresh: bool = False,
+                                          ttl: Optional[float] = DEFAULT_TTL_S,
+                                          cache_mode: str = "write",
+                                          client: Optional[HttpClient] = None,
+                                          limiter: Optional[HostRateLimiter] = None,
+                                          budget: Optional[asyncio.Semaphore] = None,
+                                          parse_pool: Optional[ThreadPoolExecutor] = None,
+                                          lookahead: int = 2):
+    """
+    Coroutine counterpart of fetch_booking_listings for running many searches on one
+    event loop. HTTP stays on the blocking client (run in worker threads via
+    asyncio.to_thread), paced by the per-host limiter; pages are parsed in parse_pool.
+    At most `lookahead` pages are in flight, and nothing past the first empty or
+    failed page is requested.
+    """
+    store = get_store(cache_dir)
+    norm = normalize_booking_url(url)
+    key = _cache_key(norm)
+    if not force_refresh:
+        cached = store.get(key)
+        if cached is not None:
+            return cached
+
+    client = client or get_client()
+    limiter = limiter or HostRateLimiter(rate=1.0, burst=2, jitter=0.3)
+    budget = budget or asyncio.Semaphore(4)
+    loop = asyncio.get_running_loop()
+    statuses: list = []
+
+    async def fetch_and_parse(page: int):
+        r = await _get_with_backoff(client, _page_url(norm, page), limiter, budget, statuses,
+                                    cache_mode=cache_mode)
+        if r is None:
+            return "error", []
+        if r.status_code in (403, 429):
+            return "blocked", []
+        if r.status_code != 200:
+            return "error", []
+        return "ok", await loop.run_in_executor(parse_pool, parse_property_cards, r.text)
+
+    in_flight: deque = deque()
+    next_page = 0
+
+    def top_up():
+        nonlocal next_page
+        while next_page < pages and len(in_flight) < max(1, lookahead):
+            in_flight.append(asyncio.ensure_future(fetch_and_parse(next_page)))
+            next_page += 1
+
+    all_rows = []
+    top_up()
+    try:
+        while in_flight:
+            outcome, rows = await in_flight.popleft()
+            if outcome == "blocked":
+                raise BookingBlocked(f"Blocked (statuses: {statuses})")
+            if outcome != "ok" or not rows:
+                # Same semantics as the sequential path: stop at the first empty/failed page
+                break
+            all_rows.extend(rows)
+            top_up()
+    finally:
+        # Lookahead pages past the end: drop them before they take limiter budget
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
+    manifest = await asyncio.to_thread(_save, store, key, url, norm, pages, all_rows, statuses, ttl)
+    return all_rows, manifest
+
+async def fetch_many_booking_async(urls: List[str], pages: int = 2,
+                                   max_concurrency: int = 8,
+                                   rate_per_host: float = 1.0,
+                                   burst: int = 2,
+                                   parse_workers: int = 4,
+                                   **kwargs) -> Dict[str, Tuple]:
+    """
+    Fetch many search URLs under one global concurrency budget and a shared
+    per-host limiter. Returns {url: (rows, manifest)} or {url: exception}.
+    """
+    client = get_client()
+    limiter = HostRateLimiter(rate=rate_per_host, burst=burst, jitter=0.3)
+    budget = asyncio.Semaphore(max_concurrency)
+    with ThreadPoolExecutor(max_workers=parse_workers) as parse_pool:
+        results = await asyncio.gather(*(
+            fetch_booking_listings_threaded(u, pages=pages, client=client, limiter=limiter,
+                                         budget=budget, parse_pool=parse_pool, **kwargs)
+            for u in urls
+        ), return_exceptions=True)
+    return dict(zip(urls, results))
 
-    return all_rows, manifest_file
\ No newline at end of file
+def fetch_many_booking(urls: List[str], **kwargs) -> Dict[str, Tuple]:
+    return asyncio.run(fetch_many_booking_async(urls, **kwargs))
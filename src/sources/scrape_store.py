@@ -0,0 +1,240 @@
+from __future__ import annotations
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from glob import glob
+from typing import Any, Dict, List, Optional, Tuple
+
+STORE_FILENAME = "scrape_store.sqlite"
+_DEFAULT_TTL = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS manifests (
+    key TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    normalized_url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    expires_at REAL,
+    record_count INTEGER NOT NULL,
+    meta TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_manifests_url ON manifests(normalized_url, source, fetched_at);
+CREATE INDEX IF NOT EXISTS ix_manifests_source_time ON manifests(source, fetched_at);
+CREATE INDEX IF NOT EXISTS ix_manifests_expires ON manifests(expires_at);
+CREATE TABLE IF NOT EXISTS records (
+    key TEXT NOT NULL REFERENCES manifests(key) ON DELETE CASCADE,
+    idx INTEGER NOT NULL,
+    url TEXT,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (key, idx)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_records_url ON records(url);
+"""
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+def _iso_to_epoch(value: Optional[str]) -> float:
+    if not value:
+        return time.time()
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        return time.time()
+    # Manifests were written with naive utcnow(); read them as UTC, not host local time
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+class ScrapeStore:
+    """
+    Single SQLite file holding scrape manifests and their records.
+    Manifests are indexed by (normalized_url, source, fetched_at); entries carry an
+    optional expiry so stale searches miss and can be compacted away.
+    """
+    def __init__(self, path: str, default_ttl: Optional[float] = None):
+        self.path = path
+        self.default_ttl = default_ttl
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+
+    def put(self, key: str, source: str, normalized_url: str, records: List[Dict[str, Any]],
+            meta: Dict[str, Any], ttl: Any = _DEFAULT_TTL, fetched_at: Optional[float] = None) -> Dict[str, Any]:
+        fetched_at = fetched_at if fetched_at is not None else _iso_to_epoch(meta.get("fetched_at"))
+        # ttl=None means the entry never expires
+        ttl = self.default_ttl if ttl is _DEFAULT_TTL else ttl
+        expires_at = fetched_at + ttl if ttl is not None else None
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM manifests WHERE key = ?", (key,))
+            self._conn.execute(
+                "INSERT INTO manifests (key, source, normalized_url, fetched_at, expires_at, record_count, meta) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, source, normalized_url, fetched_at, expires_at, len(records), _dumps(meta))
+            )
+            self._conn.executemany(
+                "INSERT INTO records (key, idx, url, payload) VALUES (?, ?, ?, ?)",
+                ((key, i, r.get("url"), _dumps(r)) for i, r in enumerate(records))
+            )
+        return {**meta, "key": key, "store": self.path}
+
+    def get_manifest(self, key: str, include_expired: bool = False) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT meta, expires_at FROM manifests WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        if not include_expired and row["expires_at"] is not None and row["expires_at"] <= time.time():
+            return None
+        return {**json.loads(row["meta"]), "key": key, "store": self.path}
+
+    def get(self, key: str, include_expired: bool = False) -> Optional[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+        manifest = self.get_manifest(key, include_expired)
+        if manifest is None:
+            return None
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM records WHERE key = ? ORDER BY idx", (key,)
+            ).fetchall()
+        return [json.loads(r["payload"]) for r in rows], manifest
+
+    def lookup(self, normalized_url: str, source: Optional[str] = None,
+               include_expired: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Most recent manifest for a normalized URL.
+        """
+        sql = "SELECT key FROM manifests WHERE normalized_url = ?"
+        args: list = [normalized_url]
+        if source:
+            sql += " AND source = ?"
+            args.append(source)
+        if not include_expired:
+            sql += " AND (expires_at IS NULL OR expires_at > ?)"
+            args.append(time.time())
+        with self._lock:
+            row = self._conn.execute(sql + " ORDER BY fetched_at DESC LIMIT 1", args).fetchone()
+        return self.get_manifest(row["key"], include_expired=True) if row else None
+
+    def list_manifests(self, source: Optional[str] = None, since: Optional[float] = None,
+                       include_expired: bool = False, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        sql = "SELECT key, source, normalized_url, fetched_at, expires_at, record_count FROM manifests WHERE 1=1"
+        args: list = []
+        if source:
+            sql += " AND source = ?"
+            args.append(source)
+        if since is not None:
+            sql += " AND fetched_at >= ?"
+            args.append(since)
+        if not include_expired:
+            sql += " AND (expires_at IS NULL OR expires_at > ?)"
+            args.append(time.time())
+        sql += " ORDER BY fetched_at DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            return [dict(r) for r in self._conn.execute(sql, args).fetchall()]
+
+    def query_records(self, source: Optional[str] = None, since: Optional[float] = None,
+                      url: Optional[str] = None, include_expired: bool = False,
+                      limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Records across fetches, e.g. every sighting of one property URL.
+        """
+        sql = ("SELECT r.payload, m.key, m.fetched_at FROM records r "
+               "JOIN manifests m ON m.key = r.key WHERE 1=1")
+        args: list = []
+        if url:
+            sql += " AND r.url = ?"
+            args.append(url)
+        if source:
+            sql += " AND m.source = ?"
+            args.append(source)
+        if since is not None:
+            sql += " AND m.fetched_at >= ?"
+            args.append(since)
+        if not include_expired:
+            sql += " AND (m.expires_at IS NULL OR m.expires_at > ?)"
+            args.append(time.time())
+        sql += " ORDER BY m.fetched_at DESC, r.idx"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        out = []
+        for row in rows:
+            rec = json.loads(row["payload"])
+            rec["_manifest_key"] = row["key"]
+            rec["_fetched_at"] = row["fetched_at"]
+            out.append(rec)
+        return out
+
+    def expire(self, now: Optional[float] = None) -> int:
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "DELETE FROM manifests WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (now if now is not None else time.time(),)
+            )
+        return cur.rowcount
+
+    def compact(self) -> Dict[str, int]:
+        """
+        Drop expired entries (records cascade), then reclaim space.
+        """
+        removed = self.expire()
+        with self._lock:
+            self._conn.execute("VACUUM")
+            self._conn.execute("ANALYZE")
+            count = self._conn.execute("SELECT COUNT(*) FROM manifests").fetchone()[0]
+        return {"expired_removed": removed, "manifests": count}
+
+    def import_json_manifests(self, cache_dir: str) -> int:
+        """
+        One-off migration of legacy *.meta.json / *.listings.json pairs.
+        Imported entries keep their original fetched_at and never expire.
+        """
+        imported = 0
+        for meta_file in glob(os.path.join(cache_dir, "*.meta.json")):
+            key = os.path.basename(meta_file)[: -len(".meta.json")]
+            data_file = os.path.join(cache_dir, f"{key}.listings.json")
+            if not os.path.exists(data_file) or self.get_manifest(key, include_expired=True):
+                continue
+            try:
+                with open(meta_file, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                with open(data_file, "r", encoding="utf-8") as f:
+                    records = json.load(f)
+            except (OSError, ValueError):
+                continue
+            self.put(key, meta.get("source", "unknown"), meta.get("normalized_url", ""),
+                     records, meta, ttl=None)
+            imported += 1
+        return imported
+
+    def close(self):
+        self._conn.close()
+
+_STORES: Dict[str, ScrapeStore] = {}
+_STORES_LOCK = threading.Lock()
+
+def get_store(cache_dir: str, default_ttl: Optional[float] = None) -> ScrapeStore:
+    """
+    Shared store living in cache_dir. Legacy JSON manifests found there are
+    imported the first time the store is opened in this process.
+    """
+    path = os.path.join(cache_dir, STORE_FILENAME)
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = ScrapeStore(path, default_ttl=default_ttl)
+            store.import_json_manifests(cache_dir)
+            _STORES[path] = store
+    return store
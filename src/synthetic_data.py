@@ -0,0 +1,278 @@
+from __future__ import annotations
+import gzip
+import json
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+import numpy as np
+import pandas as pd
+
+# (name, lat, lon, price factor, share of listings)
+NEIGHBOURHOODS = [
+    ("Centrum-West", 52.3738, 4.8910, 1.45, 0.16),
+    ("Centrum-Oost", 52.3680, 4.9060, 1.35, 0.12),
+    ("De Baarsjes", 52.3670, 4.8560, 1.05, 0.12),
+    ("De Pijp", 52.3550, 4.8950, 1.15, 0.11),
+    ("Westerpark", 52.3860, 4.8700, 1.00, 0.09),
+    ("Oud-Oost", 52.3590, 4.9250, 0.95, 0.09),
+    ("Zuid", 52.3480, 4.8700, 1.20, 0.08),
+    ("Bos en Lommer", 52.3790, 4.8480, 0.85, 0.07),
+    ("Noord-West", 52.3990, 4.9050, 0.80, 0.06),
+    ("Watergraafsmeer", 52.3500, 4.9400, 0.90, 0.05),
+    ("IJburg - Zeeburgereiland", 52.3560, 4.9950, 0.85, 0.03),
+    ("Gaasperdam - Driemond", 52.3050, 4.9900, 0.70, 0.02),
+]
+# (room type, share, base nightly price, accommodates range)
+ROOM_TYPES = [
+    ("Entire home/apt", 0.72, 140.0, (2, 8)),
+    ("Private room", 0.24, 70.0, (1, 3)),
+    ("Hotel room", 0.02, 110.0, (1, 4)),
+    ("Shared room", 0.02, 40.0, (1, 2)),
+]
+ROOM_TYPES_NAMES = [r[0] for r in ROOM_TYPES]
+PROPERTY_TYPES = {
+    "Entire home/apt": ["Entire rental unit", "Entire condo", "Entire home", "Entire loft", "Houseboat"],
+    "Private room": ["Private room in rental unit", "Private room in home", "Private room in bed and breakfast"],
+    "Hotel room": ["Room in boutique hotel", "Room in hotel"],
+    "Shared room": ["Shared room in hostel", "Shared room in rental unit"],
+}
+AMENITIES = [
+    "Wifi", "Kitchen", "Heating", "Essentials", "Hair dryer", "Hangers", "Iron", "Washer",
+    "Dryer", "Dishes and silverware", "Hot water", "Refrigerator", "Microwave", "Coffee maker",
+    "Dedicated workspace", "TV", "Smoke alarm", "Carbon monoxide alarm", "Fire extinguisher",
+    "First aid kit", "Bed linens", "Extra pillows and blankets", "Shampoo", "Body soap",
+    "Cooking basics", "Oven", "Stove", "Dishwasher", "Bathtub", "Elevator", "Balcony",
+    "Patio or balcony", "Private entrance", "Self check-in", "Lockbox", "Long term stays allowed",
+    "Luggage dropoff allowed", "Free street parking", "Paid parking off premises", "Bikes",
+    "Canal view", "City skyline view", "Garden view", "Backyard", "Indoor fireplace",
+    "Air conditioning", "Portable fans", "Crib", "High chair", "Children’s books and toys",
+    "Room-darkening shades", "Clothing storage", "Ethernet connection", "Pocket wifi",
+    "Board games", "Sound system", "Books and reading material", "Pets allowed", "Gym", "Sauna",
+]
+_ADJECTIVES = ["Cozy", "Bright", "Spacious", "Charming", "Modern", "Quiet", "Stylish", "Sunny", "Lovely", "Rustic"]
+_PLACES = ["loft", "apartment", "studio", "room", "houseboat", "canal house", "flat", "suite", "attic", "garden home"]
+_FEATURES = ["near the canals", "close to Vondelpark", "with balcony", "in historic centre", "near Central Station",
+             "with garden", "by the market", "with canal view", "for families", "near museums"]
+_SENTENCES = [
+    "The apartment is on the {n} floor of a typical Amsterdam building.",
+    "You will have the whole place to yourself.",
+    "The bedroom has a comfortable double bed and plenty of storage.",
+    "Trams and buses stop right around the corner.",
+    "The kitchen is fully equipped for cooking your own meals.",
+    "Please note that the stairs are steep, as in most old houses.",
+    "Fast wifi and a desk make it perfect for working remotely.",
+    "Bikes can be rented two minutes away.",
+    "It is a quiet street, but cafes and restaurants are just a short walk.",
+    "Check-in is flexible and we are happy to store your luggage.",
+]
+_OVERVIEW = [
+    "The neighbourhood is lively with lots of cafes, bars and small shops.",
+    "A quiet residential area with parks and playgrounds nearby.",
+    "Famous markets and museums are within walking distance.",
+    "Many locals cycle here; it is one of the greenest parts of the city.",
+    "Great restaurants from all over the world on every corner.",
+]
+_HOST_NAMES = ["Anna", "Bas", "Charlotte", "Daan", "Eva", "Femke", "Gijs", "Hanna", "Ivo", "Jasper",
+               "Kim", "Lotte", "Mark", "Noor", "Olivier", "Pien", "Ruben", "Sanne", "Thijs", "Vera"]
+_REVIEW_GOOD = ["great", "clean", "amazing", "nice", "excellent", "good"]
+_REVIEW_BAD = ["noisy", "dirty", "bad", "poor", "terrible"]
+_REVIEW_FILLER = ["the", "host", "was", "location", "apartment", "stay", "we", "very", "and", "place",
+                  "bed", "kitchen", "would", "recommend", "close", "to", "center", "check-in", "easy", "view"]
+CHUNK_ROWS = 100_000
+# gzip level 1: the files are scratch data and level 9 triples write time
+_GZIP = {"method": "gzip", "compresslevel": 1}
+
+def _money(values: np.ndarray) -> np.ndarray:
+    # InsideAirbnb format: "$1,234.00"
+    return np.array([f"${v:,.2f}" for v in values], dtype=object)
+
+def _pick(rng: np.random.Generator, items, n: int, p=None) -> np.ndarray:
+    return np.asarray(items, dtype=object)[rng.choice(len(items), n, p=p)]
+
+def _amenities(rng: np.random.Generator, counts: np.ndarray) -> np.ndarray:
+    pool = np.asarray(AMENITIES, dtype=object)
+    # Random ranks per row; the first `count` columns of argsort are a sample without replacement
+    order = np.argsort(rng.random((len(counts), len(pool))), axis=1)
+    return np.array([json.dumps(pool[row[:k]].tolist()) for row, k in zip(order, counts)], dtype=object)
+
+def _listing_chunk(rng: np.random.Generator, start_id: int, n: int, missing_rate: float) -> pd.DataFrame:
+    ids = np.arange(start_id, start_id + n, dtype=np.int64)
+    hood_idx = rng.choice(len(NEIGHBOURHOODS), n, p=[h[4] for h in NEIGHBOURHOODS])
+    hoods = np.array([h[0] for h in NEIGHBOURHOODS], dtype=object)[hood_idx]
+    lat = np.array([h[1] for h in NEIGHBOURHOODS])[hood_idx] + rng.normal(0, 0.008, n)
+    lon = np.array([h[2] for h in NEIGHBOURHOODS])[hood_idx] + rng.normal(0, 0.012, n)
+    hood_factor = np.array([h[3] for h in NEIGHBOURHOODS])[hood_idx]
+
+    room_idx = rng.choice(len(ROOM_TYPES), n, p=[r[1] for r in ROOM_TYPES])
+    rooms = np.array([r[0] for r in ROOM_TYPES], dtype=object)[room_idx]
+    lo = np.array([r[3][0] for r in ROOM_TYPES])[room_idx]
+    hi = np.array([r[3][1] for r in ROOM_TYPES])[room_idx]
+    accommodates = lo + np.minimum(rng.poisson(1.2, n), hi - lo)
+    bedrooms = np.maximum(1, np.ceil(accommodates / 2.2)).astype(int)
+    property_type = np.empty(n, dtype=object)
+    for i, r in enumerate(ROOM_TYPES_NAMES):
+        sel = room_idx == i
+        property_type[sel] = _pick(rng, PROPERTY_TYPES[r], int(sel.sum()))
+
+    base = np.array([r[2] for r in ROOM_TYPES])[room_idx]
+    price = base * hood_factor * (1 + 0.18 * (accommodates - 2).clip(0)) * rng.lognormal(0, 0.35, n)
+    price = np.round(price.clip(15, 9_999))
+    n_amen = rng.integers(5, 45, n)
+    availability = np.where(rng.random(n) < 0.35, 0, rng.integers(1, 366, n))
+    reviews = rng.negative_binomial(0.6, 0.02, n)
+    rating = np.where(reviews > 0, np.round(np.clip(5 - rng.gamma(1.2, 0.18, n), 1, 5), 2), np.nan)
+    host_ids = rng.integers(1_000, 1_000 + max(n // 3, 10), n) + start_id * 7
+    last_review = pd.Timestamp("2024-09-01") - pd.to_timedelta(rng.integers(0, 900, n), unit="D")
+
+    description = np.array([
+        "<br /><br />".join(_SENTENCES[j].format(n=("first", "second", "third")[j % 3]) for j in row)
+        for row in rng.integers(0, len(_SENTENCES), (n, 4))
+    ], dtype=object)
+    df = pd.DataFrame({
+        "id": ids,
+        "listing_url": [f"https://www.airbnb.com/rooms/{i}" for i in ids],
+        "name": (_pick(rng, _ADJECTIVES, n) + " " + _pick(rng, _PLACES, n) + " " + _pick(rng, _FEATURES, n)),
+        "description": description,
+        "neighborhood_overview": _pick(rng, _OVERVIEW, n),
+        "host_id": host_ids,
+        "host_name": _pick(rng, _HOST_NAMES, n),
+        "host_since": (pd.Timestamp("2010-01-01") + pd.to_timedelta(rng.integers(0, 5000, n), unit="D")).strftime("%Y-%m-%d"),
+        "host_is_superhost": np.where(rng.random(n) < 0.2, "t", "f"),
+        "host_listings_count": rng.geometric(0.6, n),
+        # Free-text host field; the usable one is neighbourhood_cleansed
+        "neighbourhood": np.where(rng.random(n) < 0.5, "Amsterdam, North Holland, Netherlands", None),
+        "neighbourhood_cleansed": hoods,
+        "latitude": np.round(lat, 6),
+        "longitude": np.round(lon, 6),
+        "property_type": property_type,
+        "room_type": rooms,
+        "accommodates": accommodates,
+        "bathrooms_text": np.where(room_idx == 0, "1 bath", "1 shared bath"),
+        "bedrooms": bedrooms,
+        "beds": bedrooms + rng.integers(0, 2, n),
+        "amenities": _amenities(rng, n_amen),
+        "price": _money(price),
+        "minimum_nights": rng.choice([1, 2, 3, 4, 7, 30], n, p=[0.2, 0.3, 0.25, 0.1, 0.1, 0.05]),
+        "maximum_nights": rng.choice([30, 365, 1125], n),
+        "availability_30": np.minimum(availability, rng.integers(0, 31, n)),
+        "availability_365": availability,
+        "number_of_reviews": reviews,
+        "last_review": np.where(reviews > 0, last_review.strftime("%Y-%m-%d"), None),
+        "review_scores_rating": rating,
+        "instant_bookable": np.where(rng.random(n) < 0.3, "t", "f"),
+        "reviews_per_month": np.where(reviews > 0, np.round(reviews / rng.uniform(6, 120, n), 2), np.nan),
+    })
+    if missing_rate:
+        # Real snapshots have holes in price/ratings/text
+        for col in ("price", "review_scores_rating", "description", "neighborhood_overview", "bedrooms"):
+            df.loc[rng.random(n) < missing_rate, col] = None
+    return df
+
+def iter_listings(
+    n: int,
+    seed: int = 0,
+    chunk_rows: int = CHUNK_ROWS,
+    missing_rate: float = 0.03
+) -> Iterator[pd.DataFrame]:
+    """
+    Synthetic listings.csv rows in InsideAirbnb's raw formats, chunk by chunk.
+    Deterministic for a given (n, seed, chunk_rows).
+    """
+    rng = np.random.default_rng(seed)
+    for start in range(0, n, chunk_rows):
+        yield _listing_chunk(rng, start + 1, min(chunk_rows, n - start), missing_rate)
+
+def generate_listings(n: int, seed: int = 0, missing_rate: float = 0.03) -> pd.DataFrame:
+    return pd.concat(list(iter_listings(n, seed, missing_rate=missing_rate)), ignore_index=True)
+
+def iter_reviews(listings: pd.DataFrame, seed: int = 0, max_per_listing: int = 50,
+                 chunk_listings: int = 20_000) -> Iterator[pd.DataFrame]:
+    """
+    reviews.csv rows (listing_id, id, date, reviewer_id, reviewer_name, comments);
+    number_of_reviews per listing, capped at max_per_listing.
+    """
+    rng = np.random.default_rng(seed + 1)
+    next_id = 1
+    for lo in range(0, len(listings), chunk_listings):
+        block = listings.iloc[lo: lo + chunk_listings]
+        counts = block["number_of_reviews"].fillna(0).astype(int).clip(0, max_per_listing).to_numpy()
+        listing_ids = np.repeat(block["id"].to_numpy(), counts)
+        n = len(listing_ids)
+        # Comments lean positive; a minority mention a complaint
+        good = _pick(rng, _REVIEW_GOOD, n)
+        bad = np.where(rng.random(n) < 0.15, " but " + _pick(rng, _REVIEW_BAD, n), "")
+        words = rng.integers(0, len(_REVIEW_FILLER), (n, 12))
+        filler = np.array([" ".join(_REVIEW_FILLER[j] for j in row) for row in words], dtype=object)
+        yield pd.DataFrame({
+            "listing_id": listing_ids,
+            "id": np.arange(next_id, next_id + n, dtype=np.int64),
+            "date": (pd.Timestamp("2024-09-01") - pd.to_timedelta(rng.integers(0, 1500, n), unit="D")).strftime("%Y-%m-%d"),
+            "reviewer_id": rng.integers(1, 10**8, n),
+            "reviewer_name": _pick(rng, _HOST_NAMES, n),
+            "comments": "The " + good + " " + filler + bad + ".",
+        })
+        next_id += n
+
+def generate_reviews(listings: pd.DataFrame, seed: int = 0, max_per_listing: int = 50) -> pd.DataFrame:
+    return pd.concat(list(iter_reviews(listings, seed, max_per_listing)), ignore_index=True)
+
+def iter_calendar(listings: pd.DataFrame, start: str = "2024-09-01", days: int = 365, seed: int = 0,
+                  chunk_listings: int = 2_000) -> Iterator[pd.DataFrame]:
+    """
+    calendar.csv rows (one per listing per day), a block of listings at a time;
+    a full year for 100k listings is 36.5M rows, so it is never materialised whole.
+    """
+    rng = np.random.default_rng(seed + 2)
+    dates = pd.date_range(start, periods=days)
+    date_str = dates.strftime("%Y-%m-%d").to_numpy(dtype=object)
+    weekend = dates.dayofweek.isin([4, 5])
+    base = pd.to_numeric(listings["price"].astype(str).str.replace(r"[^\d\.]", "", regex=True), errors="coerce")
+    base = base.fillna(100.0).to_numpy()
+    for lo in range(0, len(listings), chunk_listings):
+        block = listings.iloc[lo: lo + chunk_listings]
+        m = len(block)
+        avail_rate = (block["availability_365"].to_numpy() / 365.0)[:, None]
+        available = rng.random((m, days)) < avail_rate
+        price = base[lo: lo + m, None] * np.where(weekend, 1.15, 1.0)[None, :] * rng.uniform(0.95, 1.05, (m, days))
+        yield pd.DataFrame({
+            "listing_id": np.repeat(block["id"].to_numpy(), days),
+            "date": np.tile(date_str, m),
+            "available": np.where(available.ravel(), "t", "f"),
+            "price": _money(np.round(price.ravel())),
+            "adjusted_price": None,
+            "minimum_nights": np.repeat(block["minimum_nights"].to_numpy(), days),
+            "maximum_nights": np.repeat(block["maximum_nights"].to_numpy(), days),
+        })
+
+def _write_chunks(path: Path, chunks: Iterator[pd.DataFrame], compress: bool) -> None:
+    fh = gzip.open(path, "wt", compresslevel=1, newline="") if compress else open(path, "w", newline="")
+    with fh:
+        for i, block in enumerate(chunks):
+            block.to_csv(fh, index=False, header=i == 0)
+
+def write_snapshot(
+    out_dir,
+    n_listings: int,
+    seed: int = 0,
+    reviews: bool = True,
+    calendar: bool = False,
+    calendar_days: int = 365,
+    compress: bool = True
+) -> Dict[str, Optional[Path]]:
+    """
+    Write listings/reviews/calendar files laid out like download_dataset's result
+    ({"listings": path, "reviews": path|None, "calendar": path|None}).
+    Reviews and calendar are streamed, so only the listings frame is held in memory.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    suffix = ".csv.gz" if compress else ".csv"
+    paths: Dict[str, Optional[Path]] = {"listings": out_dir / f"listings{suffix}", "reviews": None, "calendar": None}
+    listings = generate_listings(n_listings, seed)
+    listings.to_csv(paths["listings"], index=False, compression=_GZIP if compress else None)
+    if reviews:
+        paths["reviews"] = out_dir / f"reviews{suffix}"
+        _write_chunks(paths["reviews"], iter_reviews(listings, seed), compress)
+    if calendar:
+        paths["calendar"] = out_dir / f"calendar{suffix}"
+        _write_chunks(paths["calendar"], iter_calendar(listings, days=calendar_days, seed=seed), compress)
+    return paths
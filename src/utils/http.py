@@ -1,7 +1,231 @@
 from __future__ import annotations
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Tuple, Dict, Optional, Iterable, List, Any
+from urllib.parse import urlparse
 import requests
-from typing import Tuple, Dict
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+from src.utils.response_cache import CachedResponse, ResponseCache, get_response_cache
 
-def fetch(url: str, timeout: int = 60) -> Tuple[int, bytes, Dict[str, str]]:
-    r = requests.get(url, timeout=timeout)
-    return r.status_code, r.content, dict(r.headers)
\ No newline at end of file
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# off: network only | write: network, store 200 bodies
+# replay: serve from cache, fall back to network | offline: cache only
+CACHE_MODES = ("off", "write", "replay", "offline")
+
+class CacheMiss(requests.RequestException):
+    pass
+
+@dataclass
+class RequestTiming:
+    method: str
+    url: str
+    host: str
+    status: int
+    ttfb_s: float
+    total_s: float
+    bytes: int
+    streamed: bool
+    error: Optional[str] = None
+    cached: bool = False
+
+def _response_from_cache(c: CachedResponse) -> requests.Response:
+    r = requests.Response()
+    r.status_code = c.status
+    r._content = c.body
+    r.headers = CaseInsensitiveDict(c.headers)
+    r.url = c.url
+    r.encoding = requests.utils.get_encoding_from_headers(r.headers)
+    r.elapsed = timedelta(0)
+    r.reason = "OK (cached)"
+    r.from_cache = True
+    return r
+
+class HttpClient:
+    """
+    Process-wide pooled HTTP client.
+    - keep-alive pools per host (pool_maxsize connections each)
+    - urllib3 retries with exponential backoff for connection errors / 5xx
+    - gzip/deflate(/br) negotiation, optional streaming bodies
+    - per-request timing kept in a bounded ring buffer
+    - optional raw response cache (see CACHE_MODES) for offline re-extraction
+    """
+    def __init__(
+        self,
+        pool_connections: int = 16,
+        pool_maxsize: int = 16,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        status_forcelist: Iterable[int] = (500, 502, 503, 504),
+        default_timeout: float = 60,
+        headers: Optional[Dict[str, str]] = None,
+        max_metrics: int = 2000,
+        response_cache: Optional[ResponseCache] = None
+    ):
+        self.default_timeout = default_timeout
+        self._response_cache = response_cache
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=tuple(status_forcelist),
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept-Encoding": ACCEPT_ENCODING, "Connection": "keep-alive"})
+        if headers:
+            self.session.headers.update(headers)
+        self._timings: deque = deque(maxlen=max_metrics)
+        self._lock = threading.Lock()
+
+    def _record(self, timing: RequestTiming):
+        with self._lock:
+            self._timings.append(timing)
+
+    @property
+    def response_cache(self) -> ResponseCache:
+        if self._response_cache is None:
+            self._response_cache = get_response_cache()
+        return self._response_cache
+
+    def request(self, method: str, url: str, *, headers: Optional[Dict[str, str]] = None,
+                timeout: Optional[float] = None, stream: bool = False,
+                cache_mode: str = "off", **kwargs) -> requests.Response:
+        if cache_mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache_mode: {cache_mode}")
+        host = urlparse(url).netloc
+        use_cache = cache_mode != "off" and method == "GET" and not stream
+        t0 = time.perf_counter()
+        if use_cache and cache_mode in ("replay", "offline"):
+            hit = self.response_cache.get(url)
+            if hit is not None:
+                self._record(RequestTiming(method, url, host, hit.status, 0.0, time.perf_counter() - t0,
+                                           len(hit.body), False, cached=True))
+                return _response_from_cache(hit)
+            if cache_mode == "offline":
+                self._record(RequestTiming(method, url, host, 0, 0.0, 0.0, 0, False, "cache miss", cached=True))
+                raise CacheMiss(f"Not in response cache: {url}")
+        try:
+            r = self.session.request(method, url, headers=headers, timeout=timeout or self.default_timeout,
+                                     stream=stream, **kwargs)
+        except requests.RequestException as e:
+            self._record(RequestTiming(method, url, host, 0, 0.0, time.perf_counter() - t0, 0, stream, str(e)))
+            raise
+        ttfb = r.elapsed.total_seconds()
+        if stream:
+            size = int(r.headers.get("Content-Length") or -1)
+        else:
+            size = len(r.content)
+        self._record(RequestTiming(method, url, host, r.status_code, ttfb, time.perf_counter() - t0, size, stream))
+        if use_cache and r.status_code == 200:
+            self.response_cache.put(r.url or url, r.status_code, dict(r.headers), r.content)
+            if r.url and r.url != url:
+                # redirected: also index under the requested URL for replay
+                self.response_cache.put(url, r.status_code, dict(r.headers), r.content)
+        return r
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("allow_redirects", True)
+        return self.request("HEAD", url, **kwargs)
+
+    def fetch(self, url: str, timeout: Optional[float] = None,
+              headers: Optional[Dict[str, str]] = None,
+              cache_mode: str = "off") -> Tuple[int, bytes, Dict[str, str]]:
+        r = self.get(url, timeout=timeout, headers=headers, cache_mode=cache_mode)
+        return r.status_code, r.content, dict(r.headers)
+
+    def stream_to_file(self, url: str, path: Path, timeout: Optional[float] = None,
+                       headers: Optional[Dict[str, str]] = None,
+                       chunk_size: int = 1 << 20) -> Tuple[int, int, Dict[str, str]]:
+        """
+        Stream the body to disk in chunks (bounded memory). Returns (status, bytes_written, headers).
+        The body is only written for HTTP 200.
+        """
+        host = urlparse(url).netloc
+        t0 = time.perf_counter()
+        written = 0
+        try:
+            with self.session.get(url, headers=headers, timeout=timeout or self.default_timeout,
+                                  stream=True, allow_redirects=True) as r:
+                ttfb = r.elapsed.total_seconds()
+                if r.status_code == 200:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    with open(path, "wb") as f:
+                        for chunk in r.iter_content(chunk_size):
+                            f.write(chunk)
+                            written += len(chunk)
+                status, resp_headers = r.status_code, dict(r.headers)
+        except requests.RequestException as e:
+            self._record(RequestTiming("GET", url, host, 0, 0.0, time.perf_counter() - t0, written, True, str(e)))
+            raise
+        self._record(RequestTiming("GET", url, host, status, ttfb, time.perf_counter() - t0, written, True))
+        return status, written, resp_headers
+
+    def timings(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [asdict(t) for t in self._timings]
+
+    def timing_summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-host request count, error count, mean/max latency and bytes.
+        """
+        out: Dict[str, Dict[str, float]] = {}
+        for t in self.timings():
+            s = out.setdefault(t["host"], {"requests": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0, "bytes": 0})
+            s["requests"] += 1
+            s["errors"] += int(t["error"] is not None or t["status"] >= 400)
+            s["total_s"] += t["total_s"]
+            s["max_s"] = max(s["max_s"], t["total_s"])
+            s["bytes"] += max(t["bytes"], 0)
+            s["cache_hits"] = s.get("cache_hits", 0) + int(t["cached"] and t["error"] is None)
+        for s in out.values():
+            s["mean_s"] = s["total_s"] / s["requests"]
+        return out
+
+    def close(self):
+        self.session.close()
+
+_CLIENT: Optional[HttpClient] = None
+_CLIENT_LOCK = threading.Lock()
+
+def get_client() -> HttpClient:
+    global _CLIENT
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = HttpClient()
+    return _CLIENT
+
+def configure_client(**kwargs) -> HttpClient:
+    """
+    Replace the shared client (e.g. different pool sizes or retry policy).
+    """
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is not None:
+            _CLIENT.close()
+        _CLIENT = HttpClient(**kwargs)
+    return _CLIENT
+
+def fetch(url: str, timeout: int = 60, cache_mode: str = "off") -> Tuple[int, bytes, Dict[str, str]]:
+    return get_client().fetch(url, timeout=timeout, cache_mode=cache_mode)
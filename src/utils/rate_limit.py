@@ -0,0 +1,67 @@
+from __future__ import annotations
+import asyncio
+import random
+import time
+from typing import Dict
+from urllib.parse import urlparse
+
+class TokenBucket:
+    """
+    Async token bucket with AIMD-style adaptation:
+    penalize() cuts the rate on 403/429, reward() creeps it back up.
+    """
+    def __init__(self, rate: float, burst: int = 1, min_rate: float = 0.05, jitter: float = 0.0):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.jitter = jitter
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+        if self.jitter:
+            await asyncio.sleep(random.uniform(0, self.jitter))
+
+    def penalize(self, factor: float = 0.5):
+        self._refill()
+        self.rate = max(self.min_rate, self.rate * factor)
+        self.tokens = 0.0
+
+    def reward(self, step: float = 0.1):
+        self.rate = min(self.max_rate, self.rate + step * self.max_rate)
+
+class HostRateLimiter:
+    """
+    One TokenBucket per host, created on first use.
+    """
+    def __init__(self, rate: float = 1.0, burst: int = 2, min_rate: float = 0.05, jitter: float = 0.0):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.jitter = jitter
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc.lower()
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate, self.burst, self.min_rate, self.jitter)
+        return self._buckets[host]
+
+    async def acquire(self, url: str) -> TokenBucket:
+        b = self.bucket(url)
+        await b.acquire()
+        return b
@@ -0,0 +1,202 @@
+from __future__ import annotations
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+from urllib.parse import urldefrag
+
+DEFAULT_CACHE_ROOT = Path("data/cache/http")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body_hash TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_responses_hash ON responses(body_hash);
+CREATE INDEX IF NOT EXISTS ix_responses_access ON responses(last_access);
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    raw_bytes INTEGER NOT NULL,
+    stored_bytes INTEGER NOT NULL
+);
+"""
+
+# Hop-by-hop / transport headers that must not be replayed with a decoded body
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+@dataclass
+class CachedResponse:
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    fetched_at: float
+
+def cache_key(url: str) -> str:
+    return urldefrag(url)[0]
+
+class ResponseCache:
+    """
+    Content-addressed store of raw HTTP bodies.
+    - bodies are gzip-compressed under objects/<aa>/<sha256>.gz and shared by every
+      URL that returned the same bytes (dedupe)
+    - a small SQLite index maps URL -> (status, headers, body hash)
+    - total stored bytes are capped; least recently used URLs are evicted first
+    """
+    def __init__(self, root: Path = DEFAULT_CACHE_ROOT, max_bytes: int = DEFAULT_MAX_BYTES,
+                 compresslevel: int = 6):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.compresslevel = compresslevel
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.root / "index.sqlite"), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / f"{digest}.gz"
+
+    def put(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> str:
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        kept = {k: v for k, v in headers.items() if k.lower() not in _DROP_HEADERS}
+        now = time.time()
+        with self._lock:
+            known = self._conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone()
+            if not known or not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                data = gzip.compress(body, compresslevel=self.compresslevel)
+                tmp = path.with_suffix(".tmp")
+                tmp.write_bytes(data)
+                os.replace(tmp, path)
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO blobs (hash, raw_bytes, stored_bytes) VALUES (?, ?, ?)",
+                        (digest, len(body), len(data))
+                    )
+            prev = self._conn.execute(
+                "SELECT body_hash FROM responses WHERE url = ?", (cache_key(url),)
+            ).fetchone()
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (url, status, headers, body_hash, fetched_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (cache_key(url), status, json.dumps(kept), digest, now, now)
+                )
+            if prev and prev["body_hash"] != digest:
+                self._release(prev["body_hash"])
+            self.evict()
+        return digest
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        key = cache_key(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, body_hash, fetched_at FROM responses WHERE url = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            path = self._object_path(row["body_hash"])
+            if not path.exists():
+                with self._conn:
+                    self._conn.execute("DELETE FROM responses WHERE url = ?", (key,))
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), key))
+        body = gzip.decompress(path.read_bytes())
+        return CachedResponse(key, row["status"], json.loads(row["headers"]), body, row["fetched_at"])
+
+    def iter_responses(self, url_prefix: Optional[str] = None) -> Iterator[CachedResponse]:
+        """
+        Yield cached responses (optionally under a URL prefix) without touching LRU order,
+        e.g. to re-run extraction over every stored page.
+        """
+        sql = "SELECT url, status, headers, body_hash, fetched_at FROM responses"
+        args: list = []
+        if url_prefix:
+            sql += " WHERE url >= ? AND url < ?"
+            args = [url_prefix, url_prefix + "\uffff"]
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY url", args).fetchall()
+        for row in rows:
+            path = self._object_path(row["body_hash"])
+            if path.exists():
+                yield CachedResponse(row["url"], row["status"], json.loads(row["headers"]),
+                                     gzip.decompress(path.read_bytes()), row["fetched_at"])
+
+    def _release(self, digest: str) -> int:
+        """
+        Delete a body once no URL references it. Returns bytes freed.
+        """
+        if self._conn.execute("SELECT 1 FROM responses WHERE body_hash = ? LIMIT 1", (digest,)).fetchone():
+            return 0
+        row = self._conn.execute("SELECT stored_bytes FROM blobs WHERE hash = ?", (digest,)).fetchone()
+        self._object_path(digest).unlink(missing_ok=True)
+        with self._conn:
+            self._conn.execute("DELETE FROM blobs WHERE hash = ?", (digest,))
+        return row["stored_bytes"] if row else 0
+
+    def stored_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(stored_bytes), 0) FROM blobs").fetchone()[0]
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Drop least recently used URLs until stored bytes fit the cap. Returns URLs evicted.
+        """
+        cap = self.max_bytes if max_bytes is None else max_bytes
+        evicted = 0
+        with self._lock:
+            total = self.stored_bytes()
+            if total <= cap:
+                return 0
+            for row in self._conn.execute(
+                "SELECT url, body_hash FROM responses ORDER BY last_access ASC"
+            ).fetchall():
+                with self._conn:
+                    self._conn.execute("DELETE FROM responses WHERE url = ?", (row["url"],))
+                evicted += 1
+                total -= self._release(row["body_hash"])
+                if total <= cap:
+                    break
+        return evicted
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            urls = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            blobs, raw, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_bytes), 0), COALESCE(SUM(stored_bytes), 0) FROM blobs"
+            ).fetchone()
+        return {"urls": urls, "unique_bodies": blobs, "raw_bytes": raw, "stored_bytes": stored,
+                "max_bytes": self.max_bytes}
+
+_CACHE: Optional[ResponseCache] = None
+_CACHE_LOCK = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = ResponseCache()
+    return _CACHE
+
+def configure_response_cache(**kwargs) -> ResponseCache:
+    global _CACHE
+    with _CACHE_LOCK:
+        _CACHE = ResponseCache(**kwargs)
+    return _CACHE
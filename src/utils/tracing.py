@@ -0,0 +1,199 @@
+"""
+Lightweight stage tracing: wall time, peak memory growth and row counts per span,
+emitted as one JSON log line per span on the "prophetbnb.trace" logger.
+
+Headless use:
+
+    from src.utils.tracing import configure_json_logging, trace
+    configure_json_logging()                       # JSON lines on stderr
+    with trace("analysis") as t:
+        df, info = run_analysis(clean_data(load_data("listings.csv.gz")))
+    print(t.to_frame())
+"""
+from __future__ import annotations
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger("prophetbnb.trace")
+TRACE_LOG_ENV = "PROPHETBNB_TRACE_LOG"        # "-" for stderr or a file path
+TRACE_MEMORY_ENV = "PROPHETBNB_TRACE_MEMORY"  # "1": per-span tracemalloc peaks (slower)
+
+@dataclass
+class SpanRecord:
+    name: str
+    status: str = "ok"  # ok | failed | skipped
+    seconds: float = 0.0
+    # Growth of the process peak RSS during the span; 0 when an earlier stage already peaked higher
+    peak_rss_delta_mb: Optional[float] = None
+    # Peak Python allocations inside the span (only while tracemalloc is tracing)
+    peak_alloc_mb: Optional[float] = None
+    rows: Optional[int] = None
+    parent: Optional[str] = None
+    error: Optional[str] = None
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    def set(self, rows: Optional[int] = None, **attrs) -> None:
+        if rows is not None:
+            self.rows = int(rows)
+        self.attrs.update(attrs)
+
+@dataclass
+class Trace:
+    name: str
+    trace_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    spans: List[SpanRecord] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def failed(self) -> List[SpanRecord]:
+        return [s for s in self.spans if s.status == "failed"]
+
+    def records(self) -> List[Dict[str, Any]]:
+        return [asdict(s) for s in self.spans]
+
+    def to_frame(self):
+        import pandas as pd
+        cols = ["name", "status", "seconds", "peak_rss_delta_mb", "peak_alloc_mb", "rows", "parent", "error"]
+        return pd.DataFrame(self.records(), columns=cols + ["attrs"])
+
+_CURRENT_TRACE: ContextVar[Optional[Trace]] = ContextVar("prophetbnb_trace", default=None)
+_SPAN_STACK: ContextVar[tuple] = ContextVar("prophetbnb_spans", default=())
+
+def current_trace() -> Optional[Trace]:
+    return _CURRENT_TRACE.get()
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+def _emit(event: str, payload: Dict[str, Any]) -> None:
+    if logger.isEnabledFor(logging.INFO):
+        trace_obj = current_trace()
+        line = {"event": event, "trace": trace_obj.name if trace_obj else None,
+                "trace_id": trace_obj.trace_id if trace_obj else None, **payload}
+        logger.info(json.dumps(line, default=str))
+
+def _finish(record: SpanRecord) -> None:
+    trace_obj = current_trace()
+    if trace_obj is not None:
+        trace_obj.spans.append(record)
+    _emit("span", asdict(record))
+
+@contextmanager
+def span(name: str, tolerate: bool = False, **attrs) -> Iterator[SpanRecord]:
+    """
+    Time a stage. Exceptions mark the span failed and propagate, unless tolerate=True,
+    in which case they are recorded and swallowed (the caller keeps its previous state).
+    """
+    stack = _SPAN_STACK.get()
+    record = SpanRecord(name=name, parent=stack[-1].name if stack else None, attrs=dict(attrs))
+    token = _SPAN_STACK.set(stack + (record,))
+    rss0 = _peak_rss_mb()
+    tracing_mem = tracemalloc.is_tracing()
+    if tracing_mem:
+        alloc0 = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    t0 = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record.status = "failed"
+        record.error = f"{type(e).__name__}: {e}"
+        if not tolerate:
+            raise
+    finally:
+        record.seconds = round(time.perf_counter() - t0, 4)
+        rss1 = _peak_rss_mb()
+        if rss0 is not None and rss1 is not None:
+            record.peak_rss_delta_mb = round(rss1 - rss0, 1)
+        if tracing_mem and tracemalloc.is_tracing():
+            # Children reset the peak; fold their peaks back in so the parent still covers them
+            peak = max(tracemalloc.get_traced_memory()[1], getattr(record, "_child_peak", 0))
+            record.peak_alloc_mb = round((peak - alloc0) / 2**20, 1)
+            if stack:
+                stack[-1]._child_peak = max(getattr(stack[-1], "_child_peak", 0), peak)
+        _SPAN_STACK.reset(token)
+        _finish(record)
+
+def skip(name: str, reason: str, **attrs) -> SpanRecord:
+    """
+    Record a stage that did not run (disabled option, missing input, cache hit).
+    """
+    stack = _SPAN_STACK.get()
+    record = SpanRecord(name=name, status="skipped", parent=stack[-1].name if stack else None,
+                        attrs={"reason": reason, **attrs})
+    _finish(record)
+    return record
+
+@contextmanager
+def trace(name: str, **attrs) -> Iterator[Trace]:
+    """
+    Collect every span opened inside the block (including nested calls) into one Trace.
+    """
+    trace_obj = Trace(name=name)
+    token = _CURRENT_TRACE.set(trace_obj)
+    t0 = time.perf_counter()
+    status = "ok"
+    try:
+        yield trace_obj
+    except BaseException:
+        status = "failed"
+        raise
+    finally:
+        trace_obj.seconds = round(time.perf_counter() - t0, 4)
+        _emit("trace", {"name": name, "status": status, "seconds": trace_obj.seconds,
+                        "spans": len(trace_obj.spans), "failed": [s.name for s in trace_obj.failed], **attrs})
+        _CURRENT_TRACE.reset(token)
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        # Span lines are already JSON; wrap them with a timestamp and level
+        try:
+            payload = json.loads(record.getMessage())
+        except ValueError:
+            payload = {"message": record.getMessage()}
+        return json.dumps({"ts": round(record.created, 3), "level": record.levelname,
+                           "logger": record.name, **payload}, default=str)
+
+def configure_json_logging(target: str = "-", level: int = logging.INFO) -> logging.Handler:
+    """
+    Send trace events as JSON lines to stderr ("-") or append them to a file.
+    Idempotent per target.
+    """
+    for h in logger.handlers:
+        if getattr(h, "_trace_target", None) == target:
+            return h
+    handler = logging.StreamHandler(sys.stderr) if target == "-" else logging.FileHandler(target)
+    handler.setFormatter(JsonFormatter())
+    handler._trace_target = target
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    return handler
+
+def configure_from_env() -> None:
+    """
+    PROPHETBNB_TRACE_LOG / PROPHETBNB_TRACE_MEMORY switches for deployed and headless runs.
+    """
+    target = os.environ.get(TRACE_LOG_ENV)
+    if target:
+        configure_json_logging(target)
+    if os.environ.get(TRACE_MEMORY_ENV) == "1" and not tracemalloc.is_tracing():
+        tracemalloc.start()
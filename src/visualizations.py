@@ -1,11 +1,9 @@
-import plotly.express as px
-import plotly.graph_objects as go
-
 def parallel_recommendations(df, max_recs=6):
     """
     Display a parallel coordinates plot for the top recommendations.
     Uses custom scoring columns if available; falls back to numeric columns.
     """
+    import plotly.express as px
     scoring = [
         'total_score', 'score_value', 'score_review_quality',
         'score_amenities', 'score_availability', 'availability_365'
@@ -58,6 +56,7 @@ def radar_for_listing(listing, averages):
     if not listing_vals or not avg_vals:
         return None
 
+    import plotly.graph_objects as go
     fig = go.Figure()
     fig.add_trace(go.Scatterpolar(
         r=listing_vals,
@@ -79,4 +78,44 @@ def radar_for_listing(listing, averages):
         title_font_size=18,
         margin=dict(t=65, l=30, r=30, b=30)
     )
-    return fig
\ No newline at end of file
+    return fig
+
+def hex_map_deck(bins, zoom, color_by="median_price"):
+    """
+    Pydeck hex-column map from pre-aggregated bins (see pipelines.spatial_bins).
+    Column height = listing count, colour = chosen metric (low blue -> high red).
+    """
+    import pydeck as pdk
+    if bins is None or bins.empty:
+        return None
+    data = bins.copy()
+    vals = data[color_by]
+    lo, hi = vals.quantile(0.05), vals.quantile(0.95)
+    t = ((vals - lo) / ((hi - lo) or 1)).clip(0, 1).fillna(0)
+    data["r"] = (40 + 215 * t).round().astype(int)
+    data["g"] = (90 + 60 * (1 - (2 * t - 1).abs())).round().astype(int)
+    data["b"] = (230 - 200 * t).round().astype(int)
+    data = data.round({"lat": 6, "lon": 6, "median_price": 1, "mean_score": 3})
+    layer = pdk.Layer(
+        "ColumnLayer",
+        data=data[["lat", "lon", "count", "median_price", "mean_score", "r", "g", "b"]],
+        get_position=["lon", "lat"],
+        get_elevation="count",
+        elevation_scale=float(data["radius_m"].iloc[0]) / max(1.0, float(data["count"].max())) * 8,
+        radius=float(data["radius_m"].iloc[0]) * 0.9,
+        disk_resolution=6,
+        extruded=True,
+        pickable=True,
+        get_fill_color=["r", "g", "b", 180],
+    )
+    view = pdk.ViewState(
+        latitude=float(data["lat"].median()),
+        longitude=float(data["lon"].median()),
+        zoom=zoom,
+        pitch=40,
+    )
+    return pdk.Deck(
+        layers=[layer],
+        initial_view_state=view,
+        tooltip={"text": "{count} listings\nmedian price {median_price}\nmean score {mean_score}"},
+    )
@@ -2,24 +2,30 @@ import sys
 from pathlib import Path
 import pandas as pd
 import streamlit as st
-import plotly.express as px
+
+# Snapshots are shared across sessions; copy-on-write keeps per-session derivations from touching them
+pd.set_option("mode.copy_on_write", True)
 
 ROOT = Path(__file__).resolve().parent
 sys.path.insert(0, str(ROOT))
 sys.path.insert(0, str(ROOT / "src"))
 
 from src.scraper import scrape_catalog
-from src.downloader import download_dataset
-from src.data_preprocessing import load_data, clean_data
-from src.model_training import train_price_model, cluster_hosts
-from src.recommendation import build_recommendation_scores, filter_by_preferences
-from src.visualizations import parallel_recommendations, radar_for_listing
+from src.data_preprocessing import clean_data
+from src.recommendation import preference_mask
+from src.pipelines.analysis import run_analysis
+from src.pipelines.analysis_cache import AnalysisCache, fingerprint, bytes_fingerprint
+from src.pipelines.plot_sampling import downsample_for_plot, DEFAULT_POINT_BUDGET
+from src.pipelines.column_profile import profile_frame
+from src.visualizations import parallel_recommendations, radar_for_listing, hex_map_deck
 from src.ui_theme import inject_base_css
-from src.data_sources.direct_csv_url_source import DirectCSVURLSource
-from src.data_sources.external_site_source import ExternalSiteSource
 from src.metrics import compute_metrics
+from src.pipelines.metrics_cube import OCCUPANCY_BANDS, PRICE_BANDS
+from src.utils.tracing import configure_from_env, current_trace, skip, span, trace
+from src.data_sources.base import build_source
 
 st.set_page_config(page_title="ProPhet-BnB", layout="wide")
+configure_from_env()
 inject_base_css()
 st.markdown("<h1 style='text-align:center;margin-top:0;'>ProPhet-BnB</h1>", unsafe_allow_html=True)
 
@@ -61,6 +67,8 @@ if source_mode == "InsideAirbnb Snapshot":
         date = st.selectbox("Snapshot Date", dates, index=0)
         st.caption(f"Latest available date: {city_entry.latest_date}")
         force_download = st.checkbox("Force Fresh Download", value=False)
+        include_calendar = st.checkbox("Include calendar features (large download)", value=False)
+        score_sentiment = st.checkbox("Score review text sentiment", value=False)
         custom_url = st.text_input("Custom Listings URL (override)", "", placeholder="https://insideairbnb.com/data/.../listings.csv.gz")
         version = city_entry.versions[date]
 elif source_mode == "Local CSV Upload":
@@ -75,6 +83,8 @@ elif source_mode == "Website (Custom Scraper)":
         price_selector = st.text_input("Price CSS Selector", value=".price")
         name_selector = st.text_input("Name CSS Selector", value=".name")
         image_selector = st.text_input("Image CSS Selector", value="img")
+        next_selector = st.text_input("Next Page Link Selector (optional)", value="", placeholder="a.next")
+        max_pages = st.number_input("Max Pages to Crawl", min_value=1, max_value=500, value=1)
 
 st.sidebar.header("2. Adjust Filters")
 default_filters = {
@@ -99,50 +109,88 @@ uf["availability_range"] = st.sidebar.slider("Availability Days", 0, 365, uf.get
 uf["occupancy_group"] = st.sidebar.selectbox("Guest Group", ["Any", "Solo (1)", "Duo (2)", "Small group (3-4)", "Family (5-6)", "Large (7+)"], index=["Any","Solo (1)","Duo (2)","Small group (3-4)","Family (5-6)","Large (7+)"].index(uf.get("occupancy_group", "Any")))
 st.session_state["user_filters"] = uf
 
-run_clicked = st.sidebar.button("Analyze Listings", type="primary")
-
-def find_col(df, names):
+def sidebar_preferences(df: pd.DataFrame) -> dict:
     """
-    Return the first matching column from a list of names, using some fuzzy matching.
+    preference_mask kwargs for the sidebar filters. Ranges left at their full default
+    span don't filter; price bands map to the snapshot's price tertiles (as in the cube).
     """
-    for name in names:
-        if name in df.columns:
-            return name
-    for col in df.columns:
-        for name in names:
-            if name.lower() in col.lower():
-                return col
-    return None
-
-def get_numeric_cols(df):
-    return [c for c in df.select_dtypes(include='number').columns if df[c].nunique() > 1]
+    prefs = {k: tuple(uf[k]) for k in ("reviews_range", "stars_range", "availability_range")
+             if tuple(uf[k]) != tuple(default_filters[k])}
+    if uf["occupancy_group"] != "Any":
+        prefs["occupancy_group"] = uf["occupancy_group"]
+    if uf["price_mode"] == "Custom Range":
+        if tuple(uf["custom_price_range"]) != tuple(default_filters["custom_price_range"]):
+            prefs["price_range"] = tuple(uf["custom_price_range"])
+    elif "price" in df.columns:
+        valid = df["price"][df["price"] > 0]
+        if len(valid):
+            edges = valid.quantile([0, 1 / 3, 2 / 3, 1]).to_numpy()
+            i = PRICE_BANDS.index(uf["price_mode"])
+            prefs["price_range"] = (float(edges[i]), float(edges[i + 1]))
+    return prefs
+
+run_clicked = st.sidebar.button("Analyze Listings", type="primary")
+show_diagnostics = st.sidebar.checkbox("Show diagnostics", value=False, help="Per-stage timings, memory and row counts of the last analysis run")
 
 df, source_label = None, ""
 max_rows = 10000
+REMOTE_TTL_S = 3600
+
+@st.cache_resource(show_spinner=False)
+def get_analysis_cache():
+    # Shared by every session in this process
+    return AnalysisCache()
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def scatter_payload(snap_key, x_col, y_col, z_col, color_col, hover, budget, _df):
+    # Downsampled scatter payloads per (snapshot, axes, colour, budget), LRU-bounded and
+    # shared by sessions; _df is not hashed, snap_key identifies the frame
+    return downsample_for_plot(_df, x_col, y_col, z_col, color=color_col, hover=list(hover), budget=budget)
+
+def analysis_key():
+    """
+    Fingerprint of the current source selection and its inputs.
+    Returns (key, ttl); snapshots are immutable, remote pages may change.
+    """
+    if source_mode == "InsideAirbnb Snapshot":
+        return fingerprint(mode=source_mode, city=city, date=date, override=custom_url or None,
+                           calendar=include_calendar, sentiment=score_sentiment, max_rows=max_rows), None
+    if source_mode == "Local CSV Upload":
+        return fingerprint(
+            mode=source_mode,
+            listings=bytes_fingerprint(uploaded_listings.getvalue()) if uploaded_listings else None,
+            reviews=bytes_fingerprint(uploaded_reviews.getvalue()) if uploaded_reviews else None,
+            max_rows=max_rows
+        ), None
+    if source_mode == "Direct CSV URL":
+        return fingerprint(mode=source_mode, url=csv_url.strip(), max_rows=max_rows), REMOTE_TTL_S
+    return fingerprint(
+        mode=source_mode, url=site_url.strip(), listing=listing_selector, price=price_selector,
+        name=name_selector, image=image_selector, next=next_selector, pages=int(max_pages), max_rows=max_rows
+    ), REMOTE_TTL_S
 
 def load_dataset():
     if source_mode == "InsideAirbnb Snapshot":
-        files = download_dataset(
-            version,
+        # Same pipeline as every other InsideAirbnb load, behind the shared source cache
+        result = build_source(
+            "InsideAirbnb",
+            version=version,
             city=city,
             date=date,
             force=force_download,
-            override_listings_url=custom_url or None
-        )
-        df_local = load_data(files["listings"], files["reviews"], files.get("neighbourhoods"))
-        df_local = clean_data(df_local)
-        meta = {
-            "source_label": f"{city} {date}",
-            "files": files,
-            "mode": "InsideAirbnb"
-        }
-        return df_local, meta
+            override_listings_url=custom_url or None,
+            include_calendar=include_calendar,
+            review_sentiment=score_sentiment
+        ).load()
+        return result.df, {**result.metadata, "mode": "InsideAirbnb"}
     if source_mode == "Local CSV Upload":
         if not uploaded_listings:
             st.error("Please upload a listings CSV file.")
             st.stop()
         try:
-            df_local = pd.read_csv(uploaded_listings)
+            with span("read_csv") as s:
+                df_local = pd.read_csv(uploaded_listings)
+                s.set(rows=len(df_local))
         except Exception as e:
             st.error(f"Could not read listings file: {e}")
             st.stop()
@@ -154,21 +202,26 @@ def load_dataset():
                     df_local = df_local.merge(summary, left_on="id", right_index=True, how="left")
             except Exception as e:
                 st.warning(f"Could not read reviews file: {e}")
-        df_local = clean_data(df_local)
+        with span("clean_data") as s:
+            df_local = clean_data(df_local, source="LocalCSVUpload")
+            s.set(rows=len(df_local))
         return df_local, {"source_label": "Manual Upload", "mode": "LocalCSV"}
     if source_mode == "Direct CSV URL":
         if not csv_url.strip():
             st.error("Please provide a valid CSV URL.")
             st.stop()
-        src = DirectCSVURLSource(url=csv_url)
-        result = src.load()
+        # build_source wraps the source in the shared source cache (traced as source:<type>)
+        result = build_source("DirectCSVURL", url=csv_url).load()
         return result.df, {"source_label": "Direct CSV URL", "url": csv_url, "mode": "DirectURL"}
     if source_mode == "Website (Custom Scraper)":
         if not site_url.strip():
             st.error("Please provide a valid listing website link.")
             st.stop()
-        src = ExternalSiteSource(
+        src = build_source(
+            "ExternalSiteURL",
             url=site_url,
+            next_selector=next_selector.strip() or None,
+            max_pages=int(max_pages),
             listing_selector=listing_selector,
             field_map={
                 "name": {"selector": name_selector, "attr": "text"},
@@ -184,51 +237,110 @@ def load_dataset():
         return df_local, {"source_label": f"Scraped from {site_url}", "mode": "CustomScraper"}
     raise RuntimeError("Unsupported source mode.")
 
+def load_and_analyze():
+    df_local, meta = load_dataset()
+    if df_local is None or df_local.empty:
+        st.error("No data extracted. Please check your upload/site/link or selectors.")
+        st.stop()
+    with span("run_analysis", rows_in=len(df_local)):
+        df_local, info = run_analysis(df_local, max_rows=max_rows)
+    meta.update(info)
+    # Kept with the cache entry so cache hits can still show how the snapshot was built
+    run = current_trace()
+    if run is not None:
+        meta["trace"] = {"trace_id": run.trace_id, "spans": run.records()}
+    return df_local, meta
+
+def render_diagnostics():
+    last = st.session_state.get("last_trace")
+    if not show_diagnostics or not last:
+        return
+    with st.expander("Diagnostics", expanded=True):
+        st.caption(f"Trace {last['trace_id']} - {last['seconds']:.2f}s total"
+                   + (" (served from analysis cache)" if last.get("cache_hit") else ""))
+        spans = pd.DataFrame(last["spans"])
+        if last.get("cache_hit") and last.get("computed_by"):
+            st.caption(f"Stages below are from trace {last['computed_by']['trace_id']}, which built this cache entry.")
+            spans = pd.DataFrame(last["computed_by"]["spans"])
+        if not spans.empty:
+            spans["attrs"] = spans["attrs"].map(lambda a: ", ".join(f"{k}={v}" for k, v in a.items()))
+            st.dataframe(spans, hide_index=True, use_container_width=True)
+        for name, error in (last.get("stage_errors") or {}).items():
+            st.warning(f"{name} failed and was skipped: {error}")
+
 if run_clicked:
-    try:
-        df, meta = load_dataset()
-        source_label = meta.get("source_label", "")
-        if df is None or df.empty:
-            st.error("No data extracted. Please check your upload/site/link or selectors.")
-            st.stop()
-        if len(df) > max_rows:
-            df = df.sample(max_rows)
-            st.warning(f"Sampled {max_rows} rows for performance.")
-        try:
-            _, df = train_price_model(df)
-        except Exception:
-            pass
+    with trace("analyze_listings", mode=source_mode) as run_trace:
         try:
-            _, df = cluster_hosts(df)
-        except Exception:
-            pass
-        df = build_recommendation_scores(df)
-        st.session_state["df_base"] = df
-        st.session_state["source_label"] = source_label
-        st.success(f"Loaded {len(df)} listings!")
-    except Exception as e:
-        st.error(f"Could not read or process data: {e}")
+            key, ttl = analysis_key()
+            refresh = source_mode == "InsideAirbnb Snapshot" and force_download
+            df, meta, cache_hit = get_analysis_cache().get_or_compute(key, load_and_analyze, ttl=ttl, refresh=refresh)
+            if cache_hit:
+                skip("load_and_analyze", "served from analysis cache")
+            source_label = meta.get("source_label", "")
+            if meta.get("sampled_to"):
+                st.warning(f"Sampled {meta['sampled_to']} rows for performance.")
+            # Sessions keep only the snapshot key; the scored frame lives once in the cache
+            st.session_state["snapshot_key"] = key
+            st.success(f"Loaded {len(df)} listings!" + (" (cached)" if cache_hit else ""))
+        except Exception as e:
+            error = e
+        else:
+            error = None
+    st.session_state["last_trace"] = {
+        "trace_id": run_trace.trace_id,
+        "seconds": run_trace.seconds,
+        "spans": run_trace.records(),
+        "cache_hit": error is None and cache_hit,
+        "computed_by": meta.get("trace") if error is None else None,
+        "stage_errors": meta.get("stage_errors") if error is None else None,
+    }
+    if error is not None:
+        st.error(f"Could not read or process data: {error}")
+        render_diagnostics()
         st.stop()
 
-df = st.session_state.get("df_base")
-source_label = st.session_state.get("source_label", "")
+df = meta = None
+snap_key = st.session_state.get("snapshot_key")
+if snap_key:
+    hit = get_analysis_cache().get(snap_key)
+    if hit is None:
+        del st.session_state["snapshot_key"]
+        st.info("This analysis has expired from the cache; run Analyze Listings again.")
+    else:
+        df, meta = hit
+
+render_diagnostics()
 
 if df is not None:
+    import plotly.express as px  # charts only render once a dataset is loaded
+    source_label = meta.get("source_label", "")
     st.markdown(f"### Source: {source_label}")
 
-    metrics, price_col = compute_metrics(df)
+    profile = meta.get("profile") or profile_frame(df)
+    cube = meta.get("metrics_cube")
+    metrics, price_col = compute_metrics(df, profile) if cube is None else (cube.query(), profile.column_for("price"))
     def fmt(v): return f"{v:,.1f}" if v is not None and pd.notnull(v) else "—"
 
-    img_col = find_col(df, ["image_url", "Image", "img", "photo", "picture"])
+    img_col = profile.column_for("image")
     table_cols = ["id", "name", "neighbourhood", "room_type"]
     for col in [price_col, 'review_scores_rating', img_col]:
         if col and col in df.columns: table_cols.append(col)
 
-    tab_overview, tab_recommend, tab_compare, tab_scatter3d = st.tabs(["Overview", "Recommendations", "Comparison", "3D Scatter Plot"])
+    tab_overview, tab_recommend, tab_compare, tab_scatter3d, tab_map = st.tabs(["Overview", "Recommendations", "Comparison", "3D Scatter Plot", "Map"])
 
     with tab_overview:
         st.markdown("### Overview & Sample")
         st.dataframe(df.head(25)[table_cols], height=350)
+        if cube is not None:
+            scols = st.columns(4)
+            segment = {
+                "neighbourhoods": scols[0].multiselect("Neighbourhood", cube.values("neighbourhood"), key="seg_hood"),
+                "room_types": scols[1].multiselect("Room type", cube.values("room_type"), key="seg_room"),
+                "occupancy_groups": scols[2].multiselect("Guests", [b[0] for b in OCCUPANCY_BANDS], key="seg_occ"),
+                "price_bands": scols[3].multiselect("Price band", PRICE_BANDS, key="seg_price"),
+            }
+            # KPI tiles and radar averages come from the pre-aggregated cube, not the rows
+            metrics = cube.query(**segment)
         kcols = st.columns(6)
         metrics_display = [
             ("Avg Price", metrics['avg_price']),
@@ -240,11 +352,30 @@ if df is not None:
         ]
         for (label, val), col in zip(metrics_display, kcols):
             col.metric(label, fmt(val))
-        st.write(f"**Active Price Range:** {fmt(metrics['avg_price'])}")
+        if metrics.get("price_p50") is not None:
+            st.write(f"**Active Price Range:** {fmt(metrics['price_p25'])} – {fmt(metrics['price_p75'])} (median {fmt(metrics['price_p50'])})")
+        else:
+            st.write(f"**Active Price Range:** {fmt(metrics['avg_price'])}")
 
     with tab_recommend:
         st.subheader("Top Suggested Listings")
-        recomm_df = df.sort_values("total_score", ascending=False).head(uf["suggestions"])
+        search_index = meta.get("search_index")
+        query = st.text_input(
+            "Search listings", "", placeholder="e.g. loft near canal with balcony", key="search_query"
+        ) if search_index is not None else ""
+        if query.strip():
+            # BM25 over name/description/overview, restricted to the sidebar filters, blended with total_score
+            hits, _ = search_index.search(
+                query,
+                mask=preference_mask(df, **sidebar_preferences(df)).to_numpy(),
+                rank_by=df["total_score"].to_numpy(),
+                top_k=uf["suggestions"]
+            )
+            if not len(hits):
+                st.info("No listings match that search and the sidebar filters; showing top scored listings instead.")
+            recomm_df = df.iloc[hits] if len(hits) else df.nlargest(uf["suggestions"], "total_score")
+        else:
+            recomm_df = df.nlargest(uf["suggestions"], "total_score")
         rec_cols = [c for c in ["id", "name", "neighbourhood", "room_type", price_col, "review_scores_rating", img_col] if c in recomm_df.columns]
         st.dataframe(recomm_df[rec_cols], height=400)
         st.download_button(
@@ -315,33 +446,44 @@ if df is not None:
 
     with tab_scatter3d:
         st.subheader("3D Scatter Plot")
-        numeric_cols = get_numeric_cols(df)
+        numeric_cols = profile.numeric_columns()
         if len(numeric_cols) < 3:
             st.info("Not enough numeric columns for 3D scatter plot.")
         else:
             x_col = st.selectbox("X axis", numeric_cols, index=0, key="3d_x")
             y_col = st.selectbox("Y axis", numeric_cols, index=1 if len(numeric_cols) > 1 else 0, key="3d_y")
             z_col = st.selectbox("Z axis", numeric_cols, index=2 if len(numeric_cols) > 2 else 0, key="3d_z")
+            color_options = profile.categorical_columns(max_unique=50)
             color_col = st.selectbox(
                 "Color by",
-                [c for c in df.columns if df[c].nunique() < 50 and df[c].dtype == object],
+                color_options,
                 index=0,
                 key="3d_color"
-            ) if any(df[c].nunique() < 50 and df[c].dtype == object for c in df.columns) else None
+            ) if color_options else None
+            point_budget = st.number_input(
+                "Max points to plot", min_value=500, max_value=50000,
+                value=DEFAULT_POINT_BUDGET, step=500, key="3d_budget"
+            )
+            # Downsampled payload is reused until the axes, colour or budget change
+            plot_df = scatter_payload(
+                snap_key, x_col, y_col, z_col, color_col, tuple(["name"] + table_cols), int(point_budget), df
+            )
             fig3d = px.scatter_3d(
-                df,
+                plot_df,
                 x=x_col,
                 y=y_col,
                 z=z_col,
                 color=color_col,
-                hover_name="name" if "name" in df.columns else None,
-                hover_data=table_cols,
+                hover_name="name" if "name" in plot_df.columns else None,
+                hover_data=[c for c in table_cols if c in plot_df.columns],
                 title=f"3D Scatter Plot: {x_col} vs {y_col} vs {z_col}",
                 height=700
             )
             st.plotly_chart(fig3d, use_container_width=True)
+            if len(plot_df) < len(df):
+                st.caption(f"Showing {len(plot_df):,} of {len(df):,} listings (outliers and top-scored kept).")
             st.markdown("### Top Listings Visual Comparison (by 3D scatter plot values)")
-            top_points = df.sort_values([z_col, y_col, x_col], ascending=False).head(3)
+            top_points = df.nlargest(3, list(dict.fromkeys([z_col, y_col, x_col])))
             img_cols = st.columns(3)
             for idx in range(len(top_points)):
                 row = top_points.iloc[idx]
@@ -355,6 +497,22 @@ if df is not None:
                     amenities = row.get('amenities_count', 'N/A')
                     st.caption(f"Price: ${price}, Rating: {rating}, Area: {location}, Amenities: {amenities}")
 
+    with tab_map:
+        st.subheader("Listing Density Map")
+        map_bins = meta.get("map_bins") or {}
+        if not map_bins:
+            st.info("No latitude/longitude columns available for a map.")
+        else:
+            zooms = sorted(map_bins.keys())
+            mcol1, mcol2 = st.columns(2)
+            zoom = mcol1.select_slider("Map detail (zoom)", options=zooms, value=zooms[len(zooms) // 2], key="map_zoom")
+            color_by = mcol2.radio("Colour by", ["median_price", "mean_score"], horizontal=True, key="map_color")
+            bins = map_bins[zoom]
+            deck = hex_map_deck(bins, zoom, color_by=color_by)
+            if deck is not None:
+                st.pydeck_chart(deck)
+                st.caption(f"{len(bins):,} cells aggregating {int(bins['count'].sum()):,} listings.")
+
 else:
     st.info("Paste a data link, pick a city, or upload a CSV, then hit Analyze Listings.")
 